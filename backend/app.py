@@ -1,22 +1,33 @@
-from flask import Flask, request, jsonify, Response # type: ignore
+from flask import Flask, request, jsonify, Response, stream_with_context # type: ignore
 from flask_cors import CORS # type: ignore
 import cv2 # type: ignore
-import numpy as np # type: ignore
-import base64
-import io
-from PIL import Image # type: ignore
 import os
 from dotenv import load_dotenv # type: ignore
 import logging
 import traceback
-from datetime import datetime
+import csv
+import io
+from datetime import datetime, timedelta
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # Kendi modüllerimizi import ediyoruz
-from utils.vehicle_detector import VehicleDetector
+# (ultralytics, easyocr ve supabase sınıfların içinde tembel olarak import edilir)
+from utils.vehicle_detector import VehicleDetector, list_available_cameras
 from utils.plate_reader import PlateReader
-from database_utils.database import SupabaseDB
+from utils.component_loader import ComponentLoader, STATE_READY, STATE_ERROR
+from utils.inference_workers import ProcessVehicleDetector, ProcessPlateReader
+from utils.camera_manager import CameraManager
+from utils.metrics import registry, time_stage
+from utils.tracing import span, tracer
+from utils.logging_setup import setup_logging
+from utils.http_cache import ResponseCache, request_key
+from utils.plate_format import normalize_plate
+from database_utils.database import SupabaseDB, ACCESS_LOG_COLUMNS
+from database_utils.export import FORMATS, export_chunks
+from database_utils.pagination import InvalidCursorError, select_columns
+from config.detection_config import DetectionConfig
 
 # Environment variables yükle
 load_dotenv()
@@ -25,315 +36,656 @@ load_dotenv()
 app = Flask(__name__)
 CORS(app)  # React frontend ile iletişim için
 
-# Global kamera değişkenleri
-camera = None
+# Eski tek kameralı API'lerin (/api/camera/*, /api/detection/*) kullandığı kamera
 camera_id = 1  # Varsayılan olarak kamera 1
-camera_active = False
-detection_active = False
-
-# Son tespit sonucu için global değişken
-last_detection_result = None
-
-# Gelişmiş logging ayarla
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('app.log'),
-        logging.StreamHandler()
-    ]
-)
+
+# Aynı araç için tekrar tekrar plaka okumayı önleyen bekleme süresi (saniye)
+PLATE_COOLDOWN = 3.0
+
+# Loglama: kayıtlar kuyruğa bırakılır, dosyaya (JSON, döndürülen) dinleyici thread'i yazar.
+# İşçi süreçlerde (__mp_main__) sadece konsola yazılır; app.log'u ana süreç döndürür.
+setup_logging(DetectionConfig, log_file=None if __name__ == '__mp_main__' else 'app.log')
 logger = logging.getLogger(__name__)
 
-# Başlangıç logları
-logger.info("🚛 Araç Kapısı & Plaka Tespit Sistemi başlatılıyor...")
-logger.info(f"Python sürümü: {os.sys.version}")
-logger.info(f"Çalışma dizini: {os.getcwd()}")
-
-# Sınıfları başlat
-try:
-    logger.info("VehicleDetector başlatılıyor...")
-    detector = VehicleDetector()
-    logger.info("✅ VehicleDetector başarıyla başlatıldı")
-except Exception as e:
-    logger.error(f"❌ VehicleDetector başlatma hatası: {str(e)}")
-    logger.error(traceback.format_exc())
-
-try:
-    logger.info("PlateReader başlatılıyor...")
-    plate_reader = PlateReader()
-    logger.info("✅ PlateReader başarıyla başlatıldı")
-except Exception as e:
-    logger.error(f"❌ PlateReader başlatma hatası: {str(e)}")
-    logger.error(traceback.format_exc())
-
-try:
-    logger.info("SupabaseDB bağlantısı kuruluyor...")
-    supabase_db = SupabaseDB()
-    logger.info("✅ SupabaseDB başarıyla bağlandı")
-    
-    # Demo plakaları kur
+# Bileşenler arka planda yüklenir; hazır olana kadar None kalırlar
+detector = None
+plate_reader = None
+supabase_db = None
+
+loader = ComponentLoader()
+
+# Sadece ana süreçte oluşturulur (create_app_state); işçi süreçlerde None kalır
+camera_manager = None
+plate_executor = None
+response_cache = None
+
+def _on_detector_ready(instance):
+    global detector
+    detector = instance
+
+def _on_plate_reader_ready(instance):
+    global plate_reader
+    plate_reader = instance
+
+def _on_supabase_ready(instance):
+    global supabase_db
+    supabase_db = instance
+    
+    # Demo plakaları ayrı thread'de kurulur; hazır olma durumu (/api/ready) bunu beklemez
+    threading.Thread(target=_setup_demo_plates, args=(instance,), name='demo-plates', daemon=True).start()
+
+def _setup_demo_plates(db):
     try:
-        supabase_db.setup_demo_plates()
+        db.setup_demo_plates()
     except Exception as demo_error:
         logger.warning(f"⚠️ Demo plaka kurulumu başarısız: {str(demo_error)}")
-        
-except Exception as e:
-    logger.error(f"❌ SupabaseDB bağlantı hatası: {str(e)}")
-    logger.error(traceback.format_exc())
-    supabase_db = None
 
-def init_camera(cam_id=1):
-    """Kamerayı başlat"""
-    global camera, camera_id, camera_active
+def _create_process_detector():
+    worker = ProcessVehicleDetector()
+    worker.wait_ready(DetectionConfig.WORKER_START_TIMEOUT)
+    return worker
+
+def _create_process_plate_reader():
+    worker = ProcessPlateReader()
+    worker.wait_ready(DetectionConfig.WORKER_START_TIMEOUT)
+    return worker
+
+def start_background_loading():
+    """Ağır bileşenleri arka plan thread'lerinde yüklemeye başla"""
+    logger.info("⏳ VehicleDetector, PlateReader ve SupabaseDB arka planda başlatılıyor...")
     
-    try:
-        if camera is not None:
-            camera.release()
-        
-        logger.info(f"🎥 Kamera {cam_id} başlatılıyor...")
-        camera = cv2.VideoCapture(cam_id)
-        
-        if not camera.isOpened():
-            logger.error(f"❌ Kamera {cam_id} açılamadı!")
-            return False
-        
-        # Kamera ayarları
-        camera.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-        camera.set(cv2.CAP_PROP_FPS, 30)
-        
-        camera_id = cam_id
-        camera_active = True
-        
-        # Gerçek ayarları al
-        width = int(camera.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(camera.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        fps = int(camera.get(cv2.CAP_PROP_FPS))
-        
-        logger.info(f"✅ Kamera {cam_id} başlatıldı: {width}x{height} @ {fps}fps")
-        return True
-        
-    except Exception as e:
-        logger.error(f"❌ Kamera başlatma hatası: {str(e)}")
-        camera_active = False
-        return False
+    if DetectionConfig.USE_PROCESS_WORKERS:
+        # Tespit ve OCR ayrı süreçlerde; model yükleme ve ısınma işçi süreçte yapılır
+        loader.register('vehicle_detector', _create_process_detector,
+                        on_ready=_on_detector_ready)
+        loader.register('plate_reader', _create_process_plate_reader,
+                        on_ready=_on_plate_reader_ready)
+    else:
+        loader.register('vehicle_detector', lambda: VehicleDetector(warmup=False),
+                        warmup=lambda d: d.warmup(), on_ready=_on_detector_ready)
+        loader.register('plate_reader', PlateReader,
+                        warmup=lambda r: r.warmup(), on_ready=_on_plate_reader_ready)
+    
+    loader.register('supabase_db', SupabaseDB, on_ready=_on_supabase_ready)
 
-def generate_frames():
-    """Video stream için frame üret"""
-    global camera, detection_active
+def db_unavailable_response():
+    """Veritabanı hazır değilse uygun hata yanıtını döndür"""
+    if loader.state('supabase_db') == STATE_ERROR:
+        logger.error("❌ Supabase bağlantısı yok")
+        return jsonify({'error': 'Veritabanı bağlantısı yok'}), 500
     
-    if camera is None:
+    logger.warning("⏳ Supabase bağlantısı henüz hazır değil")
+    return jsonify({'error': 'Veritabanı bağlantısı kuruluyor, lütfen tekrar deneyin'}), 503
+
+def handle_detections(pipeline, captured, detections):
+    """Çıkarım sonrası kararlı kamyonları plaka okumaya gönder"""
+    if plate_reader is None:
         return
     
-    frame_count = 0
-    fps_start_time = time.time()
-    last_detection_time = 0  # Son tespit zamanı
-    detection_cooldown = 3.0  # 3 saniye bekleme süresi
+    # Kararlı kamyon tespiti var mı
+    stable_trucks = [d for d in detections if d.get('is_truck', False) and d.get('stability_count', 0) >= 3]
     
-    while camera_active:
-        try:
-            success, frame = camera.read()
-            if not success:
-                logger.error("Kameradan frame okunamadı")
-                break
-            
-            frame_count += 1
-            current_time = time.time()
-            
-            # Tespit aktif ise araç tespiti yap
-            if detection_active:
-                detections = detector.detect_frame(frame)
-                frame = detector.draw_detections(frame, detections)
+    # Cooldown kontrolü - çok sık tespit yapmayı önle
+    if not stable_trucks or pipeline.plate_pending:
+        return
+    if time.time() - pipeline.last_plate_time <= PLATE_COOLDOWN:
+        return
+    
+    logger.info(f"🚛 Kamera {pipeline.camera_key}: {len(stable_trucks)} adet kararlı kamyon/tır tespit edildi!")
+    frame = captured.image
+    
+    # Plaka tespiti için ROI'leri al
+    regions = []
+    for truck in stable_trucks:
+        x1, y1, x2, y2 = truck['bbox']
+        
+        # ROI boyut kontrolü
+        if x2 <= x1 or y2 <= y1:
+            logger.debug("Geçersiz bounding box koordinatları")
+            continue
+        
+        # Frame tamponu bu çağrıdan sonra havuza dönebilir; ROI plaka thread'ine kopyalanır
+        roi = frame[y1:y2, x1:x2]
+        if roi.shape[0] > 50 and roi.shape[1] > 50:
+            regions.append((truck, roi.copy()))
+        else:
+            logger.debug("ROI boyutu çok küçük")
+    
+    if regions:
+        pipeline.plate_pending = True
+        plate_executor.submit(process_plates, pipeline, regions)
+
+def process_plates(pipeline, regions):
+    """Kamyon ROI'lerinden plakayı oku, veritabanında kontrol et ve logla"""
+    try:
+        for truck, roi in regions:
+            try:
+                # Plaka tespit et
+                with span('read_plate', 'plate', camera=pipeline.camera_key,
+                          track_id=truck.get('track_id')) as plate_span:
+                    plate_result = plate_reader.read_plate(roi)
+                    plate_span.set(plate=plate_result.get('text', ''))
                 
-                # Kararlı kamyon tespiti varsa işle
-                stable_trucks = [d for d in detections if d.get('is_truck', False) and d.get('stability_count', 0) >= 3]
+                if not (plate_result.get('detected', False) and plate_result.get('text')):
+                    logger.debug("Plaka okunamadı veya boş")
+                    continue
                 
-                # Cooldown kontrolü - çok sık tespit yapmayı önle
-                if stable_trucks and (current_time - last_detection_time) > detection_cooldown:
-                    logger.info(f"🚛 {len(stable_trucks)} adet kararlı kamyon/tır tespit edildi!")
-                    
-                    for truck in stable_trucks:
-                        try:
-                            # Plaka tespiti için ROI al
-                            x1, y1, x2, y2 = truck['bbox']
-                            
-                            # ROI boyut kontrolü
-                            if x2 > x1 and y2 > y1:
-                                roi = frame[y1:y2, x1:x2]
-                                
-                                # ROI boyutu yeterli mi kontrol et
-                                if roi.shape[0] > 50 and roi.shape[1] > 50:
-                                    # Plaka tespit et
-                                    plate_result = plate_reader.read_plate(roi)
-                                    
-                                    if plate_result.get('detected', False) and plate_result.get('text'):
-                                        plate_text = plate_result['text'].strip().upper()
-                                        
-                                        if len(plate_text) >= 5:  # Minimum plaka uzunluğu
-                                            logger.info(f"📋 Plaka okundu: {plate_text}")
-                                            
-                                            # Veritabanında kontrol et
-                                            if supabase_db:
-                                                try:
-                                                    is_authorized = supabase_db.check_plate(plate_text)
-                                                    
-                                                    # Erişim logunu kaydet
-                                                    access_granted = is_authorized
-                                                    gate_action = 'open' if is_authorized else 'denied'
-                                                    
-                                                    supabase_db.add_access_log(
-                                                        plate_text,
-                                                        truck['class_name'],
-                                                        gate_action,
-                                                        access_granted
-                                                    )
-                                                    
-                                                    if is_authorized:
-                                                        logger.info(f"✅ Erişim izni verildi: {plate_text}")
-                                                        # Frame'e başarı mesajı ekle
-                                                        cv2.putText(frame, f"ERISIM IZNI VERILDI: {plate_text}", 
-                                                                   (10, frame.shape[0] - 60), 
-                                                                   cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 3)
-                                                    else:
-                                                        logger.warning(f"❌ Erişim reddedildi: {plate_text}")
-                                                        # Frame'e ret mesajı ekle
-                                                        cv2.putText(frame, f"ERISIM REDDEDILDI: {plate_text}", 
-                                                                   (10, frame.shape[0] - 60), 
-                                                                   cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 3)
-                                                    
-                                                    # Son tespit sonucunu global değişkene kaydet
-                                                    global last_detection_result
-                                                    last_detection_result = {
-                                                        'plate_text': plate_text,
-                                                        'vehicle_type': truck['class_name'],
-                                                        'gate_action': gate_action,
-                                                        'is_authorized': is_authorized,
-                                                        'timestamp': datetime.now().isoformat(),
-                                                        'access_granted': access_granted
-                                                    }
-                                                    
-                                                    # Son tespit zamanını güncelle
-                                                    last_detection_time = current_time
-                                                    
-                                                except Exception as db_error:
-                                                    logger.error(f"Veritabanı işlem hatası: {str(db_error)}")
-                                            else:
-                                                logger.warning("Supabase bağlantısı yok, plaka kontrol edilemiyor")
-                                        else:
-                                            logger.debug(f"Plaka çok kısa: {plate_text}")
-                                    else:
-                                        logger.debug("Plaka okunamadı veya boş")
-                                else:
-                                    logger.debug("ROI boyutu çok küçük")
-                            else:
-                                logger.debug("Geçersiz bounding box koordinatları")
-                                
-                        except Exception as e:
-                            logger.error(f"Plaka işleme hatası: {str(e)}")
+                # Arama anahtarı elle/toplu eklenen plakalarla aynı biçimde olmalı
+                plate_text, error = normalize_plate(plate_result['text'])
+                if error:
+                    logger.debug(f"Okunan plaka geçersiz ({plate_result['text']}): {error}")
+                    continue
                 
-                # Genel tespit bilgisini frame'e ekle
-                if detections:
-                    total_vehicles = len(detections)
-                    stable_vehicles = len([d for d in detections if d.get('stability_count', 0) >= 3])
-                    
-                    info_text = f"Arac: {total_vehicles} | Kararli: {stable_vehicles}"
-                    cv2.putText(frame, info_text, (10, frame.shape[0] - 100), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-            
-            # FPS hesapla ve göster
-            if frame_count % 30 == 0:  # Her 30 frame'de bir
-                elapsed = current_time - fps_start_time
-                fps = 30 / elapsed if elapsed > 0 else 0
+                logger.info("📋 Kamera %s plaka okundu: %s", pipeline.camera_key, plate_text,
+                            extra={'camera': pipeline.camera_key, 'plate': plate_text,
+                                   'track_id': truck.get('track_id')})
                 
-                # FPS bilgisini frame'e ekle
-                cv2.putText(frame, f"FPS: {fps:.1f}", (frame.shape[1] - 120, 30), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+                # Veritabanında kontrol et
+                if not supabase_db:
+                    logger.warning("Supabase bağlantısı yok, plaka kontrol edilemiyor")
+                    continue
                 
-                fps_start_time = current_time
-            
-            # Tespit durumu göstergesi
-            status_text = "GERCEK ZAMANLI TESPIT AKTIF" if detection_active else "TESPIT PASIF"
-            status_color = (0, 255, 0) if detection_active else (0, 0, 255)
-            cv2.putText(frame, status_text, (10, 60), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, status_color, 2)
-            
-            # Frame'i encode et
-            ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-            if not ret:
-                continue
-            
-            frame_bytes = buffer.tobytes()
-            
-            # Multipart response
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-            
-        except Exception as e:
-            logger.error(f"Frame üretim hatası: {str(e)}")
-            break
+                try:
+                    with time_stage('db_lookup'):
+                        is_authorized = supabase_db.check_plate(plate_text)
+                    
+                    # Erişim logunu kaydet
+                    access_granted = is_authorized
+                    gate_action = 'open' if is_authorized else 'denied'
+                    
+                    with time_stage('log_write'):
+                        supabase_db.add_access_log(
+                            plate_text,
+                            truck['class_name'],
+                            gate_action,
+                            access_granted
+                        )
+                    
+                    if is_authorized:
+                        logger.info("✅ Erişim izni verildi: %s", plate_text,
+                                    extra={'camera': pipeline.camera_key, 'plate': plate_text,
+                                           'action': gate_action, 'audit': True})
+                    else:
+                        logger.warning("❌ Erişim reddedildi: %s", plate_text,
+                                       extra={'camera': pipeline.camera_key, 'plate': plate_text,
+                                           'action': gate_action, 'audit': True})
+                    
+                    # Son tespit sonucunu kameranın hattına kaydet
+                    pipeline.last_detection_result = {
+                        'camera_id': pipeline.camera_key,
+                        'plate_text': plate_text,
+                        'vehicle_type': truck['class_name'],
+                        'gate_action': gate_action,
+                        'is_authorized': is_authorized,
+                        'timestamp': datetime.now().isoformat(),
+                        'access_granted': access_granted
+                    }
+                    
+                    # Plaka sonucunu metaveri kanalına ekle
+                    pipeline.publish_plate_event({
+                        'track_id': truck.get('track_id'),
+                        'plate_text': plate_text,
+                        'gate_action': gate_action,
+                        'is_authorized': is_authorized
+                    })
+                    
+                    # Son tespit zamanını güncelle
+                    pipeline.last_plate_time = time.time()
+                    
+                except Exception as db_error:
+                    logger.error(f"Veritabanı işlem hatası: {str(db_error)}")
+                    
+            except Exception as e:
+                logger.error(f"Plaka işleme hatası: {str(e)}")
+    finally:
+        pipeline.plate_pending = False
+
+def _replica_staleness():
+    """Plaka kopyası hiç eşitlenmediyse (veya yoksa) -1"""
+    replica = supabase_db.replica if supabase_db else None
+    staleness = replica.staleness() if replica is not None else None
+    return -1 if staleness is None else staleness
+
+def create_app_state():
+    """
+    Sadece ana süreçte kurulan durum: kamera yöneticisi, plaka thread'i,
+    yanıt önbelleği, göstergeler ve bileşen yükleme
+
+    İşçi süreçler 'spawn' ile bu modülü __mp_main__ olarak yeniden import
+    eder; thread başlatan veya kaynak tutan her şey burada kurulur ki
+    işçilerde tekrar oluşmasın.
+    """
+    global camera_manager, plate_executor, response_cache
+    
+    logger.info("🚛 Araç Kapısı & Plaka Tespit Sistemi başlatılıyor...")
+    logger.info(f"Python sürümü: {os.sys.version}")
+    logger.info(f"Çalışma dizini: {os.getcwd()}")
+    
+    # Plaka okuma ve veritabanı işlemleri çıkarım thread'ini bekletmesin diye ayrı thread'de
+    plate_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='plate')
+    
+    # Okuma ağırlıklı uçların yanıtları (ETag ile 304)
+    response_cache = ResponseCache(DetectionConfig.HTTP_CACHE_MAX_ENTRIES)
+    
+    # Kameraları açan ve paylaşılan dedektörü aralarında adil zamanlayan yönetici
+    camera_manager = CameraManager(lambda: detector, on_detections=handle_detections)
+    
+    # İzleme açık başlatılabilir (kapalıyken span'ler boş context döndürür)
+    if DetectionConfig.TRACE_ENABLED:
+        tracer.start(DetectionConfig.TRACE_BUFFER_SIZE)
+    
+    # Okuma anında hesaplanan göstergeler (/metrics)
+    registry.gauge('gate_scheduler_queue_depth', 'Çıkarım kuyruğunda bekleyen frame sayısı',
+                   lambda: camera_manager.scheduler.depth())
+    registry.gauge('gate_plate_pending', 'Plaka okuması süren kamera sayısı',
+                   lambda: sum(1 for p in camera_manager.pipelines() if p.plate_pending))
+    registry.gauge('gate_preview_subscribers', 'Kamera başına önizleme izleyici sayısı',
+                   lambda: {p.camera_key: p.preview_subscribers() for p in camera_manager.pipelines()},
+                   label='camera')
+    registry.gauge('gate_worker_pending', 'İşçi süreçte sonucu beklenen iş sayısı',
+                   lambda: {name: component.pending()
+                            for name, component in (('vehicle_detector', detector), ('plate_reader', plate_reader))
+                            if hasattr(component, 'pending')},
+                   label='worker')
+    registry.gauge('gate_access_log_journal_pending', "Yerel günlükte Supabase'e gönderilmeyi bekleyen erişim logu",
+                   lambda: supabase_db.journal.stats()['pending'] if supabase_db and supabase_db.journal else 0)
+    registry.gauge('gate_plate_replica_staleness_seconds', 'Yerel plaka kopyasının son başarılı eşitlemeden bu yana yaşı',
+                   lambda: _replica_staleness())
+    registry.gauge('gate_camera_fps', 'Kamera başına yakalama FPS',
+                   lambda: {p.camera_key: round(p.fps, 2) for p in camera_manager.pipelines()},
+                   label='camera')
+    
+    start_background_loading()
+
+if __name__ != '__mp_main__':
+    create_app_state()
+
+def render_preview(pipeline, captured, renderer):
+    """Önizleme görüntüsünü hazırla ve sunucu tarafı çizimleri yap (encode thread'inde çalışır)"""
+    frame = captured.image
+    detections = pipeline.latest_detections if pipeline.detection_active else []
+    
+    # Önizlemeye çizilecekler (tam çözünürlük koordinatlarıyla)
+    overlay_texts = []
+    
+    if detections:
+        total_vehicles = len(detections)
+        stable_vehicles = len([d for d in detections if d.get('stability_count', 0) >= 3])
+        
+        info_text = f"Arac: {total_vehicles} | Kararli: {stable_vehicles}"
+        overlay_texts.append((info_text, (10, frame.shape[0] - 100), 0.7, (255, 255, 255), 2))
+    
+    # Son plaka sonucu birkaç saniye gösterilir
+    if pipeline.last_plate_event is not None:
+        plate, plate_time = pipeline.last_plate_event
+        if time.time() - plate_time <= PLATE_COOLDOWN:
+            if plate['is_authorized']:
+                overlay_texts.append((f"ERISIM IZNI VERILDI: {plate['plate_text']}",
+                                      (10, frame.shape[0] - 60), 1, (0, 255, 0), 3))
+            else:
+                overlay_texts.append((f"ERISIM REDDEDILDI: {plate['plate_text']}",
+                                      (10, frame.shape[0] - 60), 1, (0, 0, 255), 3))
+    
+    # FPS bilgisi
+    overlay_texts.append((f"FPS: {pipeline.fps:.1f}", (frame.shape[1] - 120, 30), 0.7, (0, 255, 0), 2))
+    
+    # Tespit durumu göstergesi
+    status_text = "GERCEK ZAMANLI TESPIT AKTIF" if pipeline.detection_active else "TESPIT PASIF"
+    status_color = (0, 255, 0) if pipeline.detection_active else (0, 0, 255)
+    overlay_texts.append((status_text, (10, 60), 0.8, status_color, 2))
+    
+    # Önizlemeyi bir kez küçült ve çizimleri küçük görüntüye yap
+    preview = renderer.prepare(frame)
+    if detections and detector is not None:
+        preview = detector.draw_detections(preview, renderer.scale_detections(detections))
+    for text, org, font_scale, color, thickness in overlay_texts:
+        renderer.put_text(preview, text, org, font_scale, color, thickness)
+    
+    return preview
+
+def render_plain_preview(pipeline, captured, renderer):
+    """Çizimsiz önizleme (kutular istemcide çizilir); sadece küçült"""
+    return renderer.prepare(captured.image)
+
+def generate_frames(pipeline, preview_width=None, jpeg_quality=None, server_overlay=True):
+    """
+    Video stream için frame üret
+    
+    Encode işi kameranın paylaşılan önizleme aşamasında (thread havuzu)
+    yapılır; aynı ayarla izleyen istemciler aynı JPEG'i alır. server_overlay
+    False ise ve kamera MJPEG veriyorsa kameranın JPEG baytları yeniden
+    encode edilmeden iletilir.
+    """
+    stream = pipeline.preview_stream(render_preview if server_overlay else render_plain_preview,
+                                     preview_width, jpeg_quality, server_overlay)
+    
+    try:
+        for frame_seq, frame_bytes in stream.frames():
+            # Multipart response (X-Frame-Seq metaveri kaydıyla eşleşir); JPEG
+            # baytları başlıkla birleştirilip kopyalanmadan ayrı parça olarak yazılır
+            # Span istemcinin frame'i alma süresini de kapsar (yavaş istemci görünür)
+            with span('generate_frames', 'preview', camera=pipeline.camera_key, seq=frame_seq):
+                yield (b'--frame\r\n'
+                       b'Content-Type: image/jpeg\r\n'
+                       b'X-Frame-Seq: ' + str(frame_seq).encode() + b'\r\n\r\n')
+                yield frame_bytes
+                yield b'\r\n'
+    except Exception as e:
+        logger.error(f"Frame üretim hatası: {str(e)}")
+
+def _component_health(name):
+    """Bileşen durumunu sağlık kontrolü formatına çevir"""
+    state = loader.state(name)
+    if state == STATE_READY:
+        return 'ok'
+    if state == STATE_ERROR:
+        return 'error'
+    return 'loading'
+
+def _supabase_health():
+    """Veritabanı durumu; devre kesici açıksa yerel yedekle çalışıldığını belirt"""
+    health = _component_health('supabase_db')
+    if health == 'ok' and supabase_db is not None and supabase_db.circuit.state != 'closed':
+        return 'degraded'
+    return health
+
+def _stream_options():
+    """Stream sorgu parametrelerini oku"""
+    # Önizleme çözünürlüğü ve kalitesi stream başına ayarlanabilir
+    # (ör. /api/cameras/1/stream?width=480&quality=60)
+    preview_width = request.args.get('width', type=int)
+    jpeg_quality = request.args.get('quality', type=int)
+    
+    # overlay=0 ile sunucu tarafı çizim kapatılır (MJPEG kamerada doğrudan geçiş)
+    server_overlay = request.args.get('overlay', default=DetectionConfig.STREAM_SERVER_OVERLAY,
+                                      type=lambda v: v.lower() not in ('0', 'false', 'no'))
+    return preview_width, jpeg_quality, server_overlay
+
+def _start_camera(cam_id, source=None, priority=0, weight=1.0):
+    """Kamerayı başlat ve JSON yanıtı döndür"""
+    logger.info(f"🎥 Kamera {cam_id} başlatılıyor...")
+    
+    pipeline = camera_manager.start_camera(cam_id, source=source, priority=priority, weight=weight)
+    if pipeline is None:
+        return jsonify({
+            'success': False,
+            'message': f'Kamera {cam_id} başlatılamadı'
+        }), 500
+    
+    return jsonify({
+        'success': True,
+        'message': f'Kamera {cam_id} başlatıldı',
+        'camera_id': cam_id,
+        'camera': pipeline.status()
+    })
+
+def _set_detection(cam_id, active):
+    """Kameranın gerçek zamanlı tespitini aç/kapat ve JSON yanıtı döndür"""
+    pipeline = camera_manager.get(cam_id)
+    
+    if active:
+        if pipeline is None or not pipeline.active:
+            return jsonify({
+                'success': False,
+                'message': 'Önce kamerayı başlatın'
+            }), 400
+        
+        # Modeller hâlâ yükleniyorsa tespit açılır ama frame'ler hazır olana kadar işlenmez
+        models_ready = loader.is_ready('vehicle_detector') and loader.is_ready('plate_reader')
+        pipeline.set_detection(True)
+        
+        return jsonify({
+            'success': True,
+            'message': 'Gerçek zamanlı tespit başlatıldı' if models_ready
+                       else 'Gerçek zamanlı tespit başlatıldı (modeller yükleniyor)',
+            'models_ready': models_ready
+        })
+    
+    if pipeline is not None:
+        pipeline.set_detection(False)
+    
+    return jsonify({
+        'success': True,
+        'message': 'Gerçek zamanlı tespit durduruldu'
+    })
+
+def _camera_stream(cam_id):
+    """Kameranın MJPEG stream yanıtı (kamera kapalıysa başlatılır)"""
+    pipeline = camera_manager.get(cam_id)
+    
+    if pipeline is None or not pipeline.active:
+        # Kamera aktif değilse başlat
+        pipeline = camera_manager.start_camera(cam_id)
+        if pipeline is None:
+            return "Kamera başlatılamadı", 500
+    
+    return Response(generate_frames(pipeline, *_stream_options()),
+                   mimetype='multipart/x-mixed-replace; boundary=frame')
+
+def _metadata_stream(cam_id):
+    """Kameranın tespit metaverisi (Server-Sent Events)"""
+    pipeline = camera_manager.get(cam_id)
+    if pipeline is None:
+        return jsonify({'error': f'Kamera {cam_id} aktif değil'}), 404
+    
+    return Response(pipeline.metadata.subscribe(),
+                   mimetype='text/event-stream',
+                   headers={
+                       'Cache-Control': 'no-cache',
+                       'X-Accel-Buffering': 'no'
+                   })
+
+def _latest_detection(cam_id):
+    """Kameranın en son plaka sonucunu döndür ve sıfırla (bir kez göster)"""
+    pipeline = camera_manager.get(cam_id)
+    
+    if pipeline is None or pipeline.last_detection_result is None:
+        return jsonify({
+            'has_result': False,
+            'message': 'Henüz tespit yapılmadı'
+        })
+    
+    result = pipeline.last_detection_result
+    pipeline.last_detection_result = None
+    
+    return jsonify({
+        'has_result': True,
+        'result': result
+    })
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """API sağlık kontrolü"""
-    logger.info("Sağlık kontrolü istendi")
+    """API sağlık kontrolü (HEALTH_CACHE_TTL boyunca aynı yanıt, ETag ile 304)"""
+    return response_cache.respond('health', _build_health, ttl=DetectionConfig.HEALTH_CACHE_TTL)
+
+def _build_health():
+    pipeline = camera_manager.get(camera_id)
+    cameras = camera_manager.status()
     
     health_status = {
         'status': 'healthy',
         'message': 'Araç Kapısı API çalışıyor',
         'timestamp': datetime.now().isoformat(),
         'components': {
-            'vehicle_detector': 'ok' if 'detector' in globals() else 'error',
-            'plate_reader': 'ok' if 'plate_reader' in globals() else 'error',
-            'supabase_db': 'ok' if supabase_db is not None else 'error',
-            'camera': 'active' if camera_active else 'inactive'
+            'vehicle_detector': _component_health('vehicle_detector'),
+            'plate_reader': _component_health('plate_reader'),
+            'supabase_db': _supabase_health(),
+            'camera': 'active' if any(c['active'] for c in cameras['cameras']) else 'inactive'
         },
         'camera_info': {
             'id': camera_id,
-            'active': camera_active,
-            'detection_active': detection_active
-        }
+            'active': pipeline is not None and pipeline.active,
+            'detection_active': pipeline is not None and pipeline.detection_active
+        },
+        'cameras': cameras,
+        'database': supabase_db.status() if supabase_db else None,
+        'http_cache': response_cache.status()
     }
     
-    logger.info(f"Sağlık durumu: {health_status}")
-    return jsonify(health_status)
+    logger.debug("Sağlık durumu: %s", health_status)
+    return health_status
 
-@app.route('/api/camera/list', methods=['GET'])
-def list_cameras():
-    """Mevcut kameraları listele"""
-    logger.info("📹 Kamera listesi istendi")
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metin formatında hat metrikleri"""
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/trace/start', methods=['POST'])
+def start_trace():
+    """Frame/takip izlemeyi başlat (tampon temizlenir)"""
+    data = request.get_json(silent=True) or {}
+    try:
+        capacity = int(data.get('buffer_size') or DetectionConfig.TRACE_BUFFER_SIZE)
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'message': 'Geçersiz buffer_size'}), 400
+    
+    tracer.start(max(1000, capacity))
+    logger.info(f"🔬 İzleme başlatıldı (tampon: {tracer.capacity} olay)")
+    return jsonify({'success': True, 'trace': tracer.status()})
+
+@app.route('/api/trace/stop', methods=['POST'])
+def stop_trace():
+    """İzlemeyi durdur; kayıtlar /api/trace ile indirilebilir"""
+    tracer.stop()
+    logger.info("🔬 İzleme durduruldu")
+    return jsonify({'success': True, 'trace': tracer.status()})
+
+@app.route('/api/trace', methods=['GET'])
+def dump_trace():
+    """Halka tampondaki span'leri Chrome trace JSON'u olarak indir (chrome://tracing, Perfetto)"""
+    response = jsonify(tracer.export())
+    response.headers['Content-Disposition'] = (
+        f"attachment; filename=trace-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    return response
+
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """Bileşenlerin yüklenme durumunu raporla (hepsi hazırsa 200, değilse 503)"""
+    ready = loader.all_ready()
+    
+    return jsonify({
+        'ready': ready,
+        'timestamp': datetime.now().isoformat(),
+        'components': loader.status()
+    }), 200 if ready else 503
+
+@app.route('/api/cameras', methods=['GET'])
+def get_cameras():
+    """Çalışan kamera hatlarını ve paylaşılan çıkarım kuyruğunu listele"""
+    return jsonify(camera_manager.status())
+
+@app.route('/api/cameras/<cam_id>/start', methods=['POST'])
+def start_camera_pipeline(cam_id):
+    """Kamerayı başlat (isteğe bağlı kaynak, öncelik ve ağırlıkla)"""
+    logger.info(f"🎥 Kamera {cam_id} başlatma isteği")
     
     try:
-        cameras = detector.list_available_cameras()
+        data = request.get_json(silent=True) or {}
+        return _start_camera(cam_id,
+                             source=data.get('source'),
+                             priority=int(data.get('priority', 0)),
+                             weight=float(data.get('weight', 1.0)))
+    except Exception as e:
+        logger.error(f"❌ Kamera başlatma hatası: {str(e)}")
+        return jsonify({'error': 'Kamera başlatma başarısız'}), 500
+
+@app.route('/api/cameras/<cam_id>/stop', methods=['POST'])
+def stop_camera_pipeline(cam_id):
+    """Kamerayı durdur"""
+    logger.info(f"🛑 Kamera {cam_id} durdurma isteği")
+    
+    try:
+        camera_manager.stop_camera(cam_id)
         return jsonify({
-            'cameras': cameras,
-            'current_camera': camera_id,
-            'camera_active': camera_active
+            'success': True,
+            'message': f'Kamera {cam_id} durduruldu'
         })
+    except Exception as e:
+        logger.error(f"❌ Kamera durdurma hatası: {str(e)}")
+        return jsonify({'error': 'Kamera durdurma başarısız'}), 500
+
+@app.route('/api/cameras/<cam_id>/stream')
+def camera_pipeline_stream(cam_id):
+    """Kamera stream endpoint'i"""
+    return _camera_stream(cam_id)
+
+@app.route('/api/cameras/<cam_id>/detection/start', methods=['POST'])
+def start_camera_detection(cam_id):
+    """Kamerada gerçek zamanlı tespiti başlat"""
+    logger.info(f"🎯 Kamera {cam_id} gerçek zamanlı tespit başlatılıyor")
+    
+    try:
+        return _set_detection(cam_id, True)
+    except Exception as e:
+        logger.error(f"❌ Tespit başlatma hatası: {str(e)}")
+        return jsonify({'error': 'Tespit başlatma başarısız'}), 500
+
+@app.route('/api/cameras/<cam_id>/detection/stop', methods=['POST'])
+def stop_camera_detection(cam_id):
+    """Kamerada gerçek zamanlı tespiti durdur"""
+    logger.info(f"🛑 Kamera {cam_id} gerçek zamanlı tespit durdurma isteği")
+    
+    try:
+        return _set_detection(cam_id, False)
+    except Exception as e:
+        logger.error(f"❌ Tespit durdurma hatası: {str(e)}")
+        return jsonify({'error': 'Tespit durdurma başarısız'}), 500
+
+@app.route('/api/cameras/<cam_id>/metadata')
+def camera_metadata_stream(cam_id):
+    """Kameranın frame başına tespit metaverisi (Server-Sent Events)"""
+    return _metadata_stream(cam_id)
+
+@app.route('/api/cameras/<cam_id>/detection/latest', methods=['GET'])
+def get_camera_latest_detection(cam_id):
+    """Kameranın en son tespit sonucunu döndür"""
+    return _latest_detection(cam_id)
+
+@app.route('/api/camera/list', methods=['GET'])
+def list_cameras():
+    """
+    Mevcut kameraları listele
+    
+    Cihaz taraması pahalı olduğu için CAMERA_LIST_CACHE_TTL boyunca yeniden
+    kullanılır; kamera başlatılıp durdurulunca liste hemen yenilenir.
+    """
+    try:
+        active_cameras = [p.camera_key for p in camera_manager.pipelines() if p.active]
+        return response_cache.respond('camera_list', _build_camera_list,
+                                      version=(camera_id, tuple(active_cameras)),
+                                      ttl=DetectionConfig.CAMERA_LIST_CACHE_TTL)
     except Exception as e:
         logger.error(f"❌ Kamera listeleme hatası: {str(e)}")
         return jsonify({'error': 'Kamera listeleme başarısız'}), 500
 
+def _build_camera_list():
+    logger.info("📹 Kameralar taranıyor")
+    cameras = list_available_cameras()
+    pipeline = camera_manager.get(camera_id)
+    return {
+        'cameras': cameras,
+        'current_camera': camera_id,
+        'camera_active': pipeline is not None and pipeline.active,
+        'active_cameras': [p.camera_key for p in camera_manager.pipelines() if p.active]
+    }
+
 @app.route('/api/camera/start', methods=['POST'])
 def start_camera():
-    """Kamerayı başlat"""
+    """Kamerayı başlat (tek kameralı eski API)"""
+    global camera_id
+    
     logger.info("🎥 Kamera başlatma isteği")
     
     try:
         data = request.get_json()
         cam_id = data.get('camera_id', 1)
         
-        if init_camera(cam_id):
-            return jsonify({
-                'success': True,
-                'message': f'Kamera {cam_id} başlatıldı',
-                'camera_id': cam_id
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'message': f'Kamera {cam_id} başlatılamadı'
-            }), 500
+        # Önceki varsayılan kamera kapatılır (tek kamera davranışı)
+        if str(cam_id) != str(camera_id):
+            camera_manager.stop_camera(camera_id)
+        camera_id = cam_id
+        
+        return _start_camera(cam_id)
             
     except Exception as e:
         logger.error(f"❌ Kamera başlatma hatası: {str(e)}")
@@ -341,18 +693,11 @@ def start_camera():
 
 @app.route('/api/camera/stop', methods=['POST'])
 def stop_camera():
-    """Kamerayı durdur"""
-    global camera, camera_active, detection_active
-    
+    """Kamerayı durdur (tek kameralı eski API)"""
     logger.info("🛑 Kamera durdurma isteği")
     
     try:
-        camera_active = False
-        detection_active = False
-        
-        if camera is not None:
-            camera.release()
-            camera = None
+        camera_manager.stop_camera(camera_id)
         
         return jsonify({
             'success': True,
@@ -365,99 +710,222 @@ def stop_camera():
 
 @app.route('/api/camera/stream')
 def camera_stream():
-    """Kamera stream endpoint'i"""
-    global camera_active
-    
-    if not camera_active:
-        # Kamera aktif değilse başlat
-        if not init_camera(camera_id):
-            return "Kamera başlatılamadı", 500
-    
-    return Response(generate_frames(),
-                   mimetype='multipart/x-mixed-replace; boundary=frame')
+    """Kamera stream endpoint'i (tek kameralı eski API)"""
+    return _camera_stream(camera_id)
 
 @app.route('/api/detection/start', methods=['POST'])
 def start_detection():
-    """Gerçek zamanlı tespiti başlat"""
-    global detection_active
-    
+    """Gerçek zamanlı tespiti başlat (tek kameralı eski API)"""
     logger.info("🎯 Gerçek zamanlı tespit başlatılıyor")
     
     try:
-        if not camera_active:
-            return jsonify({
-                'success': False,
-                'message': 'Önce kamerayı başlatın'
-            }), 400
-        
-        detection_active = True
-        
-        return jsonify({
-            'success': True,
-            'message': 'Gerçek zamanlı tespit başlatıldı'
-        })
-        
+        return _set_detection(camera_id, True)
     except Exception as e:
         logger.error(f"❌ Tespit başlatma hatası: {str(e)}")
         return jsonify({'error': 'Tespit başlatma başarısız'}), 500
 
 @app.route('/api/detection/stop', methods=['POST'])
 def stop_detection():
-    """Gerçek zamanlı tespiti durdur"""
-    global detection_active
-    
+    """Gerçek zamanlı tespiti durdur (tek kameralı eski API)"""
     logger.info("🛑 Gerçek zamanlı tespit durdurma isteği")
     
     try:
-        detection_active = False
-        
-        return jsonify({
-            'success': True,
-            'message': 'Gerçek zamanlı tespit durduruldu'
-        })
-        
+        return _set_detection(camera_id, False)
     except Exception as e:
         logger.error(f"❌ Tespit durdurma hatası: {str(e)}")
         return jsonify({'error': 'Tespit durdurma başarısız'}), 500
 
+@app.route('/api/detection/metadata')
+def detection_metadata_stream():
+    """Frame başına tespit metaverisi (tek kameralı eski API)"""
+    return _metadata_stream(camera_id)
+
 @app.route('/api/detection/latest', methods=['GET'])
 def get_latest_detection():
-    """En son tespit sonucunu döndür"""
-    global last_detection_result
-    
-    if last_detection_result is None:
-        return jsonify({
-            'has_result': False,
-            'message': 'Henüz tespit yapılmadı'
-        })
-    
-    # Sonucu döndür ve sıfırla (bir kez göster)
-    result = last_detection_result.copy()
-    last_detection_result = None
-    
-    return jsonify({
-        'has_result': True,
-        'result': result
-    })
+    """En son tespit sonucunu döndür (tek kameralı eski API)"""
+    return _latest_detection(camera_id)
+
+def _page_limit():
+    """?limit= parametresini [1, LIST_MAX_PAGE_SIZE] aralığında oku"""
+    try:
+        limit = int(request.args.get('limit', DetectionConfig.LIST_PAGE_SIZE))
+    except ValueError:
+        raise ValueError('limit sayı olmalı')
+    return max(1, min(limit, DetectionConfig.LIST_MAX_PAGE_SIZE))
+
+def _time_arg(name):
+    """ISO 8601 zaman parametresini doğrula (yoksa None)"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f'{name} ISO 8601 zaman olmalı')
+    return value
 
 @app.route('/api/plates', methods=['GET'])
 def get_plates():
-    """Kayıtlı plakaları getir"""
-    logger.info("📋 Plaka listesi istendi")
+    """
+    Kayıtlı plakaları sayfa sayfa getir
+    
+    Parametreler: limit, cursor (önceki yanıtın next_cursor'ı), q (plaka
+    öneki), fields (virgülle ayrılmış sütunlar)
+    
+    Yanıtlar plaka listesi sürümüne bağlı önbellekten verilir. Başka
+    cihazlardan yapılan değişiklikler sürümü ancak yerel kopya eşitlenince
+    artırdığından kayıt en fazla PLATES_CACHE_TTL saniye kullanılır; yerel
+    kopya yoksa yanıt her istekte üretilir (ETag ile 304 yine geçerli).
+    """
+    logger.debug("📋 Plaka listesi istendi")
     
     try:
         if not supabase_db:
-            logger.error("❌ Supabase bağlantısı yok")
-            return jsonify({'error': 'Veritabanı bağlantısı yok'}), 500
-            
-        plates = supabase_db.get_all_plates()
-        logger.info(f"📋 {len(plates)} plaka bulundu")
-        return jsonify({'plates': plates})
+            return db_unavailable_response()
+        
+        try:
+            limit = _page_limit()
+            # Sürüm sorgudan önce okunur; üretim sırasında gelen değişiklik sonraki istekte görünür
+            version, modified_at = supabase_db.plates_version, supabase_db.plates_modified_at
+            replica = supabase_db.replica
+            ttl = DetectionConfig.PLATES_CACHE_TTL if replica is not None and replica.ready else 0
+            return response_cache.respond(request_key('plates'), lambda: _build_plates_page(limit),
+                                          version=version, ttl=ttl, last_modified=modified_at)
+        except (ValueError, InvalidCursorError) as e:
+            return jsonify({'error': 'Geçersiz listeleme parametresi', 'details': str(e)}), 400
     except Exception as e:
         logger.error(f"❌ Plaka getirme hatası: {str(e)}")
         logger.error(traceback.format_exc())
         return jsonify({'error': 'Plakalar getirilemedi', 'details': str(e)}), 500
 
+def _build_plates_page(limit):
+    page = supabase_db.list_plates(limit=limit, cursor=request.args.get('cursor'),
+                                   prefix=request.args.get('q'), fields=request.args.get('fields'))
+    return {
+        'plates': page['items'],
+        'next_cursor': page['next_cursor'],
+        'has_more': page['has_more'],
+        'source': page['source']
+    }
+
+@app.route('/api/access-logs', methods=['GET'])
+def get_access_logs():
+    """
+    Erişim loglarını sayfa sayfa getir
+    
+    Parametreler: limit, cursor, plate (plaka öneki), action (open/denied),
+    since/until (ISO 8601; since dahil, until hariç), fields
+    """
+    try:
+        if not supabase_db:
+            return db_unavailable_response()
+        
+        action = request.args.get('action')
+        if action and action not in ('open', 'denied'):
+            return jsonify({'error': "action 'open' veya 'denied' olmalı"}), 400
+        
+        try:
+            page = supabase_db.list_access_logs(
+                limit=_page_limit(), cursor=request.args.get('cursor'),
+                plate_prefix=request.args.get('plate'), action=action,
+                since=_time_arg('since'), until=_time_arg('until'), fields=request.args.get('fields'))
+        except (ValueError, InvalidCursorError) as e:
+            return jsonify({'error': 'Geçersiz listeleme parametresi', 'details': str(e)}), 400
+        
+        return jsonify({
+            'logs': page['items'],
+            'next_cursor': page['next_cursor'],
+            'has_more': page['has_more'],
+            'source': page['source']
+        })
+    except Exception as e:
+        logger.error(f"❌ Erişim logları getirme hatası: {str(e)}")
+        logger.error(traceback.format_exc())
+        return jsonify({'error': 'Erişim logları getirilemedi', 'details': str(e)}), 500
+
+@app.route('/api/access-logs/export', methods=['GET'])
+def export_access_logs():
+    """
+    Erişim loglarını CSV veya Parquet olarak akış halinde indir
+    
+    Parametreler: format (csv/parquet), since/until (ISO 8601), plate, action,
+    fields. Loglar keyset ile sayfa sayfa okunup parça parça gönderilir;
+    aralık ne kadar büyük olursa olsun bellekte tek sayfa tutulur.
+    """
+    try:
+        if not supabase_db:
+            return db_unavailable_response()
+        
+        file_format = request.args.get('format', 'csv')
+        if file_format not in FORMATS:
+            return jsonify({'error': "format 'csv' veya 'parquet' olmalı"}), 400
+        action = request.args.get('action')
+        if action and action not in ('open', 'denied'):
+            return jsonify({'error': "action 'open' veya 'denied' olmalı"}), 400
+        
+        try:
+            since, until = _time_arg('since'), _time_arg('until')
+        except ValueError as e:
+            return jsonify({'error': 'Geçersiz dışa aktarma parametresi', 'details': str(e)}), 400
+        
+        columns = select_columns(request.args.get('fields'), ACCESS_LOG_COLUMNS, ('id', 'timestamp'))
+        pages = supabase_db.iter_access_logs(since, until, DetectionConfig.EXPORT_PAGE_SIZE, columns,
+                                             plate_prefix=request.args.get('plate'), action=action)
+        
+        # İlk sayfa yanıt başlamadan okunur; veritabanı hatası akış ortasında değil 500 olarak döner
+        first_page = next(pages, None)
+        
+        def all_pages():
+            if first_page is not None:
+                yield first_page
+                yield from pages
+        
+        chunks = export_chunks(all_pages(), columns, file_format, DetectionConfig.EXPORT_PARQUET_ROW_GROUP_ROWS)
+        
+        mimetype, extension = FORMATS[file_format]
+        filename = f"access_logs-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{extension}"
+        logger.info(f"📤 Erişim logları dışa aktarılıyor ({file_format}, {since or 'başlangıç'} - {until or 'şimdi'})")
+        
+        return Response(stream_with_context(chunks), mimetype=mimetype,
+                        headers={'Content-Disposition': f'attachment; filename={filename}'})
+    except Exception as e:
+        logger.error(f"❌ Erişim logları dışa aktarma hatası: {str(e)}")
+        logger.error(traceback.format_exc())
+        return jsonify({'error': 'Erişim logları dışa aktarılamadı', 'details': str(e)}), 500
+
+@app.route('/api/stats', methods=['GET'])
+def get_access_stats():
+    """
+    Erişim istatistikleri (saatlik özet tablosundan, tek sorgu)
+    
+    Parametreler: bucket (hour/day), since/until (ISO 8601; varsayılan son
+    STATS_DEFAULT_HOURS saat veya STATS_DEFAULT_DAYS gün), top
+    """
+    try:
+        if not supabase_db:
+            return db_unavailable_response()
+        
+        bucket = request.args.get('bucket', 'hour')
+        if bucket not in ('hour', 'day'):
+            return jsonify({'error': "bucket 'hour' veya 'day' olmalı"}), 400
+        
+        try:
+            until = _time_arg('until') or datetime.now().isoformat(timespec='seconds')
+            default_range = (timedelta(hours=DetectionConfig.STATS_DEFAULT_HOURS) if bucket == 'hour'
+                             else timedelta(days=DetectionConfig.STATS_DEFAULT_DAYS))
+            since = _time_arg('since') or (datetime.now() - default_range).isoformat(timespec='seconds')
+            top = max(1, min(int(request.args.get('top', DetectionConfig.STATS_TOP_PLATES)), 100))
+        except ValueError as e:
+            return jsonify({'error': 'Geçersiz istatistik parametresi', 'details': str(e)}), 400
+        
+        with time_stage('db_stats'):
+            stats = supabase_db.get_access_stats(since, until, bucket, top)
+        return jsonify(stats)
+    except Exception as e:
+        logger.error(f"❌ Erişim istatistikleri hatası: {str(e)}")
+        logger.error(traceback.format_exc())
+        return jsonify({'error': 'İstatistikler getirilemedi', 'details': str(e)}), 500
+
 @app.route('/api/plates', methods=['POST'])
 def add_plate():
     """Yeni plaka ekle"""
@@ -465,8 +933,7 @@ def add_plate():
     
     try:
         if not supabase_db:
-            logger.error("❌ Supabase bağlantısı yok")
-            return jsonify({'error': 'Veritabanı bağlantısı yok'}), 500
+            return db_unavailable_response()
             
         data = request.get_json()
         logger.info(f"📥 Gelen veri: {data}")
@@ -475,13 +942,13 @@ def add_plate():
             logger.error("❌ Plaka numarası eksik")
             return jsonify({'error': 'Plaka numarası gerekli'}), 400
         
-        plate_number = data['plate_number'].upper().strip()
+        plate_number, error = normalize_plate(data['plate_number'])
         logger.info(f"🔤 İşlenmiş plaka: {plate_number}")
         
         # Plaka formatını kontrol et (basit kontrol)
-        if len(plate_number) < 5:
-            logger.error(f"❌ Geçersiz plaka formatı: {plate_number}")
-            return jsonify({'error': 'Geçersiz plaka formatı'}), 400
+        if error:
+            logger.error(f"❌ Geçersiz plaka formatı: {data['plate_number']}")
+            return jsonify({'error': error}), 400
         
         logger.info(f"💾 Plaka veritabanına ekleniyor: {plate_number}")
         result = supabase_db.add_plate(plate_number)
@@ -501,6 +968,89 @@ def add_plate():
         logger.error(traceback.format_exc())
         return jsonify({'error': 'Plaka ekleme başarısız', 'details': str(e)}), 500
 
+def _read_import_rows():
+    """
+    Toplu içe aktarma isteğinden ham plaka değerlerini oku
+    
+    JSON: ["34ABC123", ...], {"plates": [...]} veya [{"plate_number": ...}, ...]
+    CSV: gövde (text/csv) veya multipart 'file'; başlıkta plate_number sütunu
+    varsa o, yoksa ilk sütun kullanılır.
+    """
+    if request.is_json:
+        data = request.get_json(silent=True)
+        items = data.get('plates') if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            raise ValueError('JSON gövdesi liste veya {"plates": [...]} olmalı')
+        return [item.get('plate_number') if isinstance(item, dict) else item for item in items]
+    
+    upload = request.files.get('file')
+    text = upload.read().decode('utf-8-sig') if upload else request.get_data(as_text=True)
+    rows = [row for row in csv.reader(io.StringIO(text)) if row and any(cell.strip() for cell in row)]
+    if not rows:
+        return []
+    
+    header = [cell.strip().lower() for cell in rows[0]]
+    if 'plate_number' in header:
+        column = header.index('plate_number')
+        rows = rows[1:]
+    else:
+        column = 0
+    return [row[column] if column < len(row) else '' for row in rows]
+
+@app.route('/api/plates/bulk', methods=['POST'])
+def import_plates():
+    """Plakaları toplu içe aktar (CSV/JSON); satır başına sonuç döndürür"""
+    try:
+        if not supabase_db:
+            return db_unavailable_response()
+        
+        try:
+            values = _read_import_rows()
+        except (ValueError, UnicodeDecodeError) as e:
+            return jsonify({'error': 'Geçersiz içe aktarma verisi', 'details': str(e)}), 400
+        
+        if len(values) > DetectionConfig.PLATE_IMPORT_MAX_ROWS:
+            return jsonify({'error': f'En fazla {DetectionConfig.PLATE_IMPORT_MAX_ROWS} satır içe aktarılabilir'}), 413
+        
+        # Doğrulama ve normalizasyon bellekte; veritabanına sadece geçerli, tekrarsız plakalar gider
+        results = []
+        seen = set()
+        plates = []
+        for row, value in enumerate(values, start=1):
+            plate_number, error = normalize_plate(value)
+            result = {'row': row, 'input': value, 'plate_number': plate_number}
+            if error:
+                result.update(status='invalid', error=error)
+            elif plate_number in seen:
+                result['status'] = 'duplicate'
+            else:
+                seen.add(plate_number)
+                plates.append(plate_number)
+            results.append(result)
+        
+        outcome = supabase_db.add_plates(plates, DetectionConfig.PLATE_IMPORT_CHUNK_SIZE) if plates else {}
+        
+        summary = {'total': len(results), 'added': 0, 'exists': 0, 'duplicate': 0, 'invalid': 0, 'error': 0}
+        for result in results:
+            if 'status' not in result:
+                status, error = outcome[result['plate_number']]
+                result['status'] = status
+                if error:
+                    result['error'] = error
+            summary[result['status']] += 1
+        
+        logger.info(f"📥 Toplu plaka içe aktarma: {summary}")
+        return jsonify({
+            'success': summary['error'] == 0,
+            'summary': summary,
+            'results': results
+        })
+        
+    except Exception as e:
+        logger.error(f"❌ Toplu plaka içe aktarma hatası: {str(e)}")
+        logger.error(traceback.format_exc())
+        return jsonify({'error': 'Toplu plaka içe aktarma başarısız', 'details': str(e)}), 500
+
 @app.route('/api/plates/<plate_id>', methods=['DELETE'])
 def delete_plate(plate_id):
     """Plaka sil"""
@@ -508,8 +1058,7 @@ def delete_plate(plate_id):
     
     try:
         if not supabase_db:
-            logger.error("❌ Supabase bağlantısı yok")
-            return jsonify({'error': 'Veritabanı bağlantısı yok'}), 500
+            return db_unavailable_response()
             
         result = supabase_db.delete_plate(plate_id)
         
@@ -530,24 +1079,32 @@ def delete_plate(plate_id):
 
 @app.route('/api/check-plate', methods=['POST'])
 def check_plate():
-    """Plaka kontrolü yap"""
-    logger.info("🔍 Plaka kontrol isteği")
+    """
+    Plaka kontrolü yap
+    
+    Plaka eklenirken kullanılan ortak biçime getirilir (normalize_plate);
+    biçimi geçersizse 400 döner. Eski yazımlarla kaydedilmiş plakalar
+    docs/migrations/002_normalize_plate_numbers.sql ile bu biçime getirilir.
+    """
+    logger.debug("🔍 Plaka kontrol isteği")
     
     try:
         if not supabase_db:
-            logger.error("❌ Supabase bağlantısı yok")
-            return jsonify({'error': 'Veritabanı bağlantısı yok'}), 500
+            return db_unavailable_response()
             
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         if 'plate_number' not in data:
             logger.error("❌ Plaka numarası eksik")
             return jsonify({'error': 'Plaka numarası gerekli'}), 400
         
-        plate_number = data['plate_number'].upper().strip()
-        logger.info(f"🔍 Kontrol edilen plaka: {plate_number}")
+        plate_number, error = normalize_plate(data['plate_number'])
+        if error:
+            return jsonify({'error': error}), 400
+        logger.debug("🔍 Kontrol edilen plaka: %s", plate_number)
         
         is_authorized = supabase_db.check_plate(plate_number)
-        logger.info(f"🔐 Plaka yetki durumu: {is_authorized}")
+        logger.info("🔐 Plaka yetki durumu: %s - %s", plate_number, is_authorized,
+                    extra={'plate': plate_number, 'authorized': is_authorized, 'audit': True})
         
         return jsonify({
             'plate_number': plate_number,
@@ -561,6 +1118,60 @@ def check_plate():
         logger.error(traceback.format_exc())
         return jsonify({'error': 'Plaka kontrolü başarısız', 'details': str(e)}), 500
 
+@app.route('/api/check-plates', methods=['POST'])
+def check_plates():
+    """
+    Birden çok plakayı tek istekte kontrol et
+    
+    Gövde: {"plates": ["34ABC123", ...]} veya doğrudan liste. Plakalar tek
+    kontrolle aynı şekilde normalize edilir; sonuçlar giriş sırasıyla döner.
+    """
+    try:
+        if not supabase_db:
+            return db_unavailable_response()
+        
+        data = request.get_json(silent=True)
+        values = data.get('plates') if isinstance(data, dict) else data
+        if not isinstance(values, list):
+            return jsonify({'error': 'JSON gövdesi liste veya {"plates": [...]} olmalı'}), 400
+        if len(values) > DetectionConfig.PLATE_CHECK_MAX_BATCH:
+            return jsonify({'error': f'En fazla {DetectionConfig.PLATE_CHECK_MAX_BATCH} plaka kontrol edilebilir'}), 413
+        
+        normalized = [normalize_plate(value) for value in values]
+        unique_plates = list(dict.fromkeys(plate for plate, error in normalized if plate))
+        
+        with time_stage('db_batch_lookup'):
+            authorized = supabase_db.check_plates(unique_plates) if unique_plates else set()
+        
+        results = []
+        for value, (plate_number, error) in zip(values, normalized):
+            if error:
+                results.append({'input': value, 'status': 'invalid', 'error': error})
+                continue
+            is_authorized = plate_number in authorized
+            results.append({
+                'input': value,
+                'plate_number': plate_number,
+                'status': 'ok',
+                'authorized': is_authorized,
+                'gate_action': 'open' if is_authorized else 'denied'
+            })
+        
+        return jsonify({
+            'summary': {
+                'total': len(values),
+                'authorized': sum(1 for r in results if r.get('authorized')),
+                'unauthorized': sum(1 for r in results if r['status'] == 'ok' and not r['authorized']),
+                'invalid': sum(1 for r in results if r['status'] == 'invalid')
+            },
+            'results': results
+        })
+        
+    except Exception as e:
+        logger.error(f"❌ Toplu plaka kontrol hatası: {str(e)}")
+        logger.error(traceback.format_exc())
+        return jsonify({'error': 'Toplu plaka kontrolü başarısız', 'details': str(e)}), 500
+
 if __name__ == '__main__':
     logger.info("🚀 Flask sunucusu başlatılıyor...")
     logger.info("📍 Backend: http://localhost:5001")
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Erişim Logu Arşivleme Scripti
+
+access_logs aylık bölümlenmiştir. Bu script ileriki aylar için bölümleri
+hazırlar, saklama süresini aşmış bölümleri sıkıştırılmış CSV olarak
+arşivler ve satır sayısı doğrulandıktan sonra bölümü veritabanından siler.
+Saatlik özet (access_log_hourly) silinmez; istatistikler korunur.
+
+Kullanım (backend dizininde, örn. her gece cron ile):
+    python archive_access_logs.py                  # ACCESS_LOG_RETENTION_MONTHS
+    python archive_access_logs.py --retention-months 6 --dry-run
+"""
+
+import sys
+import os
+import argparse
+import gzip
+import logging
+from datetime import date
+
+# Backend dizinini Python path'ine ekle
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv # type: ignore
+
+from config.detection_config import DetectionConfig
+from database_utils.database import ACCESS_LOG_COLUMNS, SupabaseDB
+from database_utils.export import csv_chunks
+
+# Logging ayarla
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def retention_cutoff(retention_months, today=None):
+    """Bu tarihten önce biten bölümler arşivlenir (ayın ilk günü)"""
+    today = today or date.today()
+    months = today.year * 12 + today.month - 1 - retention_months
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def write_partition(db, partition, path, page_size):
+    """
+    Bölümün satırlarını sayfa sayfa gzip'li CSV'ye yaz
+
+    Dosya önce geçici adla yazılır; yarım kalan arşiv tam sanılmasın diye
+    sadece başarıyla bittiğinde yerine taşınır.
+
+    Returns:
+        int: Yazılan satır sayısı
+    """
+    temp_path = path + '.tmp'
+    written = 0
+
+    def counted(pages):
+        nonlocal written
+        for page in pages:
+            written += len(page)
+            yield page
+
+    pages = db.iter_access_logs(partition['range_start'], partition['range_end'], page_size)
+    with open(temp_path, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb') as file:
+        for chunk in csv_chunks(counted(pages), ACCESS_LOG_COLUMNS):
+            file.write(chunk)
+    with open(temp_path, 'rb') as raw:
+        os.fsync(raw.fileno())
+    os.replace(temp_path, path)
+    return written
+
+
+def archive_access_logs(db, archive_dir, retention_months, months_ahead, page_size, dry_run=False):
+    """
+    Bölümleri hazırla, eski bölümleri arşivleyip sil
+
+    Returns:
+        list: Arşivlenen bölüm adları
+    """
+    created = db.ensure_access_log_partitions(months_ahead)
+    logger.info(f"📅 Hazır bölümler: {', '.join(created)}")
+
+    cutoff = retention_cutoff(retention_months)
+    expired = [p for p in db.list_access_log_partitions() if date.fromisoformat(p['range_end']) <= cutoff]
+    if not expired:
+        logger.info(f"✅ {cutoff} öncesine ait arşivlenecek bölüm yok")
+        return []
+
+    os.makedirs(archive_dir, exist_ok=True)
+    archived = []
+
+    for partition in expired:
+        name = partition['name']
+        path = os.path.join(archive_dir, f"{name}.csv.gz")
+        expected = db.count_access_logs(partition['range_start'], partition['range_end'])
+
+        if dry_run:
+            logger.info(f"🔍 {name}: {expected} satır {path} dosyasına arşivlenecek")
+            continue
+
+        logger.info(f"📦 {name} arşivleniyor ({expected} satır)...")
+        written = write_partition(db, partition, path, page_size)
+
+        # Bölüm sadece tüm satırlar dosyaya yazıldıysa silinir
+        if written != expected:
+            logger.error(f"❌ {name}: {written}/{expected} satır yazıldı, bölüm silinmedi")
+            continue
+
+        db.drop_access_log_partition(name)
+        archived.append(name)
+        logger.info(f"✅ {name} arşivlendi ve silindi: {path} ({os.path.getsize(path)} bayt)")
+
+    return archived
+
+
+def main():
+    """Ana fonksiyon"""
+    parser = argparse.ArgumentParser(description='Eski access_logs bölümlerini arşivle ve sil')
+    parser.add_argument('--retention-months', type=int, default=DetectionConfig.ACCESS_LOG_RETENTION_MONTHS,
+                        help='Veritabanında tutulacak ay sayısı (içinde bulunulan ay hariç)')
+    parser.add_argument('--archive-dir', default=DetectionConfig.ACCESS_LOG_ARCHIVE_DIR,
+                        help='Arşiv dosyalarının yazılacağı dizin')
+    parser.add_argument('--months-ahead', type=int, default=DetectionConfig.ACCESS_LOG_PARTITIONS_AHEAD,
+                        help='Önceden oluşturulacak bölüm sayısı')
+    parser.add_argument('--dry-run', action='store_true', help='Sadece arşivlenecek bölümleri listele')
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    try:
+        db = SupabaseDB(local_cache=False)
+        archived = archive_access_logs(db, args.archive_dir, args.retention_months, args.months_ahead,
+                                       DetectionConfig.EXPORT_PAGE_SIZE, args.dry_run)
+        print(f"🎉 {len(archived)} bölüm arşivlendi")
+        return 0
+    except Exception as e:
+        logger.error(f"❌ Arşivleme hatası: {str(e)}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
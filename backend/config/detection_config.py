@@ -20,16 +20,30 @@ class DetectionConfig:
     # Frame İşleme
     PROCESS_EVERY_N_FRAMES = 2  # Her N frame'de bir işle
     HISTORY_SIZE = 10  # Geçmiş frame sayısı
+    BATCH_MAX_SIZE = 4  # Tek ileri geçişte işlenecek en fazla frame (kameralar arası mikro-batch)
+    BATCH_MAX_WAIT_MS = 10  # Batch'i doldurmak için ilk frame'den sonra en fazla bekleme (ms)
     
     # Görüntü İyileştirme
     CONTRAST_ALPHA = 1.1  # Kontrast çarpanı
     BRIGHTNESS_BETA = 10  # Parlaklık ekleme
     NOISE_REDUCTION = True  # Gürültü azaltma
+    PREPROCESS_STAGES = ['resize', 'contrast', 'denoise']  # Sırayla uygulanan ön işleme aşamaları
+    DENOISE_METHOD = 'gaussian'  # 'gaussian' (hızlı), 'median' veya 'bilateral' (yavaş)
+    INFERENCE_SIZE = 640  # Çıkarım çözünürlüğü (uzun kenar, YOLO imgsz)
     
     # Kamera Ayarları
     CAMERA_WIDTH = 1280
     CAMERA_HEIGHT = 720
     CAMERA_FPS = 30
+    CAMERA_CAPTURE_MODE = 'mjpeg_passthrough'  # 'mjpeg_passthrough' veya 'decoded'
+    FRAME_POOL_SIZE = 8  # Kamera başına yeniden kullanılan tam boyutlu frame tamponu sayısı
+    
+    # Önizleme (tarayıcı stream'i) Ayarları
+    PREVIEW_WIDTH = 640  # Önizleme genişliği (tespit tam çözünürlükte yapılır)
+    PREVIEW_JPEG_QUALITY = 70  # Önizleme JPEG kalitesi
+    STREAM_SERVER_OVERLAY = False  # Kutular istemcide çizilir (/api/detection/metadata); True ise sunucu çizer
+    JPEG_BACKEND = 'auto'  # 'auto' (simplejpeg > turbojpeg > opencv), 'simplejpeg', 'turbojpeg' veya 'opencv'
+    JPEG_ENCODER_THREADS = 2  # Önizleme encode thread havuzu boyutu
     
     # Renk Kodları (BGR)
     COLORS = {
@@ -44,6 +58,77 @@ class DetectionConfig:
     ENABLE_GPU = True  # GPU kullanımı
     ENABLE_HALF_PRECISION = False  # Yarı hassasiyet (FP16)
     
+    # Süreç Tabanlı Çıkarım
+    USE_PROCESS_WORKERS = True  # Tespit ve OCR'ı ayrı süreçlerde çalıştır (GIL'den bağımsız)
+    WORKER_RING_SLOTS = 4  # Paylaşımlı bellek halka tamponundaki frame slot sayısı
+    WORKER_TIMEOUT = 5.0  # İşçi süreç yanıt bekleme süresi (saniye)
+    WORKER_START_TIMEOUT = 300.0  # Model yükleme dahil işçi başlatma süresi (saniye)
+    WORKER_MAX_RESTARTS = 3  # Hazır olamadan art arda ölen işçi için yeniden başlatma sınırı
+    
+    # İzleme (Chrome trace / Perfetto, /api/trace)
+    TRACE_ENABLED = False  # Başlangıçta izlemeyi aç (çalışırken /api/trace/start ile de açılabilir)
+    TRACE_BUFFER_SIZE = 50000  # Halka tamponda tutulacak en fazla span sayısı
+    
+    # Veritabanı (Supabase) Bağlantısı
+    DB_TIMEOUT = 3.0  # İstek başına toplam zaman aşımı (saniye)
+    DB_CONNECT_TIMEOUT = 1.5  # Bağlantı kurma zaman aşımı (saniye)
+    DB_POOL_CONNECTIONS = 10  # Keep-alive HTTP bağlantı havuzu boyutu
+    DB_KEEPALIVE_EXPIRY = 30.0  # Boştaki bağlantının açık tutulma süresi (saniye)
+    DB_MAX_RETRIES = 2  # Ağ hatalarında en fazla tekrar deneme
+    DB_RETRY_BASE_DELAY = 0.1  # Üstel bekleme tabanı (saniye, full jitter)
+    DB_RETRY_MAX_DELAY = 1.0  # Tek bekleme üst sınırı (saniye)
+    DB_BREAKER_FAILURE_THRESHOLD = 5  # Devreyi açan ardışık hata sayısı
+    DB_BREAKER_RESET_TIMEOUT = 15.0  # Devre açıkken yeniden deneme öncesi bekleme (saniye)
+    
+    # Yerel Erişim Logu Günlüğü (SQLite WAL, arka planda Supabase'e gönderilir)
+    LOG_JOURNAL_PATH = 'data/access_log_journal.db'
+    LOG_JOURNAL_SYNCHRONOUS = 'FULL'  # 'FULL' güç kesintisinde de kayıpsız, 'NORMAL' daha hızlı
+    LOG_JOURNAL_RETENTION_DAYS = 30  # Gönderilmiş kayıtların yerelde tutulma süresi
+    LOG_SYNC_INTERVAL = 5.0  # Yeni kayıt yoksa senkronizasyon deneme aralığı (saniye)
+    LOG_SYNC_BATCH_SIZE = 200  # Tek istekte gönderilecek en fazla kayıt
+    
+    # Yerel Plaka Kopyası (yetki kontrolü ağsız yapılır)
+    PLATE_REPLICA_PATH = 'data/plates_replica.db'
+    PLATE_SYNC_INTERVAL = 15.0  # updated_at ile artımlı eşitleme aralığı (saniye)
+    PLATE_FULL_SYNC_INTERVAL = 600.0  # Silinen plakaları da yansıtan tam eşitleme aralığı (saniye)
+    PLATE_SYNC_PAGE_SIZE = 1000  # Eşitlemede sayfa başına satır (PostgREST üst sınırını aşmamalı)
+    
+    # Toplu Plaka İçe Aktarma (/api/plates/bulk)
+    PLATE_IMPORT_CHUNK_SIZE = 500  # Tek istekte eklenecek en fazla plaka
+    PLATE_IMPORT_MAX_ROWS = 50000  # İstek başına en fazla satır
+    PLATE_CHECK_MAX_BATCH = 1000  # /api/check-plates isteği başına en fazla plaka
+    
+    # Listeleme (/api/plates, /api/access-logs keyset sayfalama)
+    LIST_PAGE_SIZE = 50  # limit verilmezse sayfa boyutu
+    LIST_MAX_PAGE_SIZE = 500  # İstek başına en fazla satır
+    
+    # Erişim İstatistikleri (/api/stats, saatlik özet tablosundan)
+    STATS_DEFAULT_HOURS = 24  # bucket=hour için varsayılan aralık
+    STATS_DEFAULT_DAYS = 30  # bucket=day için varsayılan aralık
+    STATS_TOP_PLATES = 10  # En çok görülen plaka sayısı
+    
+    # Erişim Logu Bölümleri ve Arşivleme (archive_access_logs.py)
+    ACCESS_LOG_RETENTION_MONTHS = 12  # Veritabanında tutulacak ay (saatlik özet silinmez)
+    ACCESS_LOG_PARTITIONS_AHEAD = 3  # Önceden oluşturulacak aylık bölüm sayısı
+    ACCESS_LOG_ARCHIVE_DIR = 'data/archive'  # Arşivlenen bölümlerin .csv.gz dosyaları
+    EXPORT_PAGE_SIZE = 1000  # Dışa aktarmada sayfa başına satır (PostgREST üst sınırını aşmamalı)
+    EXPORT_PARQUET_ROW_GROUP_ROWS = 50000  # Parquet satır grubu (bellekte en fazla bu kadar satır tutulur)
+    
+    # HTTP Önbelleği (ETag/Last-Modified, 304 yanıtları)
+    HTTP_CACHE_MAX_ENTRIES = 256  # Saklanan en fazla yanıt (LRU)
+    HEALTH_CACHE_TTL = 1.0  # /api/health yanıtının yeniden kullanılma süresi (saniye)
+    CAMERA_LIST_CACHE_TTL = 30.0  # Kamera cihaz taraması yeniden kullanılma süresi (saniye)
+    PLATES_CACHE_TTL = 15.0  # /api/plates yanıtının en fazla yaşı (yerel kopya varken; yoksa önbelleklenmez)
+    
+    # Loglama (kuyruk + dinleyici thread, app.log JSON satırları)
+    LOG_LEVEL = 'INFO'
+    LOG_JSON = True  # Dosyaya JSON (python-json-logger) yaz; konsol düz metin kalır
+    LOG_MAX_BYTES = 10 * 1024 * 1024  # app.log döndürme boyutu
+    LOG_BACKUP_COUNT = 5  # Saklanacak eski log dosyası sayısı
+    LOG_RATE_LIMIT = 5.0  # Çağrı noktası başına saniyede en fazla kayıt (ERROR ve üstü ile denetim kayıtları hariç, 0 = sınırsız)
+    LOG_RATE_BURST = 20  # Çağrı noktası başına biriktirilebilecek kayıt
+    LOG_DEBUG_SAMPLE_RATE = 1.0  # DEBUG kayıtlarının tutulma oranı (0-1)
+    
     @classmethod
     def get_model_params(cls):
         """Model parametrelerini döndür"""
@@ -51,6 +136,7 @@ class DetectionConfig:
             'conf': cls.CONFIDENCE_THRESHOLD,
             'iou': cls.NMS_THRESHOLD,
             'max_det': cls.MAX_DETECTIONS,
+            'imgsz': cls.INFERENCE_SIZE,
             'agnostic_nms': True,
             'verbose': False
         }
@@ -61,7 +147,10 @@ class DetectionConfig:
         return {
             'alpha': cls.CONTRAST_ALPHA,
             'beta': cls.BRIGHTNESS_BETA,
-            'noise_reduction': cls.NOISE_REDUCTION
+            'noise_reduction': cls.NOISE_REDUCTION,
+            'stages': cls.PREPROCESS_STAGES,
+            'denoise_method': cls.DENOISE_METHOD,
+            'inference_size': cls.INFERENCE_SIZE
         }
     
     @classmethod
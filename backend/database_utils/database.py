@@ -1,16 +1,104 @@
 import os
-from supabase import create_client, Client
 import logging
 from datetime import datetime
+import threading
+import time
 import traceback
 
+from config.detection_config import DetectionConfig
+from database_utils.local_journal import AccessLogJournal, utc_timestamp
+from database_utils.pagination import (apply_keyset, build_page, decode_cursor, merge_local_rows,
+                                       normalize_prefix, select_columns)
+from database_utils.plate_replica import PlateReplica, latest_timestamp
+from database_utils.resilience import CircuitBreaker, CircuitOpenError, backoff_delay
+from utils.tracing import traced
+
 logger = logging.getLogger(__name__)
 
+PLATE_COLUMNS = ('id', 'plate_number', 'created_at', 'updated_at')
+ACCESS_LOG_COLUMNS = ('id', 'plate_number', 'vehicle_type', 'action', 'success', 'confidence', 'timestamp', 'client_id')
+
+
+def _is_transient(error):
+    """Ağ/zaman aşımı hatası mı? (sunucunun döndürdüğü sorgu hataları değil)"""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    try:
+        import httpx # type: ignore
+        return isinstance(error, httpx.TransportError)
+    except ImportError:
+        return False
+
+
+# Sunucu tarafı (5xx) PostgREST hataları: veritabanına bağlanamama ve şema önbelleği
+_SERVER_PGRST_CODES = ('PGRST000', 'PGRST001', 'PGRST002')
+# Sunucu tarafı SQLSTATE sınıfları: bağlantı, kaynak yetersizliği, iptal/kapanma, sistem ve iç hatalar
+_SERVER_SQLSTATE_CLASSES = ('08', '53', '57', '58', 'XX')
+
+
+def _is_client_error(error):
+    """
+    Sunucu isteği yanıtlayıp reddetti mi? (4xx: sorgu, kısıt, yetki hataları)
+
+    PostgREST hata kodu ya HTTP durumu (JSON olmayan yanıtlar) ya da
+    PGRST/SQLSTATE kodudur; 5xx'e karşılık gelenler sunucu hatası sayılır.
+    """
+    code = getattr(error, 'code', None)
+    if code is None or code == '':
+        return False
+    code = str(code)
+    if code.isdigit() and len(code) == 3:
+        return 400 <= int(code) < 500
+    if code.startswith('PGRST'):
+        return code not in _SERVER_PGRST_CODES
+    return code[:2] not in _SERVER_SQLSTATE_CLASSES
+
+
+def _is_connect_error(error):
+    """İstek sunucuya hiç ulaşmadı mı? (yazma işlemleri sadece bu durumda tekrarlanır)"""
+    if isinstance(error, ConnectionRefusedError):
+        return True
+    try:
+        import httpx # type: ignore
+        return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))
+    except ImportError:
+        return False
+
+
 class SupabaseDB:
-    def __init__(self):
-        """Supabase bağlantısını başlat"""
+    def __init__(self, local_cache=True):
+        """
+        Supabase bağlantısını başlat
+        
+        Args:
+            local_cache: False ise yerel günlük ve plaka kopyası açılmaz
+                (arşivleme/dışa aktarma gibi tek seferlik komutlar için)
+        """
         logger.info("🔗 Supabase bağlantısı kuruluyor...")
         
+        self.config = DetectionConfig
+        
+        # Supabase sağlıksızken çağrılar beklemeden yerel yedeğe düşer
+        self.circuit = CircuitBreaker('Supabase', self.config.DB_BREAKER_FAILURE_THRESHOLD,
+                                      self.config.DB_BREAKER_RESET_TIMEOUT)
+        
+        # Yetki kontrolü ağa gitmeden yerel plaka kopyasından yapılır
+        self.replica = None
+        self._replica_thread = None
+        
+        # Erişim logları önce yerel günlüğe yazılır, arka planda Supabase'e gönderilir
+        self.journal = None
+        self._sync_wakeup = threading.Event()
+        self._sync_stop = threading.Event()
+        self._sync_thread = None
+        self.last_sync_time = None
+        
+        # Plaka listesi sürümü: ekleme/silme ve eşitlemede gelen değişiklikler
+        # artırır (HTTP ETag önbelleği bu sürüme bağlıdır)
+        self.plates_version = 0
+        self.plates_modified_at = time.time()
+        self._version_lock = threading.Lock()
+        
         self.url = os.getenv('SUPABASE_URL')
         self.key = os.getenv('SUPABASE_KEY')
         
@@ -25,7 +113,18 @@ class SupabaseDB:
             raise ValueError("Supabase yapılandırması eksik")
         
         try:
-            self.supabase: Client = create_client(self.url, self.key)
+            # supabase istemcisi sadece bağlantı kurulurken import edilsin
+            from supabase import create_client, Client
+            from supabase.lib.client_options import ClientOptions
+            
+            import httpx # type: ignore
+            
+            # Zaman aşımı ClientOptions ile verilir; istemci yeniden oluşturulsa da korunur
+            timeout = httpx.Timeout(self.config.DB_TIMEOUT, connect=self.config.DB_CONNECT_TIMEOUT)
+            options = ClientOptions(postgrest_client_timeout=timeout,
+                                    storage_client_timeout=self.config.DB_TIMEOUT)
+            self.supabase: Client = create_client(self.url, self.key, options=options)
+            self._configure_http_pool()
             logger.info("✅ Supabase client başarıyla oluşturuldu")
             
             # Bağlantıyı test et
@@ -35,6 +134,58 @@ class SupabaseDB:
             logger.error(f"❌ Supabase bağlantı hatası: {str(e)}")
             logger.error(traceback.format_exc())
             raise
+        
+        if local_cache:
+            self._start_journal()
+            self._start_plate_replica()
+    
+    def _start_journal(self):
+        """Yerel erişim logu günlüğünü aç ve senkronizasyon thread'ini başlat"""
+        try:
+            self.journal = AccessLogJournal(self.config.LOG_JOURNAL_PATH, self.config.LOG_JOURNAL_SYNCHRONOUS)
+        except Exception as e:
+            # Günlük açılamazsa loglar doğrudan Supabase'e yazılır
+            logger.error(f"❌ Yerel erişim logu günlüğü açılamadı: {str(e)}")
+            return
+        
+        self._sync_thread = threading.Thread(target=self._sync_loop, name='access-log-sync', daemon=True)
+        self._sync_thread.start()
+        
+        # Önceki çalışmadan kalan kayıtlar hemen gönderilsin
+        self._sync_wakeup.set()
+    
+    def _configure_http_pool(self):
+        """
+        PostgREST istemcisini keep-alive bağlantı havuzuyla kur
+        
+        ClientOptions bağlantı havuzu sınırlarını taşımaz. supabase-py auth
+        olaylarında (oturum açma, token yenileme) postgrest istemcisini
+        _init_postgrest_client ile yeniden ürettiği için oturumu sonradan
+        değiştirmek kalıcı olmaz; bu yüzden tek yerde, istemciyi üreten
+        fabrika değiştirilir ve havuz her yeniden üretimde korunur.
+        """
+        try:
+            import httpx # type: ignore
+            from postgrest import SyncPostgrestClient # type: ignore
+            from postgrest.utils import SyncClient # type: ignore
+            
+            limits = httpx.Limits(max_connections=self.config.DB_POOL_CONNECTIONS,
+                                  max_keepalive_connections=self.config.DB_POOL_CONNECTIONS,
+                                  keepalive_expiry=self.config.DB_KEEPALIVE_EXPIRY)
+            
+            class PooledPostgrestClient(SyncPostgrestClient):
+                def create_session(self, base_url, headers, timeout):
+                    return SyncClient(base_url=base_url, headers=headers, timeout=timeout,
+                                      limits=limits, follow_redirects=True)
+            
+            def init_postgrest_client(rest_url, headers, schema, timeout=self.config.DB_TIMEOUT):
+                return PooledPostgrestClient(rest_url, headers=headers, schema=schema, timeout=timeout)
+            
+            self.supabase._init_postgrest_client = init_postgrest_client
+            logger.info(f"🔌 Supabase HTTP havuzu: {self.config.DB_POOL_CONNECTIONS} bağlantı, "
+                        f"zaman aşımı {self.config.DB_TIMEOUT} sn")
+        except Exception as e:
+            logger.warning(f"⚠️ HTTP bağlantı havuzu ayarlanamadı, varsayılan oturum kullanılacak: {str(e)}")
     
     def _test_connection(self):
         """Supabase bağlantısını test et"""
@@ -42,76 +193,398 @@ class SupabaseDB:
             logger.info("🧪 Supabase bağlantısı test ediliyor...")
             
             # Basit bir sorgu ile bağlantıyı test et
-            response = self.supabase.table('plates').select('count').execute()
+            self._execute(self.supabase.table('plates').select('id').limit(1))
             logger.info("✅ Supabase bağlantı testi başarılı")
             
         except Exception as e:
             logger.warning(f"⚠️ Supabase bağlantı testi başarısız: {str(e)}")
             logger.warning("💡 Tablolar henüz oluşturulmamış olabilir")
     
+    def _execute(self, query, idempotent=True, on_retry=None):
+        """
+        Sorguyu devre kesici ve jitter'lı yeniden deneme ile çalıştır
+        
+        Ağ/zaman aşımı ve sunucu (5xx) hataları tekrar denenir (yazmalar
+        sadece istek sunucuya ulaşmadıysa); deneme hakkı bitince devre
+        kesiciye hata olarak yazılır. Sunucunun reddettiği sorgular (4xx)
+        denenmez ve bağlantı sağlıklı sayılır.
+        
+        Args:
+            on_retry: Her tekrar denemeden önce çağrılır (opsiyonel; önceki
+                denemenin etkisi yanıtı kaybolsa da kalıcı olabilir)
+        
+        Raises:
+            CircuitOpenError: Devre açıksa (çağrı yapılmaz)
+        """
+        if not self.circuit.allow():
+            raise CircuitOpenError("Supabase devresi açık")
+        
+        attempts = self.config.DB_MAX_RETRIES + 1
+        for attempt in range(attempts):
+            try:
+                response = query.execute()
+            except Exception as e:
+                if _is_client_error(e):
+                    # Sunucu yanıt verip isteği reddetti; bağlantı sağlıklı
+                    self.circuit.record_success()
+                    raise
+                
+                if attempt + 1 < attempts and (idempotent or _is_connect_error(e)):
+                    delay = backoff_delay(attempt, self.config.DB_RETRY_BASE_DELAY, self.config.DB_RETRY_MAX_DELAY)
+                    logger.debug("🔁 Supabase isteği tekrar denenecek (%d/%d, %.2f sn): %s",
+                                 attempt + 1, attempts - 1, delay, e)
+                    time.sleep(delay)
+                    if on_retry is not None:
+                        on_retry()
+                    continue
+                
+                self.circuit.record_failure(e)
+                raise
+            
+            self.circuit.record_success()
+            return response
+    
+    def _log_failure(self, message, error):
+        """Bağlantı hataları kısa uyarı, beklenmeyen hatalar traceback ile loglanır"""
+        if isinstance(error, CircuitOpenError) or _is_transient(error):
+            logger.warning(f"⚠️ {message}: {str(error)}")
+        else:
+            logger.error(f"❌ {message}: {str(error)}")
+            logger.error(traceback.format_exc())
+    
+    def _plates_changed(self):
+        with self._version_lock:
+            self.plates_version += 1
+            self.plates_modified_at = time.time()
+    
+    def _start_plate_replica(self):
+        """Yerel plaka kopyasını aç, tam eşitle ve artımlı eşitleme thread'ini başlat"""
+        try:
+            self.replica = PlateReplica(self.config.PLATE_REPLICA_PATH)
+        except Exception as e:
+            # Kopya açılamazsa yetki kontrolü doğrudan Supabase'e gider
+            logger.error(f"❌ Yerel plaka kopyası açılamadı: {str(e)}")
+            return
+        
+        try:
+            self.sync_plates(full=True)
+        except Exception as e:
+            # İnternet yoksa diskteki son kopyayla devam edilir
+            self._log_failure("Plaka kopyası açılışta eşitlenemedi, son kopya kullanılıyor", e)
+        
+        self._replica_thread = threading.Thread(target=self._replica_loop, name='plate-replica-sync', daemon=True)
+        self._replica_thread.start()
+    
+    def _replica_loop(self):
+        """
+        Kopyayı updated_at ile artımlı eşitle; silinen plakalar updated_at ile
+        görünmediği için belirli aralıklarla tam eşitleme yapılır
+        """
+        last_full = time.time()
+        
+        while not self._sync_stop.wait(self.config.PLATE_SYNC_INTERVAL):
+            full = time.time() - last_full >= self.config.PLATE_FULL_SYNC_INTERVAL
+            try:
+                self.sync_plates(full=full)
+                if full:
+                    last_full = time.time()
+            except Exception as e:
+                self._log_failure("Plaka kopyası eşitlenemedi", e)
+    
+    def _fetch_plates(self, since=None):
+        """plates satırlarını sayfa sayfa getir (since verilirse updated_at >= since)"""
+        page_size = self.config.PLATE_SYNC_PAGE_SIZE
+        rows = []
+        offset = 0
+        
+        while True:
+            query = self.supabase.table('plates').select('id, plate_number, created_at, updated_at')
+            if since:
+                query = query.gte('updated_at', since)
+            response = self._execute(query.order('updated_at').order('id').range(offset, offset + page_size - 1))
+            
+            page = response.data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+            offset += page_size
+    
+    def sync_plates(self, full=False):
+        """
+        Yerel kopyayı Supabase ile eşitle; getirilen satır sayısını döndür
+        
+        Artımlı eşitleme son görülen updated_at dahil sonrasını getirir
+        (aynı zaman damgalı satırlar kaçmasın diye); yazma idempotenttir.
+        """
+        if full or not self.replica.watermark:
+            rows = self._fetch_plates()
+            if self.replica.replace_all(rows, latest_timestamp(rows)):
+                self._plates_changed()
+            logger.info(f"🔄 Plaka kopyası tam eşitlendi: {len(rows)} plaka")
+            return len(rows)
+        
+        rows = self._fetch_plates(since=self.replica.watermark)
+        if self.replica.upsert(rows):
+            self._plates_changed()
+        self.replica.mark_synced(latest_timestamp(rows, self.replica.watermark))
+        if rows:
+            logger.debug("🔄 Plaka kopyası: %d satır güncellendi", len(rows))
+        return len(rows)
+    
+    def _insert_access_logs(self, records):
+        """
+        Erişim loglarını tek istekle yaz
+        
+        (client_id, timestamp) üzerinden upsert yapıldığı için yanıtı
+        kaybolan bir gönderimin tekrarı aynı olayı ikinci kez yazmaz
+        (bölümlenmiş tabloda benzersiz anahtar bölüm sütununu içermeli).
+        """
+        return self._execute(
+            self.supabase.table('access_logs').upsert(records, on_conflict='client_id,timestamp',
+                                                      ignore_duplicates=True))
+    
+    def _sync_loop(self):
+        """Gönderilmemiş günlük kayıtlarını batch'ler halinde Supabase'e it"""
+        last_prune = 0.0
+        
+        while not self._sync_stop.is_set():
+            self._sync_wakeup.wait(self.config.LOG_SYNC_INTERVAL)
+            self._sync_wakeup.clear()
+            
+            try:
+                self.sync_access_logs()
+                
+                if time.time() - last_prune > 3600:
+                    last_prune = time.time()
+                    removed = self.journal.prune(self.config.LOG_JOURNAL_RETENTION_DAYS)
+                    if removed:
+                        logger.info(f"🧹 Günlükten {removed} eski erişim logu silindi")
+            except Exception as e:
+                logger.error(f"❌ Erişim logu senkronizasyon hatası: {str(e)}")
+                logger.error(traceback.format_exc())
+    
+    def sync_access_logs(self):
+        """Bekleyen kayıtları gönder; gönderilen kayıt sayısını döndür"""
+        synced = 0
+        batch_size = self.config.LOG_SYNC_BATCH_SIZE
+        
+        while True:
+            rows = self.journal.pending(batch_size)
+            if not rows:
+                break
+            
+            ids = [row_id for row_id, _ in rows]
+            try:
+                self._insert_access_logs([record for _, record in rows])
+            except Exception as e:
+                self.journal.mark_failed(ids, e)
+                self._log_failure(f"{len(rows)} erişim logu gönderilemedi, günlükte bekletiliyor", e)
+                break
+            
+            self.journal.mark_synced(ids)
+            self.last_sync_time = time.time()
+            synced += len(rows)
+            
+            if len(rows) < batch_size:
+                break
+        
+        if synced:
+            logger.debug("📤 %d erişim logu Supabase'e gönderildi", synced)
+        return synced
+    
+    def close(self):
+        """Senkronizasyonu durdur, günlüğü ve plaka kopyasını kapat"""
+        self._sync_stop.set()
+        self._sync_wakeup.set()
+        for thread in (self._sync_thread, self._replica_thread):
+            if thread is not None:
+                thread.join(timeout=self.config.DB_TIMEOUT * 2)
+        if self.journal is not None:
+            self.journal.close()
+        if self.replica is not None:
+            self.replica.close()
+    
+    def status(self):
+        """Bağlantı ve yerel yedek durumu (/api/health)"""
+        return {
+            'circuit': self.circuit.status(),
+            'access_log_journal': self.journal.stats() if self.journal is not None else None,
+            'last_sync_time': self.last_sync_time,
+            'plate_replica': self.replica.stats() if self.replica is not None else None
+        }
+    
+    @traced(category='db')
     def get_all_plates(self):
         """Tüm kayıtlı plakaları getir"""
         try:
-            logger.info("📋 Tüm plakalar getiriliyor...")
-            response = self.supabase.table('plates').select('*').order('created_at', desc=True).execute()
+            logger.debug("📋 Tüm plakalar getiriliyor...")
+            response = self._execute(self.supabase.table('plates').select('*').order('created_at', desc=True))
             
             plates = response.data if response.data else []
-            logger.info(f"📋 {len(plates)} plaka bulundu")
+            logger.info("📋 %d plaka bulundu", len(plates))
             
-            for plate in plates:
-                logger.debug(f"   - {plate.get('plate_number', 'N/A')} ({plate.get('created_at', 'N/A')})")
+            # Plaka başına satır sadece DEBUG açıkken biçimlendirilir
+            if logger.isEnabledFor(logging.DEBUG):
+                for plate in plates:
+                    logger.debug("   - %s (%s)", plate.get('plate_number', 'N/A'), plate.get('created_at', 'N/A'))
             
             return plates
             
         except Exception as e:
-            logger.error(f"❌ Plaka getirme hatası: {str(e)}")
-            logger.error(traceback.format_exc())
+            if self.replica is not None:
+                self._log_failure("Plaka getirme hatası, yerel kopya kullanılıyor", e)
+                return self.replica.all()
+            self._log_failure("Plaka getirme hatası", e)
             return []
     
+    @traced(category='db')
+    def list_plates(self, limit=50, cursor=None, prefix=None, fields=None):
+        """
+        Plakaları yeniden eskiye sayfa sayfa getir (keyset sayfalama)
+        
+        Args:
+            limit: Sayfa boyutu
+            cursor: Önceki sayfanın next_cursor değeri
+            prefix: plate_number öneki
+            fields: Virgülle ayrılmış sütunlar (None ise tümü)
+        
+        Returns:
+            dict: {'items', 'next_cursor', 'has_more', 'source'}
+        
+        Raises:
+            InvalidCursorError: İmleç çözülemezse
+        """
+        position = decode_cursor(cursor)
+        prefix = normalize_prefix(prefix)
+        columns = select_columns(fields, PLATE_COLUMNS, ('id', 'created_at'))
+        
+        try:
+            query = self.supabase.table('plates').select(','.join(columns))
+            if prefix:
+                query = query.like('plate_number', f'{prefix}%')
+            response = self._execute(apply_keyset(query, 'created_at', position, limit))
+            page = build_page(response.data or [], limit, 'created_at')
+            page['source'] = 'remote'
+            
+        except Exception as e:
+            if self.replica is None or not self.replica.ready:
+                self._log_failure("Plaka listeleme hatası", e)
+                raise
+            self._log_failure("Plaka listeleme hatası, yerel kopya kullanılıyor", e)
+            rows = [{column: row.get(column) for column in columns}
+                    for row in self.replica.page(limit + 1, position, prefix)]
+            page = build_page(rows, limit, 'created_at')
+            page['source'] = 'replica'
+        
+        logger.debug("📋 %d plaka listelendi (önek=%r, devamı=%s)", len(page['items']), prefix, page['has_more'])
+        return page
+    
+    @traced(category='db')
     def add_plate(self, plate_number):
         """Yeni plaka ekle"""
         try:
             logger.info(f"➕ Plaka ekleniyor: {plate_number}")
             
-            # Önce aynı plaka var mı kontrol et
-            logger.info(f"🔍 Mevcut plaka kontrolü: {plate_number}")
-            existing = self.supabase.table('plates').select('*').eq('plate_number', plate_number).execute()
-            
-            if existing.data:
-                logger.warning(f"⚠️ Plaka zaten mevcut: {plate_number}")
-                logger.info(f"📋 Mevcut plaka bilgisi: {existing.data[0]}")
-                return False
-            
-            # Yeni plaka ekle
+            # Tek istek: plate_number çakışırsa eklenmez ve yanıt boş döner
             data = {
                 'plate_number': plate_number,
                 'created_at': datetime.now().isoformat()
             }
             
-            logger.info(f"💾 Veritabanına ekleniyor: {data}")
-            response = self.supabase.table('plates').insert(data).execute()
+            logger.debug("💾 Veritabanına ekleniyor: %s", data)
+            inserted = self._upsert_plates([data])
             
-            if response.data:
+            if inserted:
                 logger.info(f"✅ Plaka başarıyla eklendi: {plate_number}")
-                logger.debug(f"📋 Eklenen veri: {response.data[0]}")
+                logger.debug("📋 Eklenen veri: %s", inserted[0])
                 return True
             else:
-                logger.error(f"❌ Plaka eklenemedi: {plate_number}")
-                logger.error(f"📋 Supabase yanıtı: {response}")
+                logger.warning(f"⚠️ Plaka zaten mevcut: {plate_number}")
                 return False
                 
         except Exception as e:
-            logger.error(f"❌ Plaka ekleme hatası: {str(e)}")
-            logger.error(traceback.format_exc())
+            self._log_failure("Plaka ekleme hatası", e)
             return False
     
+    @traced(category='db')
+    def add_plates(self, plate_numbers, chunk_size=500):
+        """
+        Plakaları chunk'lar halinde ekle (chunk başına tek istek)
+        
+        Args:
+            plate_numbers: Normalize edilmiş, tekrarsız plaka listesi
+            chunk_size: İstek başına en fazla satır
+            
+        Returns:
+            dict: plaka -> ('added' | 'exists' | 'error', hata mesajı veya None)
+        """
+        results = {}
+        created_at = datetime.now().isoformat()
+        
+        for start in range(0, len(plate_numbers), chunk_size):
+            chunk = plate_numbers[start:start + chunk_size]
+            try:
+                inserted = self._upsert_plates([{'plate_number': plate, 'created_at': created_at}
+                                                for plate in chunk])
+            except Exception as e:
+                self._log_failure(f"{len(chunk)} plakalık grup eklenemedi", e)
+                for plate in chunk:
+                    results[plate] = ('error', str(e))
+                continue
+            
+            added = {row.get('plate_number') for row in inserted}
+            for plate in chunk:
+                results[plate] = ('added', None) if plate in added else ('exists', None)
+        
+        added_count = sum(1 for status, _ in results.values() if status == 'added')
+        logger.info(f"📥 Toplu plaka ekleme: {added_count}/{len(plate_numbers)} yeni plaka eklendi")
+        return results
+    
+    def _upsert_plates(self, rows):
+        """
+        plate_number benzersizliği üzerinden ekle; var olanlara dokunulmaz
+        
+        Yanıtta sadece yeni eklenen satırlar döner ve istek güvenle yeniden
+        denenebilir. Yanıtı kaybolan bir deneme satır eklemişse tekrar deneme
+        onları döndürmez; bu durumda bu isteğin created_at damgasını taşıyan
+        satırlar da eklenmiş sayılır (daha önce var olanlar sayılmaz).
+        
+        Args:
+            rows: Aynı created_at değerini taşıyan plaka satırları
+        
+        Returns:
+            list: Eklenen satırlar
+        """
+        retried = []
+        response = self._execute(
+            self.supabase.table('plates').upsert(rows, on_conflict='plate_number', ignore_duplicates=True),
+            on_retry=lambda: retried.append(True))
+        inserted = list(response.data or [])
+        
+        if retried:
+            returned = {row.get('plate_number') for row in inserted}
+            missing = [row['plate_number'] for row in rows if row['plate_number'] not in returned]
+            if missing:
+                earlier = self._execute(
+                    self.supabase.table('plates').select(','.join(PLATE_COLUMNS))
+                    .in_('plate_number', missing).eq('created_at', rows[0]['created_at']))
+                inserted += earlier.data or []
+        
+        if inserted:
+            # Kopya bir sonraki eşitlemeyi beklemeden güncellensin
+            if self.replica is not None:
+                self.replica.upsert(inserted)
+            self._plates_changed()
+        return inserted
+    
+    @traced(category='db')
     def delete_plate(self, plate_id):
         """Plaka sil"""
         try:
             logger.info(f"🗑️ Plaka siliniyor: {plate_id}")
             
             # Önce plaka var mı kontrol et
-            existing = self.supabase.table('plates').select('*').eq('id', plate_id).execute()
+            existing = self._execute(self.supabase.table('plates').select('*').eq('id', plate_id))
             
             if not existing.data:
                 logger.warning(f"⚠️ Silinecek plaka bulunamadı: {plate_id}")
@@ -120,9 +593,12 @@ class SupabaseDB:
             plate_info = existing.data[0]
             logger.info(f"📋 Silinecek plaka: {plate_info.get('plate_number', 'N/A')}")
             
-            response = self.supabase.table('plates').delete().eq('id', plate_id).execute()
+            response = self._execute(self.supabase.table('plates').delete().eq('id', plate_id))
             
             if response.data:
+                if self.replica is not None:
+                    self.replica.delete(plate_id)
+                self._plates_changed()
                 logger.info(f"✅ Plaka başarıyla silindi: {plate_id}")
                 return True
             else:
@@ -130,36 +606,67 @@ class SupabaseDB:
                 return False
                 
         except Exception as e:
-            logger.error(f"❌ Plaka silme hatası: {str(e)}")
-            logger.error(traceback.format_exc())
+            self._log_failure("Plaka silme hatası", e)
             return False
     
+    @traced(category='db')
     def check_plate(self, plate_number):
-        """Plaka veritabanında var mı kontrol et"""
+        """Plaka veritabanında var mı kontrol et (eşitlenmiş yerel kopyadan, ağsız)"""
         try:
-            logger.info(f"🔍 Plaka kontrol ediliyor: {plate_number}")
-            
-            response = self.supabase.table('plates').select('*').eq('plate_number', plate_number).execute()
+            logger.debug("🔍 Plaka kontrol ediliyor: %s", plate_number)
             
-            is_authorized = len(response.data) > 0 if response.data else False
+            if self.replica is not None and self.replica.ready:
+                is_authorized = self.replica.contains(plate_number)
+            else:
+                # Kopya hiç eşitlenmediyse Supabase'e sor
+                response = self._execute(self.supabase.table('plates').select('id').eq('plate_number', plate_number))
+                is_authorized = bool(response.data)
             
             if is_authorized:
-                logger.info(f"✅ Yetkili plaka bulundu: {plate_number}")
-                logger.debug(f"📋 Plaka bilgisi: {response.data[0]}")
+                logger.info("✅ Yetkili plaka bulundu: %s", plate_number, extra={'plate': plate_number, 'audit': True})
             else:
-                logger.warning(f"❌ Yetkisiz plaka: {plate_number}")
+                logger.warning("❌ Yetkisiz plaka: %s", plate_number, extra={'plate': plate_number, 'audit': True})
             
             return is_authorized
             
         except Exception as e:
-            logger.error(f"❌ Plaka kontrol hatası: {str(e)}")
-            logger.error(traceback.format_exc())
+            self._log_failure("Plaka kontrol hatası", e)
             return False
     
+    @traced(category='db')
+    def check_plates(self, plate_numbers, chunk_size=500):
+        """
+        Birden çok plakayı tek seferde kontrol et
+        
+        Kopya eşitlenmişse ağa gitmeden, değilse chunk başına tek
+        `plate_number=in.(...)` sorgusuyla Supabase'den çözülür. Tek plaka
+        kontrolünün aksine hata yutulmaz; toplu mutabakatta bütün plakaların
+        yetkisiz görünmesi yanıltıcı olur.
+        
+        Args:
+            plate_numbers: Normalize edilmiş, tekrarsız plaka listesi
+        
+        Returns:
+            set: Yetkili plakalar
+        """
+        if self.replica is not None and self.replica.ready:
+            authorized = self.replica.contains_many(plate_numbers)
+        else:
+            authorized = set()
+            for start in range(0, len(plate_numbers), chunk_size):
+                chunk = plate_numbers[start:start + chunk_size]
+                response = self._execute(
+                    self.supabase.table('plates').select('plate_number').in_('plate_number', chunk))
+                authorized.update(row['plate_number'] for row in response.data or [])
+        
+        logger.info("🔐 Toplu plaka kontrolü: %d/%d yetkili", len(authorized), len(plate_numbers))
+        return authorized
+    
+    @traced(category='db')
     def add_access_log(self, plate_number, vehicle_type, action, success=True):
         """Erişim logunu kaydet"""
         try:
-            logger.info(f"📝 Erişim logu kaydediliyor: {plate_number} - {action}")
+            logger.debug("📝 Erişim logu kaydediliyor: %s - %s", plate_number, action)
             
             data = {
                 'plate_number': plate_number,
@@ -169,62 +676,279 @@ class SupabaseDB:
                 'timestamp': datetime.now().isoformat()
             }
             
-            logger.debug(f"📋 Log verisi: {data}")
-            response = self.supabase.table('access_logs').insert(data).execute()
+            logger.debug("📋 Log verisi: %s", data)
+            
+            if self.journal is not None:
+                # Yerel diske yaz (ağdan bağımsız); gönderimi senkronizasyon thread'i yapar
+                self.journal.append(data)
+                self._sync_wakeup.set()
+                logger.info("✅ Erişim logu kaydedildi: %s - %s", plate_number, action,
+                            extra={'plate': plate_number, 'action': action, 'audit': True})
+                return True
             
+            response = self._insert_access_logs([data])
             if response.data:
-                logger.info(f"✅ Erişim logu kaydedildi: {plate_number} - {action}")
+                logger.info("✅ Erişim logu kaydedildi: %s - %s", plate_number, action,
+                            extra={'plate': plate_number, 'action': action, 'audit': True})
                 return True
             else:
                 logger.error(f"❌ Erişim logu kaydedilemedi: {plate_number}")
                 return False
                 
         except Exception as e:
-            logger.error(f"❌ Erişim logu kaydetme hatası: {str(e)}")
-            logger.error(traceback.format_exc())
+            self._log_failure("Erişim logu kaydetme hatası", e)
             return False
     
+    @traced(category='db')
     def get_access_logs(self, limit=100):
         """Erişim loglarını getir"""
         try:
-            logger.info(f"📋 Son {limit} erişim logu getiriliyor...")
+            logger.debug("📋 Son %d erişim logu getiriliyor...", limit)
             
-            response = self.supabase.table('access_logs').select('*').order('timestamp', desc=True).limit(limit).execute()
+            response = self._execute(
+                self.supabase.table('access_logs').select('*').order('timestamp', desc=True).limit(limit))
             
             logs = response.data if response.data else []
-            logger.info(f"📋 {len(logs)} erişim logu bulundu")
+            
+            # Henüz gönderilmemiş yerel kayıtlar da listede görünsün
+            if self.journal is not None:
+                sent = {log.get('client_id') for log in logs}
+                unsent = [log for log in self.journal.recent(limit, unsynced_only=True)
+                          if log['client_id'] not in sent]
+                if unsent:
+                    logs = sorted(logs + unsent, key=lambda log: log.get('timestamp') or '', reverse=True)[:limit]
+            
+            logger.debug("📋 %d erişim logu bulundu", len(logs))
             
             return logs
             
         except Exception as e:
-            logger.error(f"❌ Erişim logları getirme hatası: {str(e)}")
-            logger.error(traceback.format_exc())
+            if self.journal is not None:
+                self._log_failure("Erişim logları getirme hatası, yerel günlük kullanılıyor", e)
+                return self.journal.recent(limit)
+            self._log_failure("Erişim logları getirme hatası", e)
             return []
     
+    @traced(category='db')
+    def list_access_logs(self, limit=50, cursor=None, plate_prefix=None, action=None,
+                         since=None, until=None, fields=None):
+        """
+        Erişim loglarını yeniden eskiye sayfa sayfa getir (keyset sayfalama)
+        
+        Args:
+            limit: Sayfa boyutu
+            cursor: Önceki sayfanın next_cursor değeri
+            plate_prefix: plate_number öneki
+            action: 'open' veya 'denied'
+            since: Bu zamandan itibaren (ISO 8601, dahil)
+            until: Bu zamana kadar (ISO 8601, hariç)
+            fields: Virgülle ayrılmış sütunlar (None ise tümü)
+        
+        Returns:
+            dict: {'items', 'next_cursor', 'has_more', 'source'}
+        
+        Raises:
+            InvalidCursorError: İmleç çözülemezse
+        """
+        position = decode_cursor(cursor)
+        plate_prefix = normalize_prefix(plate_prefix)
+        columns = select_columns(fields, ACCESS_LOG_COLUMNS, ('id', 'timestamp', 'client_id'))
+        filters = {'plate_prefix': plate_prefix, 'action': action, 'since': since, 'until': until}
+        
+        try:
+            query = self.supabase.table('access_logs').select(','.join(columns))
+            if plate_prefix:
+                query = query.like('plate_number', f'{plate_prefix}%')
+            if action:
+                query = query.eq('action', action)
+            if since:
+                query = query.gte('timestamp', since)
+            if until:
+                query = query.lt('timestamp', until)
+            response = self._execute(apply_keyset(query, 'timestamp', position, limit))
+            page = build_page(response.data or [], limit, 'timestamp')
+            page['source'] = 'remote'
+            
+            # Henüz gönderilmemiş yerel kayıtlar da listelenir; sonraki sayfalarda imleçten eskiler gelir
+            if self.journal is not None:
+                journal_filters = dict(filters)
+                if position is not None and (until is None or
+                                             utc_timestamp(position[0]) < utc_timestamp(until)):
+                    journal_filters['until'] = position[0]
+                sent = {log.get('client_id') for log in page['items']}
+                unsent = []
+                for log in self.journal.recent(limit, unsynced_only=True, **journal_filters):
+                    if log['client_id'] in sent:
+                        continue
+                    row = {column: log.get(column) for column in columns}
+                    # Günlükteki saat dilimsiz zaman Supabase'in döndürdüğü UTC biçimine getirilir
+                    row['timestamp'] = utc_timestamp(log['timestamp']).isoformat()
+                    unsent.append(row)
+                page = merge_local_rows(page, unsent, limit, 'timestamp', parse=utc_timestamp)
+            
+        except Exception as e:
+            if self.journal is None:
+                self._log_failure("Erişim logları listeleme hatası", e)
+                raise
+            # Yerel günlükte uzak id'ler olmadığından sadece ilk sayfa verilebilir
+            self._log_failure("Erişim logları listeleme hatası, yerel günlük kullanılıyor", e)
+            rows = [] if position is not None else self.journal.recent(limit, **filters)
+            page = {'items': [{column: log.get(column) for column in columns} for log in rows],
+                    'next_cursor': None, 'has_more': False, 'source': 'journal'}
+        
+        logger.debug("📋 %d erişim logu listelendi (devamı=%s)", len(page['items']), page['has_more'])
+        return page
+    
+    @traced(category='db')
+    def get_access_stats(self, since, until, bucket='hour', top=10):
+        """
+        Saatlik özet tablosundan erişim istatistikleri
+        
+        Supabase'de get_access_stats() fonksiyonu (access_log_hourly üzerinde)
+        çağrılır; ham log satırları taranmaz. Uzak sunucuya ulaşılamazsa aynı
+        özetin yerel günlükteki karşılığı kullanılır.
+        
+        Args:
+            since: Başlangıç (ISO 8601, saate yuvarlanır, dahil)
+            until: Bitiş (ISO 8601, hariç)
+            bucket: 'hour' veya 'day'
+            top: En çok görülen kaç plaka
+        
+        Returns:
+            dict: totals, by_time, by_plate, by_vehicle_type, source
+        """
+        try:
+            response = self._execute(self.supabase.rpc('get_access_stats', {
+                'p_since': since, 'p_until': until, 'p_bucket': bucket, 'p_top': top}))
+            stats = response.data
+            stats['source'] = 'remote'
+            
+        except Exception as e:
+            if self.journal is None:
+                self._log_failure("Erişim istatistikleri hatası", e)
+                raise
+            self._log_failure("Erişim istatistikleri hatası, yerel günlük kullanılıyor", e)
+            stats = self.journal.aggregate(since, until, bucket, top)
+            stats['source'] = 'journal'
+        
+        totals = stats['totals']
+        totals['denial_rate'] = round(totals['denied'] / totals['attempts'], 4) if totals['attempts'] else 0.0
+        stats['range'] = {'since': since, 'until': until, 'bucket': bucket}
+        return stats
+    
+    def iter_access_logs(self, since=None, until=None, page_size=1000, columns=ACCESS_LOG_COLUMNS,
+                         plate_prefix=None, action=None):
+        """
+        [since, until) aralığındaki logları eskiden yeniye sayfa sayfa üret
+        
+        Keyset sayfalama ile her seferinde sadece bir sayfa bellekte tutulur;
+        aralık ne kadar büyük olursa olsun bellek kullanımı sabittir.
+        
+        Yields:
+            list: Bir sayfa log satırı
+        """
+        columns = select_columns(','.join(columns), ACCESS_LOG_COLUMNS, ('id', 'timestamp'))
+        plate_prefix = normalize_prefix(plate_prefix)
+        position = None
+        while True:
+            query = self.supabase.table('access_logs').select(','.join(columns))
+            if since:
+                query = query.gte('timestamp', since)
+            if until:
+                query = query.lt('timestamp', until)
+            if plate_prefix:
+                query = query.like('plate_number', f'{plate_prefix}%')
+            if action:
+                query = query.eq('action', action)
+            response = self._execute(apply_keyset(query, 'timestamp', position, page_size, descending=False))
+            rows = response.data or []
+            page = rows[:page_size]
+            if page:
+                yield page
+            if len(rows) <= page_size:
+                return
+            position = (page[-1]['timestamp'], page[-1]['id'])
+    
+    def count_access_logs(self, since, until):
+        """[since, until) aralığındaki log sayısı"""
+        response = self._execute(self.supabase.table('access_logs').select('id', count='exact')
+                                 .gte('timestamp', since).lt('timestamp', until).limit(1))
+        return response.count or 0
+    
+    def ensure_access_log_partitions(self, months_ahead=3):
+        """Bu ay ve sonraki months_ahead ay için bölümleri oluştur; bölüm adlarını döndür"""
+        response = self._execute(self.supabase.rpc('ensure_access_log_partitions',
+                                                   {'p_months_ahead': months_ahead}))
+        return response.data or []
+    
+    def list_access_log_partitions(self):
+        """Aylık bölümler: [{'name', 'range_start', 'range_end'}, ...] (eskiden yeniye)"""
+        response = self._execute(self.supabase.rpc('list_access_log_partitions', {}))
+        return response.data or []
+    
+    def drop_access_log_partition(self, name):
+        """Arşivlenmiş bölümü ayır ve sil (içinde bulunulan ay silinemez)"""
+        self._execute(self.supabase.rpc('drop_access_log_partition', {'p_name': name}), idempotent=False)
+    
     def create_tables(self):
         """Gerekli tabloları oluştur (manuel olarak Supabase'de yapılmalı)"""
         tables_sql = """
-        -- Plakalar tablosu
+        -- Plakalar tablosu (ortak biçim; eski yazımlar için docs/migrations/002_normalize_plate_numbers.sql)
         CREATE TABLE IF NOT EXISTS plates (
             id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
             plate_number VARCHAR(20) UNIQUE NOT NULL,
-            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()  -- Yerel kopyanın artımlı eşitlemesi için
         );
+        ALTER TABLE plates ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+        CREATE INDEX IF NOT EXISTS idx_plates_updated_at ON plates(updated_at);
         
-        -- Erişim logları tablosu
+        -- Erişim logları tablosu (aylık bölümlenmiş; docs/supabase-setup.sql ile aynı)
+        -- Bölümlenmiş tabloda benzersiz anahtarlar bölüm sütununu (timestamp) içermelidir;
+        -- tekrar gönderim on_conflict=client_id,timestamp kullanır.
+        -- Bölümlenmemiş eski kurulumlar için: docs/migrations/001_partition_access_logs.sql
         CREATE TABLE IF NOT EXISTS access_logs (
-            id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+            id UUID DEFAULT gen_random_uuid(),
             plate_number VARCHAR(20) NOT NULL,
             vehicle_type VARCHAR(50),
             action VARCHAR(20) NOT NULL,
             success BOOLEAN DEFAULT TRUE,
-            timestamp TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-        );
+            confidence FLOAT,
+            timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+            client_id UUID,  -- Yerel günlükten tekrar gönderimde çift kaydı önler
+            PRIMARY KEY (id, timestamp),
+            UNIQUE (client_id, timestamp)
+        ) PARTITION BY RANGE (timestamp);
+        CREATE TABLE IF NOT EXISTS access_logs_default PARTITION OF access_logs DEFAULT;
+        
+        -- Aylık bölümler (archive_access_logs.py her çalıştığında ileriki ayları hazırlar)
+        CREATE OR REPLACE FUNCTION create_access_log_partition(p_month DATE)
+        RETURNS TEXT AS $$
+        DECLARE
+            v_start DATE := date_trunc('month', p_month)::DATE;
+            v_name TEXT := format('access_logs_y%sm%s', to_char(v_start, 'YYYY'), to_char(v_start, 'MM'));
+        BEGIN
+            EXECUTE format('CREATE TABLE IF NOT EXISTS %I PARTITION OF access_logs FOR VALUES FROM (%L) TO (%L)',
+                           v_name, v_start, (v_start + INTERVAL '1 month')::DATE);
+            RETURN v_name;
+        END;
+        $$ LANGUAGE plpgsql;
+        
+        CREATE OR REPLACE FUNCTION ensure_access_log_partitions(p_months_ahead INTEGER DEFAULT 3)
+        RETURNS SETOF TEXT AS $$
+            SELECT create_access_log_partition((date_trunc('month', NOW()) + make_interval(months => i))::DATE)
+            FROM generate_series(0, p_months_ahead) AS i;
+        $$ LANGUAGE sql;
+        
+        SELECT ensure_access_log_partitions(3);
         
         -- İndeksler
         CREATE INDEX IF NOT EXISTS idx_plates_number ON plates(plate_number);
         CREATE INDEX IF NOT EXISTS idx_access_logs_timestamp ON access_logs(timestamp);
         CREATE INDEX IF NOT EXISTS idx_access_logs_plate ON access_logs(plate_number);
+        CREATE INDEX IF NOT EXISTS idx_access_logs_timestamp_id ON access_logs(timestamp DESC, id DESC);
+        
+        -- Bölüm listeleme/silme, saatlik özet ve RLS politikaları: docs/supabase-setup.sql
         """
         
         logger.info("📋 Tablo oluşturma SQL'i:")
@@ -244,15 +968,14 @@ class SupabaseDB:
         logger.info("🎭 Demo plakaları kuruluyor...")
         
         added_count = 0
-        for plate in demo_plates:
-            try:
-                if self.add_plate(plate):
-                    added_count += 1
-                    logger.info(f"✅ Demo plaka eklendi: {plate}")
-                else:
-                    logger.info(f"ℹ️ Demo plaka zaten mevcut: {plate}")
-            except Exception as e:
-                logger.warning(f"⚠️ Demo plaka eklenemedi {plate}: {str(e)}")
+        for plate, (status, error) in self.add_plates(demo_plates).items():
+            if status == 'added':
+                added_count += 1
+                logger.info(f"✅ Demo plaka eklendi: {plate}")
+            elif status == 'exists':
+                logger.info(f"ℹ️ Demo plaka zaten mevcut: {plate}")
+            else:
+                logger.warning(f"⚠️ Demo plaka eklenemedi {plate}: {error}")
         
         logger.info(f"🎭 Demo kurulumu tamamlandı: {added_count} yeni plaka eklendi")
         return added_count 
\ No newline at end of file
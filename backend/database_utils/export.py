@@ -0,0 +1,127 @@
+"""
+Erişim loglarının akış halinde dışa aktarımı (CSV, Parquet)
+
+Yazıcılar iter_access_logs() sayfalarını tüketip bayt parçaları üretir;
+bellekte en fazla bir sayfa (Parquet'te bir satır grubu) tutulur. Parçalar
+HTTP yanıtına (chunked) veya dosyaya olduğu gibi yazılabilir.
+"""
+
+import csv
+import io
+from datetime import datetime
+
+FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet')
+}
+
+
+def csv_chunks(pages, columns):
+    """Başlık satırı ve sayfa başına bir CSV parçası üret"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+    for page in pages:
+        writer.writerows(page)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+class _ChunkSink:
+    """ParquetWriter'ın yazdığı baytları toplayıp parça parça teslim eden dosya benzeri hedef"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _parse_timestamp(value):
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+
+
+def _arrow_schema(pa, columns):
+    types = {
+        'success': pa.bool_(),
+        'confidence': pa.float64(),
+        'timestamp': pa.timestamp('us', tz='UTC')
+    }
+    return pa.schema([(column, types.get(column, pa.string())) for column in columns])
+
+
+def parquet_chunks(pages, columns, row_group_rows=50000):
+    """
+    Sayfaları Arrow record batch'lerine çevirip Parquet parçaları üret
+
+    Satırlar row_group_rows dolunca bir satır grubu olarak yazılır ve
+    yazılan baytlar hemen teslim edilir; dosya sonu (footer) en sonda gelir.
+
+    Raises:
+        RuntimeError: pyarrow kurulu değilse (akış başlamadan)
+    """
+    try:
+        import pyarrow as pa # type: ignore
+        import pyarrow.parquet as pq # type: ignore
+    except ImportError:
+        raise RuntimeError("Parquet için pyarrow gerekli (pip install pyarrow)")
+    return _parquet_stream(pa, pq, pages, columns, row_group_rows)
+
+
+def _parquet_stream(pa, pq, pages, columns, row_group_rows):
+    schema = _arrow_schema(pa, columns)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    batches, buffered = [], 0
+
+    try:
+        for page in pages:
+            if 'timestamp' in columns:
+                page = [dict(row, timestamp=_parse_timestamp(row.get('timestamp'))) for row in page]
+            batches.append(pa.RecordBatch.from_pylist(page, schema=schema))
+            buffered += len(page)
+
+            if buffered >= row_group_rows:
+                writer.write_table(pa.Table.from_batches(batches, schema=schema), row_group_size=buffered)
+                batches, buffered = [], 0
+                data = sink.drain()
+                if data:
+                    yield data
+
+        if batches:
+            writer.write_table(pa.Table.from_batches(batches, schema=schema), row_group_size=buffered)
+    finally:
+        writer.close()
+
+    yield sink.drain()
+
+
+def export_chunks(pages, columns, file_format, row_group_rows=50000):
+    """Biçime göre bayt parçaları üreten akış"""
+    if file_format == 'parquet':
+        return parquet_chunks(pages, columns, row_group_rows)
+    return csv_chunks(pages, columns)
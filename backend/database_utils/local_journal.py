@@ -0,0 +1,270 @@
+"""
+Erişim logları için yerel SQLite (WAL) günlüğü
+
+Her erişim olayı önce yerel diske yazılır; Supabase'e gönderimi arka plan
+senkronizasyonu yapar. Ağ yokken olay kaybolmaz, kapı kararı uzak
+sunucuyu beklemez.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS access_log_journal (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_id TEXT NOT NULL UNIQUE,
+    plate_number TEXT NOT NULL,
+    vehicle_type TEXT,
+    action TEXT NOT NULL,
+    success INTEGER NOT NULL DEFAULT 1,
+    timestamp TEXT NOT NULL,
+    synced_at TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_journal_unsynced ON access_log_journal(id) WHERE synced_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_journal_timestamp ON access_log_journal(timestamp);
+CREATE TABLE IF NOT EXISTS access_log_hourly (
+    bucket TEXT NOT NULL,
+    plate_number TEXT NOT NULL,
+    vehicle_type TEXT NOT NULL DEFAULT '',
+    action TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_seen TEXT,
+    PRIMARY KEY (bucket, plate_number, vehicle_type, action)
+);
+"""
+
+# Supabase'deki access_log_hourly tablosunun yerel karşılığı; her olay
+# günlüğe yazıldığı işlemde saatlik özete de eklenir
+_ROLLUP_UPSERT = (
+    'INSERT INTO access_log_hourly (bucket, plate_number, vehicle_type, action, attempts, last_seen) '
+    'VALUES (?, ?, ?, ?, 1, ?) '
+    'ON CONFLICT (bucket, plate_number, vehicle_type, action) DO UPDATE SET '
+    'attempts = attempts + 1, last_seen = MAX(COALESCE(last_seen, excluded.last_seen), excluded.last_seen)'
+)
+
+# Özet tablosu sonradan eklendiği için mevcut günlükten bir kez doldurulur
+_ROLLUP_BACKFILL = (
+    "INSERT INTO access_log_hourly (bucket, plate_number, vehicle_type, action, attempts, last_seen) "
+    "SELECT substr(timestamp, 1, 13) || ':00:00', plate_number, COALESCE(vehicle_type, ''), action, "
+    "COUNT(*), MAX(timestamp) FROM access_log_journal GROUP BY 1, 2, 3, 4 "
+    "ON CONFLICT DO NOTHING"
+)
+
+_COLUMNS = ('client_id', 'plate_number', 'vehicle_type', 'action', 'success', 'timestamp')
+
+# Zaman kovası: ISO zaman damgasının ilk karakterleri
+_BUCKET_PREFIX = {'hour': 19, 'day': 10}
+
+
+def hour_bucket(timestamp):
+    """ISO zaman damgasının saat kovası (2024-05-01T13:00:00)"""
+    return f'{timestamp[:13]}:00:00'
+
+
+def utc_timestamp(value):
+    """
+    ISO zaman damgasını UTC datetime'a çevir. Saat dilimi olmayan değerler
+    UTC kabul edilir (Supabase'in timestamptz sütunu da böyle yorumlar).
+    """
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _journal_time(value):
+    """Filtre değerini günlükteki biçime getir (saat dilimsiz UTC) ki metin karşılaştırması doğru olsun"""
+    return utc_timestamp(value).replace(tzinfo=None).isoformat()
+
+
+class AccessLogJournal:
+    """Thread güvenli, tek bağlantılı SQLite günlüğü"""
+
+    def __init__(self, path, synchronous='FULL'):
+        """
+        Args:
+            path: Veritabanı dosyası (dizin yoksa oluşturulur)
+            synchronous: SQLite synchronous modu ('FULL' güç kesintisinde de
+                kayıpsız, 'NORMAL' daha hızlı)
+        """
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(f'PRAGMA synchronous={synchronous}')
+        self._conn.executescript(_SCHEMA)
+        if self._conn.execute('SELECT 1 FROM access_log_hourly LIMIT 1').fetchone() is None:
+            self._conn.execute(_ROLLUP_BACKFILL)
+
+        logger.info(f"💾 Erişim logu günlüğü: {path} (WAL, synchronous={synchronous})")
+
+    def append(self, data):
+        """
+        Olayı günlüğe yaz ve Supabase'e gönderilecek kaydı döndür
+
+        client_id, tekrar gönderimde aynı olayın iki kez yazılmasını önler.
+        """
+        record = dict(data)
+        record.setdefault('client_id', str(uuid.uuid4()))
+        with self._lock:
+            # Olay ve özet aynı işlemde (tek fsync) yazılır
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.execute(
+                    'INSERT INTO access_log_journal (client_id, plate_number, vehicle_type, action, success, timestamp) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (record['client_id'], record['plate_number'], record.get('vehicle_type'),
+                     record['action'], int(bool(record.get('success', True))), record['timestamp'])
+                )
+                self._conn.execute(_ROLLUP_UPSERT, (
+                    hour_bucket(record['timestamp']), record['plate_number'], record.get('vehicle_type') or '',
+                    record['action'], record['timestamp']))
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return record
+
+    def pending(self, limit):
+        """Gönderilmemiş en eski kayıtlar: [(id, kayıt), ...]"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id, client_id, plate_number, vehicle_type, action, success, timestamp '
+                'FROM access_log_journal WHERE synced_at IS NULL ORDER BY id LIMIT ?', (limit,)
+            ).fetchall()
+        return [(row['id'], self._to_record(row)) for row in rows]
+
+    def mark_synced(self, ids):
+        if not ids:
+            return
+        now = datetime.now().isoformat()
+        with self._lock:
+            self._conn.executemany('UPDATE access_log_journal SET synced_at = ?, last_error = NULL WHERE id = ?',
+                                   [(now, row_id) for row_id in ids])
+
+    def mark_failed(self, ids, error):
+        if not ids:
+            return
+        with self._lock:
+            self._conn.executemany(
+                'UPDATE access_log_journal SET attempts = attempts + 1, last_error = ? WHERE id = ?',
+                [(str(error)[:500], row_id) for row_id in ids])
+
+    def recent(self, limit, unsynced_only=False, plate_prefix=None, action=None, since=None, until=None):
+        """Yeniden eskiye yerel kayıtlar (uzak sunucuya ulaşılamıyorsa listeleme için)"""
+        where, params = [], []
+        if unsynced_only:
+            where.append('synced_at IS NULL')
+        if plate_prefix:
+            where.append('plate_number LIKE ?')
+            params.append(f'{plate_prefix}%')
+        if action:
+            where.append('action = ?')
+            params.append(action)
+        if since:
+            where.append('timestamp >= ?')
+            params.append(_journal_time(since))
+        if until:
+            where.append('timestamp < ?')
+            params.append(_journal_time(until))
+        sql = ('SELECT client_id, plate_number, vehicle_type, action, success, timestamp '
+               'FROM access_log_journal')
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY timestamp DESC LIMIT ?'
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def aggregate(self, since, until, bucket='hour', top=10):
+        """
+        Saatlik özetten erişim istatistikleri (get_access_stats() SQL fonksiyonunun yerel karşılığı)
+
+        Args:
+            since: Başlangıç (ISO 8601, saate yuvarlanır, dahil)
+            until: Bitiş (ISO 8601, hariç)
+            bucket: 'hour' veya 'day'
+            top: En çok görülen kaç plaka
+
+        Returns:
+            dict: totals, by_time, by_plate, by_vehicle_type
+        """
+        width = _BUCKET_PREFIX[bucket]
+        where = 'WHERE bucket >= ? AND bucket < ?'
+        # İki sınır da kovalarla aynı biçimde (saat dilimsiz UTC) karşılaştırılır
+        params = (hour_bucket(_journal_time(since)), _journal_time(until))
+        counts = ("SUM(attempts) AS attempts, "
+                  "SUM(CASE WHEN action = 'open' THEN attempts ELSE 0 END) AS open, "
+                  "SUM(CASE WHEN action = 'denied' THEN attempts ELSE 0 END) AS denied")
+        with self._lock:
+            totals = self._conn.execute(
+                f'SELECT {counts}, COUNT(DISTINCT plate_number) AS unique_plates '
+                f'FROM access_log_hourly {where}', params).fetchone()
+            by_time = self._conn.execute(
+                f'SELECT substr(bucket, 1, {width}) AS bucket, {counts} '
+                f'FROM access_log_hourly {where} GROUP BY 1 ORDER BY 1', params).fetchall()
+            by_plate = self._conn.execute(
+                f'SELECT plate_number, {counts}, MAX(last_seen) AS last_seen '
+                f'FROM access_log_hourly {where} GROUP BY plate_number '
+                f'ORDER BY attempts DESC, plate_number LIMIT ?', params + (top,)).fetchall()
+            by_vehicle_type = self._conn.execute(
+                f"SELECT NULLIF(vehicle_type, '') AS vehicle_type, {counts} "
+                f'FROM access_log_hourly {where} GROUP BY vehicle_type ORDER BY attempts DESC', params).fetchall()
+
+        return {
+            'totals': {
+                'attempts': totals['attempts'] or 0,
+                'open': totals['open'] or 0,
+                'denied': totals['denied'] or 0,
+                'unique_plates': totals['unique_plates']
+            },
+            'by_time': [dict(row) for row in by_time],
+            'by_plate': [dict(row) for row in by_plate],
+            'by_vehicle_type': [dict(row) for row in by_vehicle_type]
+        }
+
+    def prune(self, retention_days):
+        """Gönderilmiş ve saklama süresini aşmış kayıtları sil"""
+        cutoff = (datetime.now() - timedelta(days=retention_days)).isoformat()
+        with self._lock:
+            cursor = self._conn.execute(
+                'DELETE FROM access_log_journal WHERE synced_at IS NOT NULL AND timestamp < ?', (cutoff,))
+            return cursor.rowcount
+
+    def stats(self):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT COUNT(*) AS total, '
+                'SUM(CASE WHEN synced_at IS NULL THEN 1 ELSE 0 END) AS pending, '
+                'MIN(CASE WHEN synced_at IS NULL THEN timestamp END) AS oldest_pending '
+                'FROM access_log_journal'
+            ).fetchone()
+        return {
+            'path': self.path,
+            'total': row['total'],
+            'pending': row['pending'] or 0,
+            'oldest_pending': row['oldest_pending']
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _to_record(row):
+        record = {column: row[column] for column in _COLUMNS}
+        record['success'] = bool(record['success'])
+        return record
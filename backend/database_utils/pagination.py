@@ -0,0 +1,131 @@
+"""
+Keyset (imleç) sayfalama yardımcıları
+
+Listeler (sıralama sütunu, id) çiftine göre azalan sırada sayfalanır;
+imleç son satırın bu iki değerini taşır. OFFSET kullanılmadığı için sayfa
+maliyeti tablonun büyüklüğünden bağımsızdır ve araya eklenen satırlar
+sayfaları kaydırmaz.
+"""
+
+import base64
+import json
+import re
+
+
+# Uzak id'si olmayan (henüz gönderilmemiş yerel) satırlar için imleç id'si;
+# aynı sıralama değerinde uzak satırlardan önce gelirler
+LOCAL_ROW_ID = 'ffffffff-ffff-ffff-ffff-ffffffffffff'
+
+
+class InvalidCursorError(ValueError):
+    """Çözülemeyen veya bozuk imleç"""
+
+
+def encode_cursor(row, sort_column):
+    """Satırın (sıralama değeri, id) çiftini opak imlece çevir"""
+    payload = json.dumps([row.get(sort_column), row.get('id')], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """İmleci (sıralama değeri, id) çiftine çevir; boşsa None"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Geçersiz imleç: {cursor}") from e
+    if row_id is None:
+        raise InvalidCursorError(f"Geçersiz imleç: {cursor}")
+    return value, row_id
+
+
+def _quote(value):
+    """PostgREST mantık filtresi içinde değeri tırnakla (':' ve '+' içeren zaman damgaları için)"""
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def keyset_filter(sort_column, cursor_value, descending=True):
+    """
+    (sort_column, id) sırasında imleçten sonraki satırlar için PostgREST
+    or= filtresi (sıralama sütunu boş olmamalı)
+    """
+    value, row_id = cursor_value
+    op = 'lt' if descending else 'gt'
+    return (f"({sort_column}.{op}.{_quote(value)},"
+            f"and({sort_column}.eq.{_quote(value)},id.{op}.{_quote(row_id)}))")
+
+
+def apply_keyset(query, sort_column, cursor_value, limit, descending=True):
+    """
+    PostgREST sorgusuna sıralama, imleç ve limit uygula
+
+    postgrest-py 0.13'te or_() yoktur ve order() her çağrıda ayrı parametre
+    ekler; ikisi de tek parametre olarak doğrudan yazılır. Bir fazla satır
+    istenir, sonraki sayfanın varlığı buradan anlaşılır.
+    """
+    if cursor_value is not None:
+        query.params = query.params.add('or', keyset_filter(sort_column, cursor_value, descending))
+    direction = 'desc' if descending else 'asc'
+    query.params = query.params.add('order', f'{sort_column}.{direction},id.{direction}')
+    return query.limit(limit + 1)
+
+
+def normalize_prefix(prefix):
+    """Plaka arama önekini plaka biçimine getir (LIKE joker karakterleri de elenir)"""
+    return re.sub(r'[^A-Z0-9]', '', (prefix or '').upper())
+
+
+def select_columns(requested, allowed, required):
+    """
+    İstenen sütunları izinli olanlarla sınırla; imleç için gerekli sütunlar
+    her zaman eklenir
+
+    Args:
+        requested: Virgülle ayrılmış sütun listesi veya None (tümü)
+    """
+    if not requested:
+        return list(allowed)
+    columns = [column.strip() for column in requested.split(',') if column.strip() in allowed]
+    for column in required:
+        if column not in columns:
+            columns.append(column)
+    return columns
+
+
+def build_page(rows, limit, sort_column):
+    """limit + 1 satırdan sayfa sonucunu üret"""
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    return {
+        'items': items,
+        'next_cursor': encode_cursor(items[-1], sort_column) if has_more and items else None,
+        'has_more': has_more
+    }
+
+
+def merge_local_rows(page, rows, limit, sort_column, parse=None):
+    """
+    Uzak sayfaya henüz gönderilmemiş yerel satırları kat
+
+    Birleşik liste (sıralama değeri, id) ile azalan sıralanıp limit'e kesilir;
+    imleç dönen son satırdan üretilir, böylece kesilen satırlar sonraki
+    sayfada gelir ve gösterilenler tekrar gelmez.
+
+    Args:
+        parse: Sıralama değerini karşılaştırılabilir hale getiren fonksiyon
+            (zaman damgaları farklı biçimlerde olabilir)
+    """
+    if not rows:
+        return page
+
+    parse = parse or (lambda value: value)
+    merged = sorted(page['items'] + rows,
+                    key=lambda row: (parse(row[sort_column]), row.get('id') or LOCAL_ROW_ID),
+                    reverse=True)
+    has_more = page['has_more'] or len(merged) > limit
+    items = merged[:limit]
+    cursor_row = {sort_column: items[-1][sort_column], 'id': items[-1].get('id') or LOCAL_ROW_ID}
+    return dict(page, items=items, has_more=has_more,
+                next_cursor=encode_cursor(cursor_row, sort_column) if has_more else None)
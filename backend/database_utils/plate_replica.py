@@ -0,0 +1,232 @@
+"""
+plates tablosunun yerel SQLite kopyası
+
+Yetki kontrolü ağa gitmeden bu kopyadan okunur. Kopya açılışta tamamen,
+sonra updated_at sütunu üzerinden artımlı olarak Supabase ile eşitlenir
+(eşitleme SupabaseDB'de yapılır). Son eşitleme bilgisi dosyada saklanır;
+internet yokken yeniden başlatılan sistem son kopyayla çalışmaya devam eder.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plates (
+    id TEXT PRIMARY KEY,
+    plate_number TEXT NOT NULL UNIQUE,
+    created_at TEXT,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS replica_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_COLUMNS = ('id', 'plate_number', 'created_at', 'updated_at')
+
+
+def _parse_timestamp(value):
+    """ISO zaman damgasını karşılaştırılabilir hale getir (kesir basamakları değişebilir)"""
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+
+
+def latest_timestamp(rows, current=None):
+    """Satırlardaki en yeni updated_at değeri (yoksa current)"""
+    latest, latest_parsed = current, _parse_timestamp(current) if current else None
+    for row in rows:
+        value = row.get('updated_at')
+        parsed = _parse_timestamp(value) if value else None
+        if parsed is not None and (latest_parsed is None or parsed > latest_parsed):
+            latest, latest_parsed = value, parsed
+    return latest
+
+
+class PlateReplica:
+    """Thread güvenli, tek bağlantılı plaka kopyası"""
+
+    def __init__(self, path, synchronous='NORMAL'):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(f'PRAGMA synchronous={synchronous}')
+        self._conn.executescript(_SCHEMA)
+
+        self.watermark = self._get_meta('watermark')
+        last_sync = self._get_meta('last_sync_time')
+        self.last_sync_time = float(last_sync) if last_sync else None
+
+        logger.info(f"💾 Plaka kopyası: {path} ({self.count()} plaka, "
+                    f"son eşitleme: {self._format_time(self.last_sync_time)})")
+
+    @property
+    def ready(self):
+        """En az bir kez tam eşitlendi mi? (değilse yetki kontrolü uzak sunucuya gider)"""
+        return self.last_sync_time is not None
+
+    def contains(self, plate_number):
+        with self._lock:
+            row = self._conn.execute('SELECT 1 FROM plates WHERE plate_number = ?', (plate_number,)).fetchone()
+        return row is not None
+
+    def contains_many(self, plate_numbers):
+        """Verilen plakalardan kopyada bulunanlar (500'lük IN sorgularıyla)"""
+        found = set()
+        with self._lock:
+            for start in range(0, len(plate_numbers), 500):
+                chunk = plate_numbers[start:start + 500]
+                found.update(row[0] for row in self._conn.execute(
+                    f"SELECT plate_number FROM plates WHERE plate_number IN ({','.join('?' * len(chunk))})", chunk))
+        return found
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM plates').fetchone()[0]
+
+    def all(self):
+        """Tüm plakalar, en yeni eklenen önce"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id, plate_number, created_at, updated_at FROM plates ORDER BY created_at DESC').fetchall()
+        return [dict(zip(_COLUMNS, row)) for row in rows]
+
+    def page(self, limit, cursor=None, prefix=None):
+        """
+        Yeniden eskiye bir sayfa plaka (uzak sunucuya ulaşılamıyorsa listeleme için)
+
+        Args:
+            cursor: decode_cursor() sonucu (created_at, id) veya None
+            prefix: plate_number öneki
+        """
+        where, params = [], []
+        if prefix:
+            where.append('plate_number LIKE ?')
+            params.append(f'{prefix}%')
+        if cursor is not None:
+            created_at, plate_id = cursor
+            where.append('(created_at < ? OR (created_at = ? AND id < ?))')
+            params.extend([created_at, created_at, str(plate_id)])
+        sql = 'SELECT id, plate_number, created_at, updated_at FROM plates'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY created_at DESC, id DESC LIMIT ?'
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(zip(_COLUMNS, row)) for row in rows]
+
+    def replace_all(self, plates, watermark):
+        """
+        Tam eşitleme: kopyayı tek işlemde verilen listeyle değiştir
+
+        Returns:
+            bool: Plaka listesi değişti mi?
+        """
+        with self._lock:
+            current = {row[0]: row[1:] for row in self._conn.execute(
+                'SELECT id, plate_number, updated_at FROM plates')}
+            changed = current != {str(plate.get('id') or plate['plate_number']):
+                                  (plate['plate_number'], plate.get('updated_at')) for plate in plates}
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.execute('DELETE FROM plates')
+                self._insert_locked(plates)
+                self._mark_synced_locked(watermark)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return changed
+
+    def upsert(self, plates):
+        """
+        Artımlı eşitlemeden veya yerel eklemeden gelen plakaları yaz
+
+        Returns:
+            int: Kopyada olmayan veya farklı olan satır sayısı (artımlı
+                eşitleme son damgalı satırları her seferinde tekrar getirir)
+        """
+        if not plates:
+            return 0
+        with self._lock:
+            changed = 0
+            for start in range(0, len(plates), 500):
+                chunk = plates[start:start + 500]
+                ids = [str(plate.get('id') or plate['plate_number']) for plate in chunk]
+                current = {row[0]: row[1:] for row in self._conn.execute(
+                    f"SELECT id, plate_number, updated_at FROM plates WHERE id IN ({','.join('?' * len(ids))})", ids)}
+                changed += sum(1 for plate_id, plate in zip(ids, chunk)
+                               if current.get(plate_id) != (plate['plate_number'], plate.get('updated_at')))
+
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._insert_locked(plates)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return changed
+
+    def mark_synced(self, watermark):
+        """Başarılı eşitlemeyi (ve yeni updated_at sınırını) kaydet"""
+        with self._lock:
+            self._mark_synced_locked(watermark)
+
+    def delete(self, plate_id):
+        with self._lock:
+            self._conn.execute('DELETE FROM plates WHERE id = ?', (str(plate_id),))
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'plates': self.count(),
+            'watermark': self.watermark,
+            'last_sync_time': self.last_sync_time,
+            'staleness_seconds': self.staleness()
+        }
+
+    def staleness(self):
+        """Son başarılı eşitlemeden bu yana geçen süre (hiç eşitlenmediyse None)"""
+        if self.last_sync_time is None:
+            return None
+        return round(time.time() - self.last_sync_time, 1)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _insert_locked(self, plates):
+        # Aynı plaka farklı id ile yeniden eklendiyse eski satır da değiştirilir
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO plates (id, plate_number, created_at, updated_at) VALUES (?, ?, ?, ?)',
+            [(str(plate.get('id') or plate['plate_number']), plate['plate_number'],
+              plate.get('created_at'), plate.get('updated_at')) for plate in plates]
+        )
+
+    def _mark_synced_locked(self, watermark):
+        now = time.time()
+        self._conn.executemany('INSERT OR REPLACE INTO replica_meta (key, value) VALUES (?, ?)',
+                               [('watermark', watermark), ('last_sync_time', repr(now))])
+        self.watermark = watermark
+        self.last_sync_time = now
+
+    def _get_meta(self, key):
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM replica_meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _format_time(timestamp):
+        return datetime.fromtimestamp(timestamp).isoformat(timespec='seconds') if timestamp else 'yok'
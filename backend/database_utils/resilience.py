@@ -0,0 +1,112 @@
+"""
+Uzak veritabanı çağrıları için devre kesici ve jitter'lı yeniden deneme
+"""
+
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Devre açıkken çağrı yapılmadan hemen döner"""
+
+
+class CircuitBreaker:
+    """
+    Ardışık hata sayısına göre açılan devre kesici
+
+    closed: çağrılar normal yapılır; `failure_threshold` ardışık hatada açılır.
+    open: çağrılar `reset_timeout` boyunca yapılmaz (CircuitOpenError).
+    half_open: süre dolunca tek deneme çağrısına izin verilir; başarılıysa
+    kapanır, başarısızsa tekrar açılır.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=15.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+        self.total_failures = 0
+        self.rejected_calls = 0
+        self.last_error = None
+        self.last_failure_time = None
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state_locked()
+
+    def _current_state_locked(self):
+        if self._state == STATE_OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = STATE_HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow(self):
+        """Çağrı yapılabilir mi? (half_open'da sadece tek deneme)"""
+        with self._lock:
+            state = self._current_state_locked()
+            if state == STATE_CLOSED:
+                return True
+            if state == STATE_HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected_calls += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != STATE_CLOSED:
+                logger.info(f"✅ {self.name} devresi kapandı (bağlantı düzeldi)")
+            self._state = STATE_CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self, error):
+        with self._lock:
+            self._failures += 1
+            self.total_failures += 1
+            self.last_error = str(error)
+            self.last_failure_time = time.time()
+
+            if self._state == STATE_HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != STATE_OPEN:
+                    logger.warning(f"⚠️ {self.name} devresi açıldı ({self._failures} ardışık hata), "
+                                   f"{self.reset_timeout:.0f} sn yerel yedeğe düşülecek: {error}")
+                self._state = STATE_OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def status(self):
+        with self._lock:
+            state = self._current_state_locked()
+            retry_in = None
+            if state == STATE_OPEN:
+                retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)), 1)
+            return {
+                'state': state,
+                'consecutive_failures': self._failures,
+                'total_failures': self.total_failures,
+                'rejected_calls': self.rejected_calls,
+                'last_error': self.last_error,
+                'last_failure_time': self.last_failure_time,
+                'retry_in_seconds': retry_in
+            }
+
+
+def backoff_delay(attempt, base_delay, max_delay):
+    """Full jitter üstel bekleme süresi (attempt 0'dan başlar)"""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Erişim Logu Dışa Aktarma Scripti
+
+Logları keyset ile sayfa sayfa okuyup CSV veya Parquet dosyasına akış
+halinde yazar; aralık ne kadar büyük olursa olsun bellek kullanımı sabittir.
+
+Kullanım (backend dizininde):
+    python export_access_logs.py --since 2024-01-01 --until 2025-01-01 -o loglar.csv
+    python export_access_logs.py --since 2024-01-01 --format parquet -o loglar.parquet
+    python export_access_logs.py --action denied -o -    # stdout'a CSV
+"""
+
+import sys
+import os
+import argparse
+import logging
+
+# Backend dizinini Python path'ine ekle
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv # type: ignore
+
+from config.detection_config import DetectionConfig
+from database_utils.database import ACCESS_LOG_COLUMNS, SupabaseDB
+from database_utils.export import FORMATS, export_chunks
+from database_utils.pagination import select_columns
+
+# Logging ayarla (stdout'a veri yazılabildiği için loglar stderr'e gider)
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def export_access_logs(db, output, file_format, since=None, until=None, plate=None, action=None, fields=None):
+    """
+    Logları dosyaya (veya stdout'a) akış halinde yaz
+
+    Returns:
+        int: Yazılan satır sayısı
+    """
+    columns = select_columns(fields, ACCESS_LOG_COLUMNS, ('id', 'timestamp'))
+    exported = 0
+
+    def counted(pages):
+        nonlocal exported
+        for page in pages:
+            exported += len(page)
+            yield page
+
+    pages = db.iter_access_logs(since, until, DetectionConfig.EXPORT_PAGE_SIZE, columns,
+                                plate_prefix=plate, action=action)
+    chunks = export_chunks(counted(pages), columns, file_format, DetectionConfig.EXPORT_PARQUET_ROW_GROUP_ROWS)
+
+    if output == '-':
+        for chunk in chunks:
+            sys.stdout.buffer.write(chunk)
+        sys.stdout.buffer.flush()
+        return exported
+
+    # Yarım kalan dosya tam sanılmasın diye geçici adla yazılır
+    temp_path = output + '.tmp'
+    with open(temp_path, 'wb') as file:
+        for chunk in chunks:
+            file.write(chunk)
+    os.replace(temp_path, output)
+    return exported
+
+
+def main():
+    """Ana fonksiyon"""
+    parser = argparse.ArgumentParser(description='Erişim loglarını CSV veya Parquet olarak dışa aktar')
+    parser.add_argument('--since', help='Başlangıç (ISO 8601, dahil)')
+    parser.add_argument('--until', help='Bitiş (ISO 8601, hariç)')
+    parser.add_argument('--format', choices=sorted(FORMATS), default='csv', help='Dosya biçimi')
+    parser.add_argument('--plate', help='Plaka öneki')
+    parser.add_argument('--action', choices=['open', 'denied'], help='Sadece bu işlem')
+    parser.add_argument('--fields', help='Virgülle ayrılmış sütunlar (varsayılan: tümü)')
+    parser.add_argument('-o', '--output', required=True, help="Çıktı dosyası ('-' ise stdout)")
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    try:
+        db = SupabaseDB(local_cache=False)
+        exported = export_access_logs(db, args.output, args.format, args.since, args.until,
+                                      args.plate, args.action, args.fields)
+        logger.info(f"🎉 {exported} erişim logu dışa aktarıldı: {args.output}")
+        return 0
+    except Exception as e:
+        logger.error(f"❌ Dışa aktarma hatası: {str(e)}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+import threading
+
+from utils.component_loader import STATE_ERROR, STATE_LOADING, STATE_READY, ComponentLoader
+
+
+def test_on_ready_runs_before_component_is_ready():
+    loader = ComponentLoader()
+    seen = {}
+    done = threading.Event()
+
+    def on_ready(instance):
+        seen['state'] = loader.state('db')
+        seen['instance'] = loader.get('db')
+        done.set()
+
+    loader.register('db', lambda: 'bağlantı', on_ready=on_ready).join(5)
+
+    # READY görüldüğünde geri çağrı global'leri çoktan yayınlamış olur
+    assert done.is_set()
+    assert seen == {'state': STATE_LOADING, 'instance': None}
+    assert loader.state('db') == STATE_READY
+    assert loader.get('db') == 'bağlantı'
+
+
+def test_warmup_runs_before_ready():
+    loader = ComponentLoader()
+    states = []
+    loader.register('model', object, warmup=lambda instance: states.append(loader.state('model'))).join(5)
+
+    assert states == ['warming_up']
+    assert loader.all_ready()
+
+
+def test_factory_or_callback_failure_is_reported():
+    loader = ComponentLoader()
+
+    def broken():
+        raise RuntimeError('model yok')
+
+    def failing_callback(instance):
+        raise RuntimeError('yayınlanamadı')
+
+    loader.register('model', broken).join(5)
+    loader.register('db', object, on_ready=failing_callback).join(5)
+
+    status = loader.status()
+    assert status['model']['state'] == STATE_ERROR and status['model']['error'] == 'model yok'
+    assert status['db']['state'] == STATE_ERROR
+    assert loader.get('db') is None
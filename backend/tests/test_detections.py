@@ -0,0 +1,53 @@
+import numpy as np # type: ignore
+
+from utils.detections import DetectionArray
+
+NAMES = {2: 'car', 7: 'truck', 0: 'person'}
+
+
+def _data(rows):
+    return np.array(rows, dtype=np.float32)
+
+
+def test_from_xyxy_filters_class_confidence_and_area():
+    data = _data([
+        [10, 10, 110, 110, 0.9, 2],   # araç, geçer
+        [0, 0, 50, 50, 0.95, 0],      # araç sınıfı değil
+        [10, 10, 110, 110, 0.2, 7],   # düşük güven
+        [10, 10, 15, 15, 0.9, 7],     # alan çok küçük
+        [20, 20, 220, 120, 0.8, 7],   # kamyon, geçer
+    ])
+
+    detections = DetectionArray.from_xyxy(data, NAMES, [2, 7], [7], conf_threshold=0.5, min_area=100)
+
+    assert len(detections) == 2
+    assert detections.class_ids.tolist() == [2, 7]
+    assert detections.truck_mask.tolist() == [False, True]
+    assert detections.best() == 0
+
+
+def test_from_xyxy_scales_truncates_and_clamps_boxes():
+    data = _data([[-4.6, 10.9, 100.7, 50.2, 0.9, 2]])
+
+    detections = DetectionArray.from_xyxy(data, NAMES, [2], [], inv_scale=2.0)
+
+    assert detections.boxes.dtype == np.int32
+    assert detections.boxes.tolist() == [[0, 21, 201, 100]]
+
+
+def test_from_xyxy_accepts_tracker_output_with_id_column():
+    data = _data([[0, 0, 40, 40, 12, 0.7, 7]])  # [x1, y1, x2, y2, id, conf, cls]
+
+    detection = DetectionArray.from_xyxy(data, NAMES, [7], [7]).to_detections()[0]
+
+    assert detection.class_name == 'truck'
+    assert detection.is_truck is True
+    assert detection.confidence == np.float32(0.7)
+
+
+def test_from_xyxy_empty_input():
+    for data in (None, np.empty((0, 6), dtype=np.float32)):
+        detections = DetectionArray.from_xyxy(data, NAMES, [2], [7])
+        assert len(detections) == 0
+        assert detections.best() is None
+        assert detections.to_dicts() == []
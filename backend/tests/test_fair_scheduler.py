@@ -0,0 +1,68 @@
+import pytest
+
+pytest.importorskip('cv2')  # camera_manager, camera_capture üzerinden cv2 yükler
+
+from utils.camera_manager import FairScheduler
+
+
+def test_newer_frame_replaces_pending_one_and_is_discarded():
+    discarded = []
+    scheduler = FairScheduler(discard=discarded.append)
+
+    assert scheduler.submit('kapi-1', 'f1') is False
+    assert scheduler.submit('kapi-1', 'f2') is True
+
+    assert discarded == ['f1']
+    assert scheduler.dropped == 1
+    assert scheduler.next(timeout=0) == ('kapi-1', 'f2')
+
+
+def test_remove_discards_pending_item():
+    discarded = []
+    scheduler = FairScheduler(discard=discarded.append)
+    scheduler.submit('kapi-1', 'f1')
+    scheduler.remove('kapi-1')
+
+    assert discarded == ['f1']
+    assert scheduler.next(timeout=0) is None
+
+
+def test_higher_priority_camera_runs_first():
+    scheduler = FairScheduler()
+    scheduler.submit('serit', 'a', priority=0)
+    scheduler.submit('kapi', 'b', priority=5)
+
+    assert scheduler.next(timeout=0) == ('kapi', 'b')
+    assert scheduler.next(timeout=0) == ('serit', 'a')
+
+
+def test_weighted_share_follows_weights():
+    scheduler = FairScheduler()
+    served = {'agir': 0, 'hafif': 0}
+
+    for _ in range(30):
+        for key, weight in (('agir', 2.0), ('hafif', 1.0)):
+            if key not in scheduler._pending:
+                scheduler.submit(key, key, weight=weight)
+        key, _ = scheduler.next(timeout=0)
+        served[key] += 1
+
+    assert served['agir'] == 20
+    assert served['hafif'] == 10
+
+
+def test_next_batch_takes_one_item_per_camera():
+    scheduler = FairScheduler()
+    scheduler.submit('a', 1)
+    scheduler.submit('b', 2)
+    scheduler.submit('c', 3)
+
+    batch = scheduler.next_batch(max_items=2, max_wait=0, timeout=0)
+
+    assert len(batch) == 2
+    assert len({key for key, _ in batch}) == 2
+    assert scheduler.depth() == 1
+
+
+def test_next_batch_returns_empty_on_timeout():
+    assert FairScheduler().next_batch(max_items=4, timeout=0) == []
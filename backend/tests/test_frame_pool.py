@@ -0,0 +1,70 @@
+import numpy as np # type: ignore
+import pytest # type: ignore
+
+from utils.frame_pool import FramePool
+
+
+def test_in_use_buffer_is_never_handed_out_again():
+    pool = FramePool(max_buffers=4)
+    frame = pool.acquire((4, 4, 3))
+    frame[:] = 7
+    roi = frame[1:3, 1:3]
+
+    # Tampon release edilmediği sürece sonraki acquire'lar başka tampon verir
+    others = [pool.acquire((4, 4, 3)) for _ in range(3)]
+    assert all(other is not frame for other in others)
+    assert not any(np.shares_memory(other, roi) for other in others)
+    assert (roi == 7).all()
+
+
+def test_released_buffer_is_reused():
+    pool = FramePool(max_buffers=2)
+    frame = pool.acquire((4, 4, 3))
+    pool.release(frame)
+
+    assert pool.acquire((4, 4, 3)) is frame
+    assert pool.stats()['reuses'] == 1
+
+
+def test_reuse_requires_matching_shape_and_dtype():
+    pool = FramePool(max_buffers=2)
+    frame = pool.acquire((4, 4, 3), np.uint8)
+    pool.release(frame)
+
+    other = pool.acquire((4, 4, 3), np.float32)
+    assert other is not frame
+    assert other.dtype == np.float32
+
+    pool.release(other)
+    resized = pool.acquire((8, 8, 3), np.float32)
+    assert resized is not other
+    assert resized.shape == (8, 8, 3)
+
+
+def test_full_pool_allocates_outside_and_ignores_their_release():
+    pool = FramePool(max_buffers=1)
+    pooled = pool.acquire((2, 2))
+    extra = pool.acquire((2, 2))
+    pool.release(extra)
+
+    assert pool.stats()['in_use'] == 1
+    assert pool.acquire((2, 2)) is not pooled
+
+    pool.release(pooled)
+    assert pool.acquire((2, 2)) is pooled
+
+
+def test_captured_frame_returns_buffer_after_last_release():
+    camera_capture = pytest.importorskip('utils.camera_capture')
+
+    pool = FramePool(max_buffers=2)
+    buffer = pool.acquire((4, 4, 3))
+    captured = camera_capture.CapturedFrame(image=buffer, pool=pool)
+    captured.retain()
+
+    captured.release()
+    assert pool.acquire((4, 4, 3)) is not buffer
+
+    captured.release()
+    captured.release()  # fazladan release yok sayılır
+    assert pool.acquire((4, 4, 3)) is buffer
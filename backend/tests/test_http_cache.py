@@ -0,0 +1,112 @@
+import pytest # type: ignore
+
+flask = pytest.importorskip('flask')
+
+from utils import http_cache
+from utils.http_cache import ResponseCache, request_key
+
+
+@pytest.fixture
+def app():
+    return flask.Flask(__name__)
+
+
+class _Builder:
+    def __init__(self, body):
+        self.body = body
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return dict(self.body)
+
+
+def _respond(app, cache, build, headers=None, **kwargs):
+    with app.test_request_context('/api/plates?limit=10', headers=headers or {}):
+        return cache.respond('plates', build, **kwargs)
+
+
+def test_second_request_is_served_from_cache(app):
+    cache, build = ResponseCache(), _Builder({'items': [1]})
+    first = _respond(app, cache, build, version=1)
+    second = _respond(app, cache, build, version=1)
+
+    assert build.calls == 1
+    assert first.status_code == second.status_code == 200
+    assert first.get_etag() == second.get_etag()
+    assert first.headers['Cache-Control'] == 'no-cache'
+    assert cache.status()['hits'] == 1
+
+
+def test_matching_etag_returns_304_without_body(app):
+    cache, build = ResponseCache(), _Builder({'items': [1]})
+    app.add_url_rule('/api/plates', 'plates', lambda: cache.respond('plates', build))
+    client = app.test_client()
+    etag = client.get('/api/plates').headers['ETag']
+
+    response = client.get('/api/plates', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert cache.status()['not_modified'] == 1
+
+
+def test_version_change_rebuilds_and_changes_etag(app):
+    cache, build = ResponseCache(), _Builder({'items': [1]})
+    etag, _ = _respond(app, cache, build, version=1).get_etag()
+
+    build.body = {'items': [1, 2]}
+    response = _respond(app, cache, build, version=2, headers={'If-None-Match': f'"{etag}"'})
+    assert build.calls == 2
+    assert response.status_code == 200
+    assert response.get_etag()[0] != etag
+
+
+def test_zero_ttl_rebuilds_but_still_answers_304(app):
+    cache, build = ResponseCache(), _Builder({'items': [1]})
+    etag, _ = _respond(app, cache, build, ttl=0).get_etag()
+
+    response = _respond(app, cache, build, ttl=0, headers={'If-None-Match': f'"{etag}"'})
+    assert build.calls == 2
+    assert response.status_code == 304
+
+
+def test_ttl_expiry(app, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(http_cache.time, 'time', lambda: now[0])
+    cache, build = ResponseCache(), _Builder({'ok': True})
+
+    _respond(app, cache, build, ttl=5)
+    now[0] += 4
+    _respond(app, cache, build, ttl=5)
+    assert build.calls == 1
+    now[0] += 1
+    _respond(app, cache, build, ttl=5)
+    assert build.calls == 2
+
+
+def test_failed_build_is_not_cached(app):
+    cache = ResponseCache()
+
+    def broken():
+        raise RuntimeError('db')
+
+    with pytest.raises(RuntimeError):
+        _respond(app, cache, broken)
+    assert cache.status()['entries'] == 0
+
+
+def test_lru_eviction_and_invalidate(app):
+    cache = ResponseCache(max_entries=2)
+    with app.test_request_context('/'):
+        for key in ('plates?a', 'plates?b', 'health'):
+            cache.respond(key, lambda: {'key': key})
+        assert cache.status()['entries'] == 2
+        cache.invalidate('plates')
+        assert cache.status()['entries'] == 1
+
+
+def test_request_key_sorts_query_arguments(app):
+    with app.test_request_context('/api/plates?q=34&limit=10'):
+        first = request_key('plates')
+    with app.test_request_context('/api/plates?limit=10&q=34'):
+        assert request_key('plates') == first == 'plates?limit=10&q=34'
@@ -0,0 +1,131 @@
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np # type: ignore
+import pytest # type: ignore
+
+from utils.inference_workers import (WorkerBusyError, WorkerUnavailableError, _AttachedRings,
+                                     _ProcessWorker, _sync_tracing)
+from utils.tracing import span, tracer
+
+
+def _echo_worker_main(shm_name, slots, slot_bytes, task_queue, result_queue):
+    """Slot'taki son baytı döndüren; 255 görünce çöken test işçisi"""
+    rings = _AttachedRings(slots, slot_bytes, shm_name)
+    result_queue.put(('ready', None, None))
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        seq, slot, shape, _, ring_ref = task[:5]
+        value = int(rings.view(ring_ref, slot, shape).flat[-1])
+        if value == 255:
+            os._exit(1)
+        if value == 254:
+            continue  # Sonuç hiç dönmez (slot tutulur)
+        result_queue.put(('result', seq, value))
+        rings.release_stale()
+    rings.close()
+
+
+@pytest.fixture
+def worker():
+    worker = _ProcessWorker(_echo_worker_main, slots=2, slot_bytes=16, timeout=0.5)
+    worker.wait_ready(30)
+    yield worker
+    worker.close()
+
+
+def _image(value):
+    return np.full((4,), value, dtype=np.uint8)
+
+
+def test_submit_returns_worker_result(worker):
+    assert worker.submit(_image(7)).result(timeout=5) == 7
+
+
+def test_full_ring_raises_busy_error(worker):
+    worker.submit(_image(254))
+    worker.submit(_image(254))
+    with pytest.raises(WorkerBusyError):
+        worker.submit(_image(1))
+
+
+def test_crash_fails_pending_and_reclaims_slots(worker):
+    stuck = worker.submit(_image(254))
+    crash = worker.submit(_image(255))
+
+    for future in (stuck, crash):
+        with pytest.raises(WorkerUnavailableError):
+            future.result(timeout=10)
+
+    # Yeniden başlatılan işçi tüm slot'larla tekrar iş alır
+    worker.wait_ready(30)
+    assert worker.restarts == 1
+    assert worker.pending() == 0
+    assert [worker.submit(_image(value)).result(timeout=5) for value in (1, 2, 3)] == [1, 2, 3]
+
+
+def test_oversized_frame_grows_ring(worker):
+    stuck = worker.submit(_image(254))
+    old_ring = worker.ring
+
+    assert worker.submit(np.full((64,), 9, dtype=np.uint8)).result(timeout=5) == 9
+    assert worker.ring.slot_bytes == 64
+    # Üzerinde iş bekleyen eski tampon hemen kapatılmaz
+    assert worker._retired_rings == [old_ring]
+    assert worker.submit(_image(3)).result(timeout=5) == 3
+    assert not stuck.done()
+
+
+def _never_ready_worker_main(shm_name, slots, slot_bytes, task_queue, result_queue):
+    """Hazır olduğunu hiç bildirmeyen test işçisi"""
+    time.sleep(60)
+
+
+def test_wait_ready_timeout_stops_process_and_frees_memory():
+    worker = _ProcessWorker(_never_ready_worker_main, slots=2, slot_bytes=16, timeout=0.5)
+
+    with pytest.raises(TimeoutError):
+        worker.wait_ready(0.5)
+
+    worker.process.join(timeout=5)
+    assert not worker.process.is_alive()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=worker.ring.name)
+
+
+def _traced_worker_main(shm_name, slots, slot_bytes, task_queue, result_queue):
+    """Her görev için bir span kaydedip sonuçla geri gönderen test işçisi"""
+    result_queue.put(('ready', None, None))
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        seq, trace = task[0], task[3]
+        _sync_tracing(trace)
+        with span('echo', 'test', seq=seq):
+            pass
+        result_queue.put(('result', seq, tracer.collect() if trace else None))
+
+
+def test_worker_spans_are_recorded_in_parent_trace():
+    worker = _ProcessWorker(_traced_worker_main, slots=2, slot_bytes=16, timeout=1.0)
+    try:
+        worker.wait_ready(30)
+        assert worker.submit(_image(0)).result(timeout=5) is None
+
+        tracer.start()
+        events = worker.submit(_image(0)).result(timeout=5)
+        worker._record_trace(events)
+        exported = tracer.export()['traceEvents']
+    finally:
+        tracer.stop()
+        tracer.clear()
+        worker.close()
+
+    names = {event['args']['name'] for event in exported if event['ph'] == 'M'}
+    assert any(name.startswith('worker (pid') for name in names)
+    echo = [event for event in exported if event['name'] == 'echo']
+    assert len(echo) == 1 and echo[0]['ph'] == 'X'
@@ -0,0 +1,104 @@
+import pytest
+
+from database_utils.local_journal import AccessLogJournal, hour_bucket
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = AccessLogJournal(str(tmp_path / 'journal' / 'access.db'), synchronous='NORMAL')
+    yield journal
+    journal.close()
+
+
+def _event(plate, action, timestamp, **extra):
+    return dict(plate_number=plate, action=action, timestamp=timestamp, vehicle_type='truck', **extra)
+
+
+def test_append_then_sync_lifecycle(journal):
+    first = journal.append(_event('34ABC123', 'open', '2024-05-01T13:05:00'))
+    journal.append(_event('06XYZ99', 'denied', '2024-05-01T13:10:00', success=False))
+
+    assert first['client_id']
+    pending = journal.pending(10)
+    assert [record['plate_number'] for _, record in pending] == ['34ABC123', '06XYZ99']
+    assert pending[1][1]['success'] is False
+
+    journal.mark_failed([pending[0][0]], 'zaman aşımı')
+    journal.mark_synced([pending[0][0]])
+
+    assert [record['plate_number'] for _, record in journal.pending(10)] == ['06XYZ99']
+    assert journal.stats()['pending'] == 1
+    assert journal.stats()['oldest_pending'] == '2024-05-01T13:10:00'
+
+
+def test_duplicate_client_id_is_rejected_without_touching_rollup(journal):
+    journal.append(_event('34ABC123', 'open', '2024-05-01T13:05:00', client_id='olay-1'))
+
+    with pytest.raises(Exception):
+        journal.append(_event('34ABC123', 'open', '2024-05-01T13:06:00', client_id='olay-1'))
+
+    assert journal.stats()['total'] == 1
+    assert journal.aggregate('2024-05-01T00:00:00', '2024-05-02T00:00:00')['totals']['attempts'] == 1
+
+
+def test_recent_is_newest_first(journal):
+    journal.append(_event('34ABC123', 'open', '2024-05-01T13:05:00'))
+    journal.append(_event('34ABD456', 'denied', '2024-05-01T14:05:00'))
+    journal.append(_event('06XYZ99', 'open', '2024-05-02T09:00:00'))
+    journal.mark_synced([journal.pending(1)[0][0]])
+
+    assert [r['plate_number'] for r in journal.recent(10)] == ['06XYZ99', '34ABD456', '34ABC123']
+    assert [r['plate_number'] for r in journal.recent(10, unsynced_only=True)] == ['06XYZ99', '34ABD456']
+    assert len(journal.recent(1)) == 1
+
+
+def test_recent_filters(journal):
+    journal.append(_event('34ABC123', 'open', '2024-05-01T13:05:00'))
+    journal.append(_event('34ABD456', 'denied', '2024-05-01T14:05:00'))
+    journal.append(_event('06XYZ99', 'open', '2024-05-02T09:00:00'))
+
+    assert [r['plate_number'] for r in journal.recent(10, plate_prefix='34AB')] == ['34ABD456', '34ABC123']
+    assert [r['plate_number'] for r in journal.recent(10, action='open', since='2024-05-02')] == ['06XYZ99']
+    assert [r['plate_number'] for r in journal.recent(10, until='2024-05-01T14:00:00')] == ['34ABC123']
+    # Saat dilimli filtreler günlükteki UTC biçimine çevrilerek karşılaştırılır
+    assert [r['plate_number'] for r in journal.recent(10, until='2024-05-01T17:00:00+03:00')] == ['34ABC123']
+
+
+def test_prune_keeps_unsynced_rows(journal):
+    journal.append(_event('34ABC123', 'open', '2020-01-01T00:00:00'))
+    journal.append(_event('06XYZ99', 'open', '2020-01-01T00:00:00'))
+    journal.mark_synced([journal.pending(1)[0][0]])
+
+    assert journal.prune(retention_days=30) == 1
+    assert journal.stats()['total'] == 1
+
+
+def test_hourly_rollup_aggregate(journal):
+    journal.append(_event('34ABC123', 'open', '2024-05-01T13:05:00'))
+    journal.append(_event('34ABC123', 'open', '2024-05-01T13:55:00'))
+    journal.append(_event('06XYZ99', 'denied', '2024-05-01T14:10:00'))
+    journal.append(_event('06XYZ99', 'denied', '2024-05-03T10:00:00'))  # aralık dışı
+
+    stats = journal.aggregate('2024-05-01T13:30:00', '2024-05-02T00:00:00')
+
+    assert hour_bucket('2024-05-01T13:30:00') == '2024-05-01T13:00:00'
+    assert stats['totals'] == {'attempts': 3, 'open': 2, 'denied': 1, 'unique_plates': 2}
+    assert [(row['bucket'], row['attempts']) for row in stats['by_time']] == [
+        ('2024-05-01T13:00:00', 2), ('2024-05-01T14:00:00', 1)]
+    assert stats['by_plate'][0]['plate_number'] == '34ABC123'
+    assert stats['by_plate'][0]['last_seen'] == '2024-05-01T13:55:00'
+
+    daily = journal.aggregate('2024-05-01T00:00:00', '2024-05-04T00:00:00', bucket='day', top=1)
+    assert [(row['bucket'], row['attempts']) for row in daily['by_time']] == [('2024-05-01', 3), ('2024-05-03', 1)]
+    assert len(daily['by_plate']) == 1
+    assert daily['by_vehicle_type'] == [{'vehicle_type': 'truck', 'attempts': 4, 'open': 2, 'denied': 2}]
+
+
+def test_aggregate_normalizes_both_bounds(journal):
+    journal.append(_event('34ABC123', 'open', '2024-05-01T13:05:00'))
+    journal.append(_event('34ABC123', 'open', '2024-05-01T14:05:00'))
+
+    # 16:00+03:00 = 13:00Z ve 15:00+01:00 = 14:00Z; 'Z' son eki de kabul edilir
+    stats = journal.aggregate('2024-05-01T16:00:00+03:00', '2024-05-01T15:00:00+01:00')
+    assert stats['totals']['attempts'] == 1
+    assert journal.aggregate('2024-05-01T13:00:00Z', '2024-05-01T15:00:00Z')['totals']['attempts'] == 2
@@ -0,0 +1,68 @@
+import logging
+import queue
+
+import pytest # type: ignore
+
+from utils import logging_setup
+from utils.logging_setup import DeferredQueueHandler, RateLimitFilter
+
+
+def _record(level=logging.INFO, lineno=10, msg='mesaj %s', args=('x',), **extra):
+    record = logging.LogRecord('test', level, 'test.py', lineno, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+@pytest.fixture
+def frozen_time(monkeypatch):
+    monkeypatch.setattr(logging_setup.time, 'monotonic', lambda: 100.0)
+
+
+def test_burst_then_drops_and_reports_suppressed(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(logging_setup.time, 'monotonic', lambda: now[0])
+    limiter = RateLimitFilter(rate=1.0, burst=2)
+
+    assert [limiter.filter(_record()) for _ in range(4)] == [True, True, False, False]
+    assert limiter.dropped == 2
+
+    now[0] += 1.0
+    record = _record()
+    assert limiter.filter(record)
+    assert record.suppressed == 2
+
+
+def test_call_sites_have_separate_buckets(frozen_time):
+    limiter = RateLimitFilter(rate=1.0, burst=1)
+    assert limiter.filter(_record(lineno=1))
+    assert not limiter.filter(_record(lineno=1))
+    assert limiter.filter(_record(lineno=2))
+
+
+def test_errors_and_audit_records_are_never_dropped(frozen_time):
+    limiter = RateLimitFilter(rate=1.0, burst=1)
+    assert limiter.filter(_record(logging.WARNING, audit=True))
+    assert all(limiter.filter(_record(logging.WARNING, audit=True)) for _ in range(50))
+    assert all(limiter.filter(_record(logging.ERROR)) for _ in range(50))
+    assert limiter.dropped == 0
+
+
+def test_debug_sampling(monkeypatch, frozen_time):
+    monkeypatch.setattr(logging_setup.random, 'random', lambda: 0.5)
+    limiter = RateLimitFilter(rate=0, debug_sample_rate=0.25)
+    assert not limiter.filter(_record(logging.DEBUG))
+    assert limiter.filter(_record(logging.INFO))
+
+
+def test_queue_handler_leaves_formatting_to_listener():
+    log_queue = queue.SimpleQueue()
+    handler = DeferredQueueHandler(log_queue)
+    handler.setFormatter(logging.Formatter('BİÇİMLİ %(message)s'))
+
+    record = _record(msg='plaka %s', args=('34ABC1234',))
+    handler.handle(record)
+
+    queued = log_queue.get_nowait()
+    assert queued.msg == 'plaka %s'
+    assert queued.args == ('34ABC1234',)
+    assert queued.getMessage() == 'plaka 34ABC1234'
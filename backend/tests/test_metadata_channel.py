@@ -0,0 +1,30 @@
+import threading
+
+from utils.metadata_channel import MetadataChannel
+
+
+def test_subscribe_yields_latest_record():
+    channel = MetadataChannel(keepalive=0.05)
+    channel.publish({'seq': 1, 'detections': []})
+    stream = channel.subscribe()
+
+    assert next(stream).startswith('retry:')
+    message = next(stream)
+    assert message.startswith('id: 1\nevent: detections\n')
+
+
+def test_close_ends_open_subscriptions():
+    channel = MetadataChannel(keepalive=5.0)
+    stream = channel.subscribe()
+    next(stream)
+
+    # Abone kayıt beklerken kanal kapanır
+    threading.Timer(0.05, channel.close).start()
+    assert list(stream) == []
+    assert channel.closed
+
+
+def test_subscribe_after_close_ends_immediately():
+    channel = MetadataChannel()
+    channel.close()
+    assert list(channel.subscribe()) == ['retry: 2000\n\n']
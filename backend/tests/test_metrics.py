@@ -0,0 +1,15 @@
+from utils.metrics import MetricsRegistry
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    counter = registry.counter('test_total', 'Test', label='camera')
+    counter.inc('rtsp://a"b\\c\nd')
+    registry.gauge('test_gauge', 'Test', lambda: {'x"y': 2}, label='source')
+
+    output = registry.render()
+
+    assert 'test_total{camera="rtsp://a\\"b\\\\c\\nd"} 1' in output
+    assert 'test_gauge{source="x\\"y"} 2' in output
+    # Ham satır sonu çıktıyı bozmaz: her örnek tek satırda kalır
+    assert len([line for line in output.splitlines() if line.startswith('test_total{')]) == 1
@@ -0,0 +1,71 @@
+import pytest
+
+from database_utils.local_journal import utc_timestamp
+from database_utils.pagination import (LOCAL_ROW_ID, InvalidCursorError, build_page, decode_cursor,
+                                       encode_cursor, keyset_filter, merge_local_rows, normalize_prefix,
+                                       select_columns)
+
+
+def test_cursor_round_trip():
+    row = {'id': 42, 'timestamp': '2024-05-01T13:05:00+03:00'}
+
+    cursor = encode_cursor(row, 'timestamp')
+
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == ('2024-05-01T13:05:00+03:00', 42)
+    assert decode_cursor('') is None
+
+
+@pytest.mark.parametrize('cursor', ['bozuk!', encode_cursor({'timestamp': 'x'}, 'timestamp'), 'W10'])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_keyset_filter_quotes_values():
+    assert keyset_filter('timestamp', ('2024-05-01T13:05:00+03:00', 42)) == (
+        '(timestamp.lt."2024-05-01T13:05:00+03:00",'
+        'and(timestamp.eq."2024-05-01T13:05:00+03:00",id.lt."42"))')
+    assert keyset_filter('plate_number', ('A"B', 1), descending=False).startswith('(plate_number.gt."A\\"B"')
+
+
+def test_build_page_uses_extra_row_for_has_more():
+    rows = [{'id': i, 'timestamp': f't{i}'} for i in (5, 4, 3)]
+
+    page = build_page(rows, 2, 'timestamp')
+    assert [row['id'] for row in page['items']] == [5, 4]
+    assert page['has_more'] is True
+    assert decode_cursor(page['next_cursor']) == ('t4', 4)
+
+    last = build_page(rows[:2], 2, 'timestamp')
+    assert last['has_more'] is False and last['next_cursor'] is None
+
+
+def test_select_columns_and_prefix():
+    allowed = ('id', 'plate_number', 'action', 'timestamp')
+
+    assert select_columns(None, allowed, ('id',)) == list(allowed)
+    assert select_columns('action, parola ,plate_number', allowed, ('id', 'timestamp')) == [
+        'action', 'plate_number', 'id', 'timestamp']
+    assert normalize_prefix(' 34 ab%_') == '34AB'
+    assert normalize_prefix(None) == ''
+
+
+def test_merge_local_rows_truncates_and_continues_after_last_item():
+    remote = [{'id': 'b', 'timestamp': '2024-05-01T10:00:00+00:00'},
+              {'id': 'a', 'timestamp': '2024-05-01T09:00:00.5+00:00'}]
+    page = build_page(remote, 2, 'timestamp')
+    # Yerel saat dilimsiz zaman UTC'ye getirilmiş olarak gelir
+    local = [{'id': None, 'timestamp': utc_timestamp('2024-05-01T09:30:00').isoformat()}]
+
+    merged = merge_local_rows(page, local, 2, 'timestamp', parse=utc_timestamp)
+
+    assert [row['id'] for row in merged['items']] == ['b', None]
+    assert merged['has_more'] is True
+    assert decode_cursor(merged['next_cursor']) == ('2024-05-01T09:30:00+00:00', LOCAL_ROW_ID)
+
+
+def test_merge_local_rows_without_local_rows_keeps_page():
+    page = build_page([{'id': 'a', 'timestamp': '2024-05-01T09:00:00+00:00'}], 2, 'timestamp')
+
+    assert merge_local_rows(page, [], 2, 'timestamp') is page
@@ -0,0 +1,31 @@
+import pytest # type: ignore
+
+from utils.plate_format import PLATE_MAX_LENGTH, normalize_plate
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('34ABC1234', '34ABC1234'),
+    (' 34 abc 1234 ', '34ABC1234'),
+    ('34-ABC-1234\n', '34ABC1234'),
+    ('06 def 56', '06DEF56'),
+])
+def test_normalizes_to_uppercase_alphanumerics(value, expected):
+    assert normalize_plate(value) == (expected, None)
+
+
+def test_ocr_and_manual_entries_share_the_lookup_key():
+    manual, _ = normalize_plate('34 ABC 1234')
+    ocr, _ = normalize_plate('34ABC 1234.')
+    assert manual == ocr
+
+
+@pytest.mark.parametrize('value', [None, 341234, ['34ABC1234']])
+def test_rejects_non_strings(value):
+    plate, error = normalize_plate(value)
+    assert plate is None and error
+
+
+@pytest.mark.parametrize('value', ['34 A', '--', 'X' * (PLATE_MAX_LENGTH + 1)])
+def test_rejects_bad_lengths(value):
+    plate, error = normalize_plate(value)
+    assert plate is None and 'Geçersiz' in error
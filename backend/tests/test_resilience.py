@@ -0,0 +1,191 @@
+import threading
+
+import pytest # type: ignore
+
+from config.detection_config import DetectionConfig
+from database_utils import resilience
+from database_utils.database import SupabaseDB, _is_client_error
+from database_utils.resilience import (STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, CircuitBreaker,
+                                       CircuitOpenError, backoff_delay)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(resilience.time, 'monotonic', clock.monotonic)
+    return clock
+
+
+def test_breaker_opens_after_threshold_and_rejects(clock):
+    breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=10)
+    breaker.record_failure(ConnectionError('a'))
+    assert breaker.state == STATE_CLOSED
+
+    breaker.record_failure(ConnectionError('b'))
+    assert breaker.state == STATE_OPEN
+    assert not breaker.allow()
+    assert breaker.status()['rejected_calls'] == 1
+
+
+def test_breaker_half_open_allows_single_probe(clock):
+    breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=10)
+    breaker.record_failure(ConnectionError('a'))
+
+    clock.now += 10
+    assert breaker.state == STATE_HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_failure(ConnectionError('b'))
+    assert breaker.state == STATE_OPEN
+
+    clock.now += 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.allow()
+
+
+def test_backoff_delay_is_capped_full_jitter(monkeypatch):
+    monkeypatch.setattr(resilience.random, 'uniform', lambda low, high: high)
+    assert [backoff_delay(attempt, 0.1, 1.0) for attempt in range(6)] == [0.1, 0.2, 0.4, 0.8, 1.0, 1.0]
+
+
+class _APIError(Exception):
+    def __init__(self, code):
+        super().__init__(f'hata {code}')
+        self.code = code
+
+
+@pytest.mark.parametrize('code, client', [
+    ('23505', True),      # unique_violation
+    ('42P01', True),      # undefined_table
+    ('PGRST116', True),   # tek satır beklenirken 0 satır
+    ('PGRST001', False),  # veritabanına bağlanılamadı (503)
+    ('57014', False),     # statement timeout
+    ('08006', False),     # bağlantı hatası
+    (502, False),         # JSON olmayan ağ geçidi yanıtı
+    (404, True),
+    (None, False),
+])
+def test_client_error_classification(code, client):
+    assert _is_client_error(_APIError(code)) is client
+
+
+class _Query:
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def execute(self):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(DetectionConfig, 'DB_MAX_RETRIES', 2)
+    monkeypatch.setattr('database_utils.database.time.sleep', lambda seconds: None)
+    db = SupabaseDB.__new__(SupabaseDB)
+    db.config = DetectionConfig
+    db.circuit = CircuitBreaker('test', failure_threshold=1, reset_timeout=60)
+    return db
+
+
+def test_execute_client_error_keeps_circuit_closed(db):
+    query = _Query(_APIError('23505'))
+    with pytest.raises(_APIError):
+        db._execute(query)
+    assert query.calls == 1
+    assert db.circuit.state == STATE_CLOSED
+
+
+def test_execute_server_error_is_retried_then_opens_circuit(db):
+    query = _Query(_APIError('PGRST001'), _APIError(503), _APIError('57014'))
+    with pytest.raises(_APIError):
+        db._execute(query)
+    assert query.calls == 3
+    assert db.circuit.state == STATE_OPEN
+    with pytest.raises(CircuitOpenError):
+        db._execute(_Query('ok'))
+
+
+def test_execute_server_error_on_write_is_not_retried(db):
+    query = _Query(_APIError(500), 'ok')
+    with pytest.raises(_APIError):
+        db._execute(query, idempotent=False)
+    assert query.calls == 1
+    assert db.circuit.state == STATE_OPEN
+
+
+def test_execute_recovers_after_transient_error(db):
+    query = _Query(ConnectionError('reset'), 'ok')
+    assert db._execute(query) == 'ok'
+    assert db.circuit.state == STATE_CLOSED
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+
+class _PlatesTable:
+    """İlk upsert satırı ekleyip bağlantıyı koparan (yanıt kaybolur) plates tablosu"""
+
+    def __init__(self, existing):
+        self.rows = {plate: {'plate_number': plate, 'created_at': '2020-01-01T00:00:00'} for plate in existing}
+        self.upserts = 0
+        self.filters = {}
+
+    def upsert(self, rows, **kwargs):
+        self.pending = rows
+        return self
+
+    def select(self, columns):
+        self.pending = None
+        return self
+
+    def in_(self, column, values):
+        self.filters[column] = set(values)
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = {value}
+        return self
+
+    def execute(self):
+        if self.pending is None:
+            return _Response([row for row in self.rows.values()
+                              if all(row[column] in values for column, values in self.filters.items())])
+
+        self.upserts += 1
+        inserted = [dict(row) for row in self.pending if row['plate_number'] not in self.rows]
+        self.rows.update((row['plate_number'], row) for row in inserted)
+        if self.upserts == 1:
+            raise ConnectionError('yanıt okunamadı')
+        return _Response(inserted)
+
+
+def test_add_plates_counts_rows_inserted_by_lost_attempt(db):
+    table = _PlatesTable(existing=['06DEF5678'])
+    db.supabase = type('_Client', (), {'table': lambda self, name: table})()
+    db.replica = None
+    db._version_lock = threading.Lock()
+    db.plates_version = 0
+
+    results = db.add_plates(['34ABC1234', '06DEF5678'])
+
+    assert table.upserts == 2
+    assert results == {'34ABC1234': ('added', None), '06DEF5678': ('exists', None)}
+    assert db.plates_version == 1
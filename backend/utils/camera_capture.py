@@ -0,0 +1,187 @@
+import cv2 # type: ignore
+import numpy as np # type: ignore
+import logging
+import threading
+
+from utils.frame_pool import FramePool
+
+logger = logging.getLogger(__name__)
+
+# Yakalama modları
+CAPTURE_DECODED = 'decoded'
+CAPTURE_MJPEG_PASSTHROUGH = 'mjpeg_passthrough'
+
+
+class CapturedFrame:
+    """
+    Kameradan okunan tek frame.
+
+    MJPEG geçiş modunda kameranın sıkıştırılmış JPEG baytları saklanır ve
+    görüntü sadece image özelliğine ilk erişildiğinde çözülür.
+
+    Görüntü FramePool tamponundaysa frame referans sayılır: oluşturan bir
+    referansla başlar, frame'i saklayan her tüketici retain() çağırır ve
+    işi bitince release() ile bırakır. Son release() tamponu havuza
+    döndürür; sonrasında görüntü (ve dilimleri) kullanılmamalıdır.
+    """
+
+    __slots__ = ('_jpeg', '_image', '_pool', '_refs', '_lock')
+
+    def __init__(self, jpeg=None, image=None, pool=None):
+        self._jpeg = jpeg
+        self._image = image
+        self._pool = pool
+        self._refs = 1
+        self._lock = threading.Lock() if pool is not None else None
+
+    def retain(self):
+        """Frame'i saklayacak yeni bir tüketici için referans al"""
+        if self._pool is not None:
+            with self._lock:
+                self._refs += 1
+        return self
+
+    def release(self):
+        """Referansı bırak; son referanssa tampon havuza döner"""
+        if self._pool is None:
+            return
+        with self._lock:
+            if self._refs <= 0:
+                return
+            self._refs -= 1
+            if self._refs:
+                return
+        self._pool.release(self._image)
+
+    @property
+    def jpeg(self):
+        """Kameranın ürettiği ham JPEG baytları (yoksa None)"""
+        return self._jpeg
+
+    @property
+    def decoded(self):
+        return self._image is not None
+
+    @property
+    def image(self):
+        """BGR görüntü (gerekirse JPEG'den çözülür ve saklanır)"""
+        if self._image is None and self._jpeg is not None:
+            self._image = cv2.imdecode(np.frombuffer(self._jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+        return self._image
+
+
+class CameraCapture:
+    """
+    cv2.VideoCapture sarmalayıcısı
+
+    'mjpeg_passthrough' modunda kamera MJPEG üretiyorsa dönüştürme kapatılır
+    ve read() sıkıştırılmış baytları döndürür; böylece stream'e yeniden
+    encode etmeden iletilebilir. Kamera ham format vermiyorsa otomatik
+    olarak çözülmüş frame'lere geri dönülür.
+
+    Çözülmüş modda frame'ler FramePool tamponlarına okunur (read(image=...));
+    sabit durumda frame başına yeni bellek ayrılmaz. Tampon, frame'in son
+    referansı bırakılınca (CapturedFrame.release) havuza döner.
+    """
+
+    def __init__(self, source, width=1280, height=720, fps=30, mode=CAPTURE_DECODED, pool=None):
+        self.source = source
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.mode = mode
+        self.cap = None
+        self.passthrough_active = False
+        self.frame_width = width
+        self.frame_height = height
+        self.pool = pool if pool is not None else FramePool()
+        self._frame_shape = None
+
+    def open(self):
+        """Kamerayı aç ve ayarları uygula"""
+        self.cap = cv2.VideoCapture(self.source)
+        if not self.cap.isOpened():
+            return False
+
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        self.cap.set(cv2.CAP_PROP_FPS, self.fps)
+
+        # Kameranın gerçekten verdiği çözünürlük (metaveri koordinatları için)
+        self.frame_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or self.width
+        self.frame_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or self.height
+
+        if self.mode == CAPTURE_MJPEG_PASSTHROUGH:
+            self._enable_passthrough()
+
+        return True
+
+    def _enable_passthrough(self):
+        if isinstance(self.source, str):
+            # IP kamera (FFmpeg): ham paketleri iste
+            self.cap.set(cv2.CAP_PROP_FORMAT, -1)
+        else:
+            # USB kamera (V4L2/MSMF): MJPEG iste ve RGB dönüşümünü kapat
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+            self.cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+
+        self.passthrough_active = True
+        logger.info(f"📦 Kamera {self.source}: MJPEG geçiş modu istendi")
+
+    def _disable_passthrough(self):
+        if not isinstance(self.source, str):
+            self.cap.set(cv2.CAP_PROP_CONVERT_RGB, 1)
+        self.passthrough_active = False
+        logger.warning(f"⚠️ Kamera {self.source} ham MJPEG vermiyor, çözülmüş frame'lere dönülüyor")
+
+    def isOpened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def read(self):
+        """Sonraki frame'i oku (başarısızsa None)"""
+        if self.passthrough_active:
+            return self._read_passthrough()
+
+        # İlk frame'den sonra boyut bilindiği için havuzdaki tampona oku
+        buffer = self.pool.acquire(self._frame_shape) if self._frame_shape else None
+        success, data = self.cap.read(image=buffer) if buffer is not None else self.cap.read()
+        if not success or data is None:
+            if buffer is not None:
+                self.pool.release(buffer)
+            return None
+
+        if data is not buffer:
+            # İlk frame veya çözünürlük değişti; sonraki okumalar bu boyutta havuzdan
+            self._frame_shape = data.shape
+            if buffer is not None:
+                self.pool.release(buffer)
+            return CapturedFrame(image=data)
+
+        return CapturedFrame(image=data, pool=self.pool)
+
+    def _read_passthrough(self):
+        success, data = self.cap.read()
+        if not success or data is None:
+            return None
+
+        # Ham MJPEG tek boyutlu bayt dizisi olarak gelir (FFD8 ile başlar)
+        if data.ndim == 1 or (data.ndim == 2 and data.shape[0] == 1):
+            raw = data.reshape(-1)
+            if raw.size > 2 and raw[0] == 0xFF and raw[1] == 0xD8:
+                return CapturedFrame(jpeg=raw.tobytes())
+
+        if data.ndim == 3:
+            self._disable_passthrough()
+            return CapturedFrame(image=data)
+
+        # Beklenmeyen ham format: çözmeyi dene
+        image = cv2.imdecode(data.reshape(-1), cv2.IMREAD_COLOR)
+        return CapturedFrame(image=image) if image is not None else None
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
@@ -0,0 +1,516 @@
+"""
+Çok kameralı hat yöneticisi
+
+Her kamera (şerit/kapı) kendi yakalama thread'i, takip durumu ve metaveri
+kanalı ile bir CameraPipeline olarak çalışır. Tek bir paylaşılan dedektör,
+kameralar arasında ağırlıklı adil kuyruk (WFQ) ve kamera önceliği ile
+zamanlanır; böylece bir kameranın yoğunluğu diğerlerini aç bırakmaz.
+Farklı kameraların bekleyen frame'leri kısa bir süre sınırıyla mikro-batch
+olarak toplanır ve tek ileri geçişte işlenir.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+# Config dosyasını import et
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config.detection_config import DetectionConfig
+from utils.camera_capture import CameraCapture
+from utils.frame_pool import FramePool
+from utils.jpeg_encoder import PreviewStream
+from utils.metrics import FRAMES_SKIPPED, observe_stage
+from utils.tracing import span, tracer
+from utils.metadata_channel import MetadataChannel, detection_to_metadata
+from utils.preview_renderer import PreviewRenderer
+
+logger = logging.getLogger(__name__)
+
+
+class FairScheduler:
+    """
+    Kameralar arası ağırlıklı adil kuyruk
+
+    Her kamera için sadece en son frame bekletilir (eskisi düşürülür).
+    Önce en yüksek öncelik seviyesi seçilir; aynı seviyede en küçük sanal
+    başlangıç zamanına sahip kamera çalışır. Bir frame'in sanal maliyeti
+    ölçülen çıkarım süresi / ağırlık olduğundan, ağırlığı 2 olan kamera
+    ağırlığı 1 olana göre iki kat çıkarım payı alır.
+
+    Yerine yenisi gelen veya remove() ile atılan öğeler (varsa) discard
+    fonksiyonuna verilir; böylece öğenin tuttuğu kaynaklar bırakılabilir.
+    """
+
+    def __init__(self, discard=None):
+        self._discard = discard
+        self._condition = threading.Condition()
+        self._pending = {}  # kamera -> (öğe, ağırlık, öncelik, maliyet)
+        self._finish_tags = {}  # kamera -> son sanal bitiş zamanı
+        self._virtual_time = 0.0
+        self.dropped = 0
+
+    def submit(self, key, item, weight=1.0, priority=0, cost=1.0):
+        """Kameranın bekleyen frame'ini güncelle; önceki düşürüldüyse True döndür"""
+        with self._condition:
+            previous = self._pending.get(key)
+            if previous is not None:
+                self.dropped += 1
+            self._pending[key] = (item, max(weight, 0.01), priority, cost)
+            self._condition.notify()
+
+        if previous is not None and self._discard is not None:
+            self._discard(previous[0])
+        return previous is not None
+
+    def remove(self, key):
+        with self._condition:
+            previous = self._pending.pop(key, None)
+            self._finish_tags.pop(key, None)
+
+        if previous is not None and self._discard is not None:
+            self._discard(previous[0])
+
+    def next(self, timeout=None):
+        """Sıradaki (kamera, öğe) çiftini döndür; zaman aşımında None"""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._pending, timeout):
+                return None
+            return self._pop_locked()
+
+    def next_batch(self, max_items=1, max_wait=0.0, timeout=None):
+        """
+        Farklı kameralardan en fazla max_items öğe topla
+
+        İlk öğe geldikten sonra batch'i doldurmak için en fazla max_wait
+        saniye beklenir; böylece eklenen gecikme sınırlı kalır.
+        Zaman aşımında boş liste döndürür.
+        """
+        first = self.next(timeout)
+        if first is None:
+            return []
+
+        batch = [first]
+        keys = {first[0]}
+        deadline = time.monotonic() + max_wait
+
+        def ready():
+            # Aynı kameranın yeni frame'i bir sonraki batch'e kalır
+            return any(key not in keys for key in self._pending)
+
+        with self._condition:
+            while len(batch) < max_items:
+                remaining = deadline - time.monotonic()
+                if not ready() and (remaining <= 0 or not self._condition.wait_for(ready, remaining)):
+                    break
+
+                entry = self._pop_locked(exclude=keys)
+                batch.append(entry)
+                keys.add(entry[0])
+
+        return batch
+
+    def _pop_locked(self, exclude=()):
+        """WFQ sırasına göre sıradaki öğeyi çıkar (kilit tutulurken çağrılır)"""
+        candidates = {key: entry for key, entry in self._pending.items() if key not in exclude}
+        top_priority = max(entry[2] for entry in candidates.values())
+
+        best_key = None
+        best_start = None
+        for key, (_, weight, priority, _) in candidates.items():
+            if priority != top_priority:
+                continue
+            start = max(self._virtual_time, self._finish_tags.get(key, 0.0))
+            if best_start is None or start < best_start:
+                best_key, best_start = key, start
+
+        item, weight, _, cost = self._pending.pop(best_key)
+        self._virtual_time = best_start
+        self._finish_tags[best_key] = best_start + cost / weight
+        return best_key, item
+
+    def depth(self):
+        with self._condition:
+            return len(self._pending)
+
+
+class CameraPipeline:
+    """Tek bir kameranın yakalama, takip ve yayın durumu"""
+
+    def __init__(self, camera_key, source, scheduler, priority=0, weight=1.0):
+        config = DetectionConfig()
+
+        self.camera_key = camera_key
+        self.source = source
+        self.priority = priority
+        self.weight = weight
+        self.scheduler = scheduler
+        self.process_every_n_frames = config.PROCESS_EVERY_N_FRAMES
+
+        self.capture = CameraCapture(source,
+                                     width=config.CAMERA_WIDTH,
+                                     height=config.CAMERA_HEIGHT,
+                                     fps=config.CAMERA_FPS,
+                                     mode=config.CAMERA_CAPTURE_MODE,
+                                     pool=FramePool(config.FRAME_POOL_SIZE))
+
+        # Paylaşılan dedektör hazır olunca oluşturulur (kameraya özel takip)
+        self.tracker = None
+
+        self.active = False
+        self.detection_active = False
+        self.metadata = MetadataChannel()
+        self.latest_detections = []
+        self.last_detection_result = None
+        self.last_plate_event = None  # (plaka olayı, zaman)
+        self.last_plate_time = 0.0
+        self.plate_pending = False
+        self.last_inferred_seq = 0
+
+        # Önizleme ayarı -> paylaşılan encode aşaması
+        self._preview_streams = {}
+        self._preview_lock = threading.Lock()
+
+        self._frame_condition = threading.Condition()
+        self._latest_frame = None  # (seq, captured, timestamp)
+        self._seq = 0
+        self._thread = None
+
+        # Ölçülen çıkarım süresi (WFQ maliyeti için, saniye)
+        self.inference_cost = 0.05
+        self.fps = 0.0
+        self.stats = {
+            'frames_captured': 0,
+            'frames_submitted': 0,
+            'frames_dropped': 0,
+            'frames_inferred': 0
+        }
+
+    def start(self):
+        if not self.capture.open():
+            logger.error(f"❌ Kamera {self.camera_key} açılamadı!")
+            return False
+
+        self.active = True
+        self._thread = threading.Thread(target=self._capture_loop,
+                                        name=f"capture-{self.camera_key}", daemon=True)
+        self._thread.start()
+
+        logger.info(f"✅ Kamera {self.camera_key} başlatıldı: "
+                    f"{self.capture.frame_width}x{self.capture.frame_height} "
+                    f"(öncelik: {self.priority}, ağırlık: {self.weight})")
+        return True
+
+    def stop(self):
+        self.active = False
+        self.detection_active = False
+        self.scheduler.remove(self.camera_key)
+
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        self.capture.release()
+
+        # Bekleyen stream'ler uyansın ve çıksın; son frame havuza döner
+        with self._frame_condition:
+            latest, self._latest_frame = self._latest_frame, None
+            self._frame_condition.notify_all()
+        if latest is not None:
+            latest[1].release()
+
+        # Metaveri abonelerinin bağlantısı kapanır; yeniden başlatılan kameranın kanalına bağlanırlar
+        self.metadata.close()
+
+        logger.info(f"🛑 Kamera {self.camera_key} durduruldu")
+
+    def set_detection(self, active):
+        self.detection_active = active
+        if not active:
+            self.scheduler.remove(self.camera_key)
+            self.latest_detections = []
+            self.publish_metadata(self._seq, time.time(), [])
+
+    def _capture_loop(self):
+        fps_frames = 0
+        fps_start = time.time()
+
+        while self.active:
+            read_start = time.perf_counter()
+            with span('capture', 'camera', camera=self.camera_key, seq=self._seq + 1):
+                captured = self.capture.read()
+            observe_stage('capture', time.perf_counter() - read_start)
+            if captured is None:
+                logger.error(f"Kamera {self.camera_key}: frame okunamadı")
+                self.active = False
+                break
+
+            now = time.time()
+            with self._frame_condition:
+                self._seq += 1
+                seq = self._seq
+                # Oluşturma referansı son frame kaydına geçer
+                previous, self._latest_frame = self._latest_frame, (seq, captured, now)
+                self._frame_condition.notify_all()
+            if previous is not None:
+                previous[1].release()
+
+            self.stats['frames_captured'] += 1
+
+            # Her N frame'de bir paylaşılan çıkarım kuyruğuna gönder
+            if self.detection_active and seq % self.process_every_n_frames == 0:
+                self.stats['frames_submitted'] += 1
+                if self.scheduler.submit(self.camera_key, (seq, captured.retain(), now),
+                                         weight=self.weight, priority=self.priority,
+                                         cost=self.inference_cost):
+                    self.stats['frames_dropped'] += 1
+                    FRAMES_SKIPPED.inc('scheduler_drop')
+                    tracer.instant('scheduler_drop', 'camera', camera=self.camera_key, seq=seq)
+            elif self.detection_active:
+                FRAMES_SKIPPED.inc('frame_skip')
+
+            fps_frames += 1
+            if now - fps_start >= 1.0:
+                self.fps = fps_frames / (now - fps_start)
+                fps_frames = 0
+                fps_start = now
+
+        with self._frame_condition:
+            self._frame_condition.notify_all()
+
+    def wait_frame(self, last_seq, timeout=1.0):
+        """
+        last_seq'ten yeni bir frame gelene kadar bekle; (seq, captured, ts) veya None
+
+        Dönen frame çağıran için retain() edilmiştir; işi bitince
+        captured.release() çağrılmalıdır.
+        """
+        with self._frame_condition:
+            self._frame_condition.wait_for(
+                lambda: not self.active or (self._latest_frame and self._latest_frame[0] != last_seq),
+                timeout
+            )
+            if self._latest_frame is None or self._latest_frame[0] == last_seq:
+                return None
+            self._latest_frame[1].retain()
+            return self._latest_frame
+
+    def preview_stream(self, render, preview_width=None, jpeg_quality=None, server_overlay=False):
+        """Aynı ayarla izleyen istemcilerin paylaştığı PreviewStream'i döndür"""
+        # Ayarları renderer ile normalize et (ör. width=10 ve width=100 aynı akış)
+        probe = PreviewRenderer(preview_width, jpeg_quality)
+        key = (probe.max_width, probe.quality, bool(server_overlay))
+
+        with self._preview_lock:
+            stream = self._preview_streams.get(key)
+            if stream is None:
+                stream = PreviewStream(self, render,
+                                       lambda: PreviewRenderer(probe.max_width, probe.quality),
+                                       server_overlay)
+                self._preview_streams[key] = stream
+            return stream
+
+    def preview_subscribers(self):
+        """Tüm önizleme akışlarındaki toplam izleyici sayısı"""
+        with self._preview_lock:
+            return sum(stream.subscribers for stream in self._preview_streams.values())
+
+    def record_inference(self, seq, timestamp, detections, elapsed):
+        """Çıkarım sonucunu kaydet ve metaveri olarak yayınla"""
+        self.latest_detections = detections
+        self.last_inferred_seq = seq
+        self.inference_cost = 0.8 * self.inference_cost + 0.2 * elapsed
+        self.stats['frames_inferred'] += 1
+        self.publish_metadata(seq, timestamp, detections)
+
+    def publish_plate_event(self, plate):
+        """Plaka sonucunu son çıkarımın kutularıyla birlikte yayınla"""
+        now = time.time()
+        self.last_plate_event = (plate, now)
+        self.publish_metadata(self.last_inferred_seq, now, self.latest_detections, plate=plate)
+
+    def publish_metadata(self, seq, timestamp, detections, plate=None):
+        self.metadata.publish({
+            'seq': seq,
+            'timestamp': timestamp,
+            'camera_id': self.camera_key,
+            'frame_size': [self.capture.frame_width, self.capture.frame_height],
+            'detection_active': self.detection_active,
+            'detections': [detection_to_metadata(d) for d in detections],
+            'plate': plate
+        })
+
+    def status(self):
+        return {
+            'camera_id': self.camera_key,
+            'source': self.source,
+            'active': self.active,
+            'detection_active': self.detection_active,
+            'priority': self.priority,
+            'weight': self.weight,
+            'resolution': f"{self.capture.frame_width}x{self.capture.frame_height}",
+            'fps': round(self.fps, 1),
+            'inference_ms': round(self.inference_cost * 1000, 1),
+            'stats': dict(self.stats),
+            'frame_pool': self.capture.pool.stats(),
+            'preview_streams': [
+                dict(stream.status(), width=width, quality=quality, overlay=overlay)
+                for (width, quality, overlay), stream in list(self._preview_streams.items())
+            ]
+        }
+
+
+class CameraManager:
+    """
+    N kamerayı açar, her birine ayrı takip durumu verir ve tek bir
+    paylaşılan dedektörü aralarında adil şekilde zamanlar.
+    """
+
+    def __init__(self, detector_getter, on_detections=None):
+        """
+        Args:
+            detector_getter: Hazırsa paylaşılan dedektörü, değilse None döndüren fonksiyon
+            on_detections: Her çıkarımdan sonra (pipeline, captured, detections) ile çağrılır;
+                captured sadece çağrı süresince geçerlidir (saklanacaksa retain() edilmeli)
+        """
+        self._get_detector = detector_getter
+        self._on_detections = on_detections
+        self._pipelines = {}
+        self._lock = threading.Lock()
+        # Durdurulan kameraların dedektörde bırakılacak takip durumları
+        self._released_trackers = []
+        # Düşürülen frame'lerin tamponları havuza döner
+        self.scheduler = FairScheduler(discard=lambda item: item[1].release())
+
+        self._dispatcher = threading.Thread(target=self._dispatch_loop,
+                                            name="inference-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    @staticmethod
+    def parse_source(camera_key, source=None):
+        """Kamera anahtarından OpenCV kaynağını çıkar (sayı ise cihaz indeksi)"""
+        if source is not None:
+            return int(source) if str(source).isdigit() else source
+        return int(camera_key) if str(camera_key).isdigit() else camera_key
+
+    def start_camera(self, camera_key, source=None, priority=0, weight=1.0):
+        """Kamerayı başlat (zaten çalışıyorsa önce durdurulur)"""
+        camera_key = str(camera_key)
+        self.stop_camera(camera_key)
+
+        pipeline = CameraPipeline(camera_key, self.parse_source(camera_key, source),
+                                  self.scheduler, priority=priority, weight=weight)
+        if not pipeline.start():
+            return None
+
+        with self._lock:
+            self._pipelines[camera_key] = pipeline
+        return pipeline
+
+    def stop_camera(self, camera_key):
+        with self._lock:
+            pipeline = self._pipelines.pop(str(camera_key), None)
+        if pipeline is None:
+            return False
+        pipeline.stop()
+        if pipeline.tracker is not None:
+            # Dispatcher thread'i bırakır; sürmekte olan batch'ten sonra kullanılmaz
+            with self._lock:
+                self._released_trackers.append(pipeline.tracker)
+        return True
+
+    def get(self, camera_key):
+        with self._lock:
+            return self._pipelines.get(str(camera_key))
+
+    def pipelines(self):
+        with self._lock:
+            return list(self._pipelines.values())
+
+    def status(self):
+        return {
+            'cameras': [pipeline.status() for pipeline in self.pipelines()],
+            'queue_depth': self.scheduler.depth(),
+            'frames_dropped': self.scheduler.dropped
+        }
+
+    def _dispatch_loop(self):
+        """Paylaşılan dedektörü kameralar arasında mikro-batch'ler halinde çalıştır"""
+        config = DetectionConfig()
+        max_wait = config.BATCH_MAX_WAIT_MS / 1000.0
+
+        while True:
+            self._release_trackers()
+
+            # Tespiti açık tek kamera varsa beklemenin faydası yok
+            active = sum(1 for pipeline in self.pipelines() if pipeline.detection_active)
+            batch = self.scheduler.next_batch(max_items=max(1, min(config.BATCH_MAX_SIZE, active)),
+                                              max_wait=max_wait, timeout=1.0)
+            if not batch:
+                continue
+
+            try:
+                self._run_batch(batch)
+            finally:
+                # Kuyruğun aldığı frame referansları bırakılır
+                for _, (_, captured, _) in batch:
+                    captured.release()
+
+    def _release_trackers(self):
+        """Durdurulan kameraların takip durumunu dedektörde bırak (işçi süreçte birikmesin)"""
+        with self._lock:
+            trackers, self._released_trackers = self._released_trackers, []
+        detector = self._get_detector() if trackers else None
+        if detector is None or not hasattr(detector, 'release_tracker'):
+            return
+        for tracker in trackers:
+            try:
+                detector.release_tracker(tracker)
+            except Exception as e:
+                logger.warning(f"⚠️ Takip durumu bırakılamadı: {str(e)}")
+
+    def _run_batch(self, batch):
+        """Batch'i paylaşılan dedektörde çalıştır ve sonuçları kameralara dağıt"""
+        detector = self._get_detector()
+        if detector is None:
+            # Modeller henüz yükleniyor
+            return
+
+        entries = []
+        for camera_key, (seq, captured, timestamp) in batch:
+            pipeline = self.get(camera_key)
+            if pipeline is None or not pipeline.detection_active:
+                continue
+            if pipeline.tracker is None:
+                # Frame atlama yakalama thread'inde yapıldığı için her frame işlenir
+                pipeline.tracker = detector.create_tracker(process_every_n_frames=1)
+            entries.append((pipeline, seq, captured, timestamp))
+
+        if not entries:
+            return
+
+        try:
+            start = time.perf_counter()
+            with span('detect_batch', 'inference',
+                      cameras=[pipeline.camera_key for pipeline, _, _, _ in entries],
+                      seqs=[seq for _, seq, _, _ in entries]):
+                results = detector.detect_batch([captured.image for _, _, captured, _ in entries],
+                                                [pipeline.tracker for pipeline, _, _, _ in entries])
+            # Batch süresi kameralara eşit paylaştırılır (WFQ maliyeti)
+            elapsed = (time.perf_counter() - start) / len(entries)
+        except Exception as e:
+            logger.error(f"❌ Batch çıkarım hatası: {str(e)}")
+            logger.error(traceback.format_exc())
+            return
+
+        for (pipeline, seq, captured, timestamp), detections in zip(entries, results):
+            try:
+                pipeline.record_inference(seq, timestamp, detections, elapsed)
+
+                if self._on_detections is not None:
+                    with span('handle_detections', 'plate', camera=pipeline.camera_key, seq=seq):
+                        self._on_detections(pipeline, captured, detections)
+
+            except Exception as e:
+                logger.error(f"❌ Kamera {pipeline.camera_key} çıkarım hatası: {str(e)}")
+                logger.error(traceback.format_exc())
@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+import traceback
+
+logger = logging.getLogger(__name__)
+
+# Bileşen durumları
+STATE_PENDING = 'pending'
+STATE_LOADING = 'loading'
+STATE_WARMING_UP = 'warming_up'
+STATE_READY = 'ready'
+STATE_ERROR = 'error'
+
+
+class ComponentLoader:
+    """
+    Ağır bileşenleri (model, OCR, veritabanı) arka plan thread'lerinde yükler.
+    API, bileşenler hazır olmadan da istek karşılayabilir; her bileşenin
+    durumu status() ile raporlanır.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._components = {}
+
+    def register(self, name, factory, warmup=None, on_ready=None):
+        """
+        Bileşeni kaydet ve arka planda yüklemeye başla
+
+        Args:
+            name: Bileşen adı ('vehicle_detector', 'plate_reader', ...)
+            factory: Bileşen örneğini döndüren fonksiyon
+            warmup: Örnek ile çağrılan ısınma fonksiyonu (opsiyonel)
+            on_ready: Bileşen READY olmadan hemen önce örnek ile çağrılır (opsiyonel;
+                hata fırlatırsa bileşen ERROR durumuna geçer)
+        """
+        with self._lock:
+            self._components[name] = {
+                'state': STATE_PENDING,
+                'instance': None,
+                'error': None,
+                'started_at': None,
+                'ready_at': None,
+                'load_seconds': None
+            }
+
+        thread = threading.Thread(
+            target=self._load,
+            args=(name, factory, warmup, on_ready),
+            name=f"loader-{name}",
+            daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _set(self, name, **fields):
+        with self._lock:
+            self._components[name].update(fields)
+
+    def _load(self, name, factory, warmup, on_ready):
+        start_time = time.time()
+        self._set(name, state=STATE_LOADING, started_at=start_time)
+        logger.info(f"⏳ {name} arka planda yükleniyor...")
+
+        try:
+            instance = factory()
+
+            if warmup is not None:
+                self._set(name, state=STATE_WARMING_UP)
+                logger.info(f"🔥 {name} ısınma çıkarımı yapılıyor...")
+                warmup(instance)
+
+            # Önce geri çağrı: READY görüldüğünde (ör. /api/ready) global'ler yayınlanmış olur
+            if on_ready is not None:
+                on_ready(instance)
+
+            ready_time = time.time()
+            self._set(
+                name,
+                state=STATE_READY,
+                instance=instance,
+                ready_at=ready_time,
+                load_seconds=round(ready_time - start_time, 2)
+            )
+            logger.info(f"✅ {name} hazır ({ready_time - start_time:.1f}s)")
+
+        except Exception as e:
+            self._set(
+                name,
+                state=STATE_ERROR,
+                error=str(e),
+                load_seconds=round(time.time() - start_time, 2)
+            )
+            logger.error(f"❌ {name} yükleme hatası: {str(e)}")
+            logger.error(traceback.format_exc())
+
+    def get(self, name):
+        """Hazırsa bileşen örneğini, değilse None döndür"""
+        with self._lock:
+            component = self._components.get(name)
+            if component and component['state'] == STATE_READY:
+                return component['instance']
+            return None
+
+    def state(self, name):
+        """Bileşenin durumunu döndür"""
+        with self._lock:
+            component = self._components.get(name)
+            return component['state'] if component else STATE_PENDING
+
+    def is_ready(self, name):
+        return self.state(name) == STATE_READY
+
+    def all_ready(self):
+        with self._lock:
+            return all(c['state'] == STATE_READY for c in self._components.values())
+
+    def status(self):
+        """Tüm bileşenlerin durum özetini döndür"""
+        with self._lock:
+            return {
+                name: {
+                    'state': c['state'],
+                    'error': c['error'],
+                    'load_seconds': c['load_seconds']
+                }
+                for name, c in self._components.items()
+            }
@@ -0,0 +1,210 @@
+import numpy as np # type: ignore
+
+# Takip geçmişinde frame başına tutulan kompakt kayıt
+HISTORY_DTYPE = np.dtype([
+    ('track_id', np.int32),
+    ('bbox', np.int32, (4,)),
+    ('class_id', np.int16),
+    ('confidence', np.float32),
+    ('stability_count', np.int16)
+])
+
+
+class Detection:
+    """
+    Tek bir tespit kaydı (sözlük yerine __slots__ ile sabit alanlı)
+
+    Mevcut kodla uyum için detection['bbox'] ve detection.get('is_truck')
+    erişimleri desteklenir; JSON için to_dict() kullanılır.
+    """
+
+    __slots__ = ('class_id', 'class_name', 'confidence', 'bbox', 'is_truck',
+                 'track_id', 'stability_count')
+
+    def __init__(self, class_id, class_name, confidence, bbox, is_truck=False,
+                 track_id=None, stability_count=0):
+        self.class_id = class_id
+        self.class_name = class_name
+        self.confidence = confidence
+        self.bbox = bbox
+        self.is_truck = is_truck
+        self.track_id = track_id
+        self.stability_count = stability_count
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if isinstance(key, str) else default
+
+    def with_bbox(self, bbox):
+        """Aynı tespitin farklı bbox'lı kopyası (önizleme ölçekleme için)"""
+        return Detection(self.class_id, self.class_name, self.confidence, bbox,
+                         self.is_truck, self.track_id, self.stability_count)
+
+    def to_dict(self):
+        return {
+            'track_id': self.track_id,
+            'bbox': list(self.bbox),
+            'class_id': self.class_id,
+            'class_name': self.class_name,
+            'confidence': float(self.confidence),
+            'is_truck': bool(self.is_truck),
+            'stability_count': self.stability_count
+        }
+
+    def __repr__(self):
+        return (f"Detection(track_id={self.track_id}, class_name={self.class_name!r}, "
+                f"confidence={self.confidence:.2f}, bbox={self.bbox}, "
+                f"stability_count={self.stability_count})")
+
+
+class Track:
+    """
+    Bir takip kaydı; her frame'de yeniden oluşturulmaz, yerinde güncellenir
+    """
+
+    __slots__ = ('track_id', 'class_id', 'class_name', 'confidence', 'bbox',
+                 'is_truck', 'last_seen', 'stability_count')
+
+    def __init__(self, track_id, detection, last_seen):
+        self.track_id = track_id
+        self.class_id = detection.class_id
+        self.class_name = detection.class_name
+        self.confidence = detection.confidence
+        self.bbox = list(detection.bbox)
+        self.is_truck = detection.is_truck
+        self.last_seen = last_seen
+        self.stability_count = 1
+
+    def update(self, detection, alpha, last_seen):
+        """Yeni tespitle yumuşat (bbox ve güven üstel ortalama ile)"""
+        bbox = self.bbox
+        new_bbox = detection.bbox
+        for i in range(4):
+            bbox[i] = int(alpha * new_bbox[i] + (1 - alpha) * bbox[i])
+
+        self.confidence = alpha * detection.confidence + (1 - alpha) * self.confidence
+        self.class_id = detection.class_id
+        self.class_name = detection.class_name
+        self.is_truck = detection.is_truck
+        self.last_seen = last_seen
+        self.stability_count += 1
+
+    def snapshot(self):
+        """Takibin o anki halini değişmez bir Detection olarak döndür"""
+        return Detection(self.class_id, self.class_name, self.confidence, tuple(self.bbox),
+                         self.is_truck, self.track_id, self.stability_count)
+
+    def to_dict(self):
+        data = self.snapshot().to_dict()
+        data['last_seen'] = self.last_seen
+        return data
+
+
+def detections_to_history(detections):
+    """Frame'in tespitlerini takip geçmişi için yapılandırılmış diziye çevir"""
+    history = np.empty(len(detections), dtype=HISTORY_DTYPE)
+    for i, detection in enumerate(detections):
+        history[i] = (detection.track_id or 0, detection.bbox, detection.class_id,
+                      detection.confidence, detection.stability_count)
+    return history
+
+
+def detections_to_json(detections):
+    """Tespit listesini JSON'a uygun sözlük listesine çevir"""
+    return [detection.to_dict() for detection in detections]
+
+
+class DetectionArray:
+    """
+    Bir frame'in tespitlerini sütun dizileri olarak tutar.
+
+    YOLO sonucu tek seferde NumPy'a aktarılır ve filtreler maskelerle
+    uygulanır; Detection kayıtları sadece takip sınırında, sözlükler
+    sadece JSON sınırında üretilir.
+    """
+
+    __slots__ = ('boxes', 'class_ids', 'confidences', 'truck_mask', 'class_names')
+
+    def __init__(self, boxes, class_ids, confidences, truck_mask, class_names):
+        """
+        Args:
+            boxes: (N, 4) int32 [x1, y1, x2, y2]
+            class_ids: (N,) int sınıf ID'leri
+            confidences: (N,) float güven skorları
+            truck_mask: (N,) bool kamyon/tır mı
+            class_names: sınıf ID -> isim sözlüğü
+        """
+        self.boxes = boxes
+        self.class_ids = class_ids
+        self.confidences = confidences
+        self.truck_mask = truck_mask
+        self.class_names = class_names
+
+    @classmethod
+    def empty(cls, class_names=None):
+        return cls(np.empty((0, 4), dtype=np.int32), np.empty(0, dtype=np.int32),
+                   np.empty(0, dtype=np.float32), np.empty(0, dtype=bool), class_names or {})
+
+    @classmethod
+    def from_xyxy(cls, data, class_names, vehicle_class_ids, truck_class_ids,
+                  inv_scale=1.0, conf_threshold=None, min_area=0):
+        """
+        YOLO'nun (N, 6) [x1, y1, x2, y2, conf, cls] dizisinden oluştur
+
+        Araç sınıfı, güven ve minimum alan filtreleri tek maske ile uygulanır.
+        Koordinatlar inv_scale ile orijinal frame ölçeğine çevrilir.
+        """
+        if data is None or len(data) == 0:
+            return cls.empty(class_names)
+
+        # Takip ID'si içeren (N, 7) çıktılarda da son iki sütun güven ve sınıftır
+        class_ids = data[:, -1].astype(np.int32)
+        confidences = data[:, -2].astype(np.float32)
+        xyxy = data[:, :4] * inv_scale
+
+        mask = np.isin(class_ids, vehicle_class_ids)
+        if conf_threshold is not None:
+            mask &= confidences >= conf_threshold
+        if min_area:
+            mask &= (xyxy[:, 2] - xyxy[:, 0]) * (xyxy[:, 3] - xyxy[:, 1]) >= min_area
+
+        # int() ile aynı şekilde sıfıra doğru kırp; sol üst köşe negatif olmasın
+        boxes = np.trunc(xyxy[mask]).astype(np.int32)
+        np.maximum(boxes[:, :2], 0, out=boxes[:, :2])
+
+        class_ids = class_ids[mask]
+        return cls(boxes, class_ids, confidences[mask],
+                   np.isin(class_ids, truck_class_ids), class_names)
+
+    def __len__(self):
+        return len(self.class_ids)
+
+    def best(self):
+        """En yüksek güvenli tespitin indeksi (boşsa None)"""
+        if len(self) == 0:
+            return None
+        return int(np.argmax(self.confidences))
+
+    def to_detection(self, index):
+        class_id = int(self.class_ids[index])
+        return Detection(class_id, self.class_names[class_id], float(self.confidences[index]),
+                         tuple(self.boxes[index].tolist()), bool(self.truck_mask[index]))
+
+    def to_detections(self):
+        """Detection listesine çevir (diziler bir kez Python'a aktarılır)"""
+        names = self.class_names
+        return [
+            Detection(class_id, names[class_id], confidence, tuple(bbox), is_truck)
+            for bbox, class_id, confidence, is_truck in zip(
+                self.boxes.tolist(), self.class_ids.tolist(),
+                self.confidences.tolist(), self.truck_mask.tolist())
+        ]
+
+    def to_dicts(self):
+        """API'nin beklediği sözlük listesine çevir"""
+        return detections_to_json(self.to_detections())
@@ -0,0 +1,65 @@
+import logging
+import threading
+
+import numpy as np # type: ignore
+
+logger = logging.getLogger(__name__)
+
+
+class FramePool:
+    """
+    Tam boyutlu frame tamponlarını yeniden kullanan havuz
+
+    acquire() ile alınan tampon, release() ile açıkça geri verilene kadar
+    kullanımda sayılır ve başka bir acquire() çağrısına verilmez; böylece
+    frame'i (veya ondan alınan dilimleri) tutan thread'ler varken üzerine
+    yazılmaz. Frame'i paylaşan tüketiciler CapturedFrame.retain()/release()
+    ile sayılır; son tüketici bıraktığında tampon havuza döner.
+    """
+
+    def __init__(self, max_buffers=8):
+        self.max_buffers = max_buffers
+        self._free = []
+        self._in_use = {}  # id(tampon) -> tampon
+        self._lock = threading.Lock()
+        self.allocations = 0
+        self.reuses = 0
+
+    def acquire(self, shape, dtype=np.uint8):
+        """Boş bir tampon döndür; yoksa yeni ayır (havuz doluysa havuz dışında)"""
+        shape = tuple(shape)
+        dtype = np.dtype(dtype)
+
+        with self._lock:
+            while self._free:
+                buffer = self._free.pop()
+                if buffer.shape == shape and buffer.dtype == dtype:
+                    self._in_use[id(buffer)] = buffer
+                    self.reuses += 1
+                    return buffer
+                # Boyutu veya tipi değişen eski tampon bırakılır
+
+            buffer = np.empty(shape, dtype=dtype)
+            self.allocations += 1
+            if len(self._in_use) < self.max_buffers:
+                self._in_use[id(buffer)] = buffer
+            elif self.allocations % 100 == 0:
+                logger.warning(f"⚠️ Frame havuzu dolu ({self.max_buffers} tampon kullanımda), "
+                               f"frame'ler havuz dışında ayrılıyor")
+            return buffer
+
+    def release(self, buffer):
+        """Tamponu havuza geri ver (havuz dışında ayrılmış tamponlar yok sayılır)"""
+        with self._lock:
+            if self._in_use.get(id(buffer)) is buffer:
+                del self._in_use[id(buffer)]
+                self._free.append(buffer)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'buffers': len(self._free) + len(self._in_use),
+                'in_use': len(self._in_use),
+                'allocations': self.allocations,
+                'reuses': self.reuses
+            }
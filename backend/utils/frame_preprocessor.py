@@ -0,0 +1,127 @@
+import cv2 # type: ignore
+import numpy as np # type: ignore
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class FramePreprocessor:
+    """
+    Çıkarım öncesi frame ön işleme hattı
+
+    Aşamalar konfigürasyondan sırayla uygulanır:
+        'resize'   - Frame'i çıkarım çözünürlüğüne küçültür (sonraki aşamalar küçük görüntüde çalışır)
+        'contrast' - Kontrast/parlaklık ayarı, önceden hesaplanmış 256'lık LUT ile
+        'denoise'  - Gürültü azaltma ('gaussian', 'median' veya 'bilateral')
+
+    Ara sonuçlar her frame'de yeniden ayrılmaz; aşama başına önceden ayrılmış
+    tamponlar (dst=) tekrar kullanılır. Dönen görüntü bir sonraki process()
+    çağrısında üzerine yazılır, bu yüzden çağıran taraf saklamamalıdır.
+    """
+
+    # Zaman ölçümü için üstel hareketli ortalama katsayısı
+    TIMING_SMOOTHING = 0.1
+
+    def __init__(self, params):
+        self.stages = list(params.get('stages', ['contrast', 'denoise']))
+        self.inference_size = params.get('inference_size', 640)
+        self.denoise_method = params.get('denoise_method', 'gaussian')
+
+        if not params.get('noise_reduction', True) and 'denoise' in self.stages:
+            self.stages.remove('denoise')
+
+        # convertScaleAbs(alpha, beta) ile aynı sonucu veren tablo
+        alpha = params.get('alpha', 1.0)
+        beta = params.get('beta', 0)
+        self.lut = np.clip(np.rint(np.abs(np.arange(256) * alpha + beta)), 0, 255).astype(np.uint8)
+
+        self._buffers = {}
+        self.stage_times_ms = {stage: 0.0 for stage in self.stages}
+        self.total_time_ms = 0.0
+        self.frames = 0
+
+        logger.info(f"🧪 Ön işleme aşamaları: {self.stages} "
+                    f"(çözünürlük: {self.inference_size}, gürültü: {self.denoise_method})")
+
+    def _buffer(self, name, shape):
+        """Aşama için önceden ayrılmış tamponu döndür (boyut değişirse yeniden ayır)"""
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, dtype=np.uint8)
+            self._buffers[name] = buffer
+        return buffer
+
+    def _resize(self, image):
+        height, width = image.shape[:2]
+        scale = self.inference_size / max(height, width)
+        if scale >= 1.0:
+            return image, 1.0
+
+        size = (int(round(width * scale)), int(round(height * scale)))
+        dst = self._buffer('resize', (size[1], size[0]) + image.shape[2:])
+        cv2.resize(image, size, dst=dst, interpolation=cv2.INTER_AREA)
+        return dst, scale
+
+    def _contrast(self, image):
+        dst = self._buffer('contrast', image.shape)
+        cv2.LUT(image, self.lut, dst=dst)
+        return dst
+
+    def _denoise(self, image):
+        dst = self._buffer('denoise', image.shape)
+        if self.denoise_method == 'bilateral':
+            # Çıkarım çözünürlüğünde daha küçük komşuluk yeterli
+            cv2.bilateralFilter(image, 5, 50, 50, dst=dst)
+        elif self.denoise_method == 'median':
+            cv2.medianBlur(image, 3, dst=dst)
+        else:
+            cv2.GaussianBlur(image, (3, 3), 0, dst=dst)
+        return dst
+
+    def process(self, frame):
+        """
+        Frame'i ön işle
+
+        Returns:
+            tuple: (işlenmiş görüntü, ölçek) - ölçek, tespit kutularını orijinal
+                   frame koordinatlarına geri çevirmek için kullanılır
+        """
+        image = frame
+        scale = 1.0
+        frame_start = time.perf_counter()
+
+        for stage in self.stages:
+            stage_start = time.perf_counter()
+
+            if stage == 'resize':
+                image, scale = self._resize(image)
+            elif stage == 'contrast':
+                image = self._contrast(image)
+            elif stage == 'denoise':
+                image = self._denoise(image)
+
+            self._record(stage, stage_start)
+
+        self.total_time_ms = self._smooth(self.total_time_ms,
+                                          (time.perf_counter() - frame_start) * 1000)
+        self.frames += 1
+
+        return image, scale
+
+    def _smooth(self, previous, value):
+        if self.frames == 0:
+            return value
+        return previous + self.TIMING_SMOOTHING * (value - previous)
+
+    def _record(self, stage, stage_start):
+        elapsed_ms = (time.perf_counter() - stage_start) * 1000
+        self.stage_times_ms[stage] = self._smooth(self.stage_times_ms[stage], elapsed_ms)
+
+    def get_stats(self):
+        """Aşama başına ortalama süreleri (ms) döndür"""
+        return {
+            'frames': self.frames,
+            'total_ms': round(self.total_time_ms, 3),
+            'stages_ms': {stage: round(ms, 3) for stage, ms in self.stage_times_ms.items()}
+        }
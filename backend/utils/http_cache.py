@@ -0,0 +1,113 @@
+"""
+Okuma ağırlıklı API uçları için ETag/Last-Modified ve yanıt önbelleği
+
+Yanıt gövdesi bir kez üretilip saklanır; ETag gövdenin özetidir. Kayıt,
+verilen sürüm değişene (ör. plaka ekleme/silme) veya TTL dolana kadar
+geçerlidir. İstemci aynı ETag'i If-None-Match ile gönderirse gövde
+gönderilmeden 304 döner.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from flask import current_app, request # type: ignore
+
+from utils.metrics import CACHE_HITS
+
+
+class _Entry:
+    __slots__ = ('body', 'etag', 'version', 'created', 'last_modified')
+
+    def __init__(self, body, etag, version, created, last_modified):
+        self.body = body
+        self.etag = etag
+        self.version = version
+        self.created = created
+        self.last_modified = last_modified
+
+
+class ResponseCache:
+    """Thread güvenli, boyut sınırlı (LRU) JSON yanıt önbelleği"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def respond(self, key, build, version=None, ttl=None, last_modified=None):
+        """
+        Önbellekten veya build() ile koşullu JSON yanıtı üret
+
+        Args:
+            key: Önbellek anahtarı (uç + sorgu parametreleri)
+            build: Gövde sözlüğünü üreten fonksiyon (hata fırlatırsa önbelleğe yazılmaz)
+            version: Değişince kaydı geçersiz kılan değer
+            ttl: Kaydın en fazla yaşı (saniye; None ise sadece sürüm)
+            last_modified: Verinin son değişme zamanı (epoch; None ise kaydın üretildiği an)
+
+        Returns:
+            Response: 200 (gövdeli) veya 304
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry.version != version or (ttl is not None and now - entry.created >= ttl)):
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+
+        if entry is None:
+            # Üretim kilit dışında; aynı anda gelen iki istek iki kez üretebilir
+            body = current_app.json.dumps(build()).encode('utf-8')
+            etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+            entry = _Entry(body, etag, version, now, last_modified or now)
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        else:
+            CACHE_HITS.inc('http')
+
+        response = current_app.response_class(entry.body, mimetype='application/json')
+        response.set_etag(entry.etag)
+        response.last_modified = datetime.fromtimestamp(int(entry.last_modified), tz=timezone.utc)
+        # Tarayıcı kopyayı saklar ama her kullanımda sunucuya sorar (304)
+        response.cache_control.no_cache = True
+        response.make_conditional(request)
+
+        if response.status_code == 304:
+            with self._lock:
+                self.not_modified += 1
+            CACHE_HITS.inc('http_304')
+        return response
+
+    def invalidate(self, prefix=''):
+        """Anahtarı prefix ile başlayan kayıtları sil"""
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def status(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified
+            }
+
+
+def request_key(name):
+    """Uç adı ve sıralı sorgu parametrelerinden önbellek anahtarı"""
+    args = '&'.join(f'{key}={value}' for key, value in sorted(request.args.items(multi=True)))
+    return f'{name}?{args}'
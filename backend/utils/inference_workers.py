@@ -0,0 +1,646 @@
+"""
+Süreç tabanlı çıkarım işçileri
+
+Araç tespiti ve OCR ayrı süreçlerde çalışır; böylece Python seviyesindeki
+döngüler Flask istek thread'leri ile GIL için yarışmaz. Frame'ler
+multiprocessing.shared_memory üzerindeki halka tampona kopyalanır (pickle
+edilmez), işçi süreç aynı belleğe NumPy görünümü ile erişir ve geriye
+sadece küçük sonuç kayıtları gönderir. Slot'a sığmayan bir frame gelirse
+tampon daha büyük slot'larla yeniden açılır; her görev hangi tampona
+yazıldığını taşır.
+
+Ana süreçte izleme açıksa her görev bunu işçiye bildirir; işçi kendi
+span'lerini kaydedip sonuçla birlikte geri gönderir ve ana süreç bunları
+kendi izine (/api/trace) ekler.
+"""
+
+import atexit
+import itertools
+import logging
+import multiprocessing as mp
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+
+import numpy as np # type: ignore
+
+# Config dosyasını import et
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config.detection_config import DetectionConfig
+from utils.detections import Detection
+from utils.metrics import FRAMES_SKIPPED, OCR_CALLS, observe_stages
+from utils.tracing import span, tracer
+
+logger = logging.getLogger(__name__)
+
+# Süreçler 'spawn' ile başlatılır (torch/OpenCV thread'leri fork ile güvenli değil)
+_mp_context = mp.get_context('spawn')
+
+
+class WorkerError(RuntimeError):
+    """İşçi süreç işi kabul edemedi veya tamamlayamadı"""
+
+
+class WorkerBusyError(WorkerError):
+    """Bekleme süresi içinde boş slot bulunamadı (işçi yetişemiyor)"""
+
+
+class WorkerUnavailableError(WorkerError):
+    """İşçi süreç çalışmıyor, yeniden başlatılıyor veya iş sürerken öldü"""
+
+
+class SharedFrameRing:
+    """Paylaşımlı bellek üzerinde sabit boyutlu slot'lardan oluşan halka tampon"""
+
+    def __init__(self, slots, slot_bytes, name=None):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.owner = name is None
+
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def view(self, slot, shape):
+        """Slot'un verilen boyuttaki NumPy görünümünü döndür (kopyasız)"""
+        return np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf,
+                          offset=slot * self.slot_bytes)
+
+    def write(self, slot, image):
+        """Görüntüyü slot'a kopyala ve boyutunu döndür"""
+        if image.nbytes > self.slot_bytes:
+            raise ValueError(f"Görüntü slot boyutunu aşıyor: {image.shape}")
+
+        self.view(slot, image.shape)[...] = image
+        return image.shape
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class _AttachedRings:
+    """
+    İşçi tarafında görevlerin işaret ettiği halka tamponlar. Ana süreç tamponu
+    büyütünce yenisine bağlanılır; eski tampon üzerindeki işler bitince bırakılır.
+    """
+
+    def __init__(self, slots, slot_bytes, name):
+        self.slots = slots
+        self._rings = {name: SharedFrameRing(slots, slot_bytes, name=name)}
+        self._current = name
+
+    def view(self, ring_ref, slot, shape):
+        name, slot_bytes = ring_ref
+        ring = self._rings.get(name)
+        if ring is None:
+            ring = self._rings[name] = SharedFrameRing(self.slots, slot_bytes, name=name)
+            self._current = name
+        return ring.view(slot, shape)
+
+    def release_stale(self):
+        """Eski tamponları kapat (görünümü hâlâ kullanılan varsa sonraki tura kalır)"""
+        for name in [name for name in self._rings if name != self._current]:
+            try:
+                self._rings[name].close()
+            except BufferError:
+                continue
+            del self._rings[name]
+
+    def close(self):
+        for ring in self._rings.values():
+            ring.close()
+
+
+# Kamera durduğunda işçideki takip durumunu silen kontrol mesajı
+_DROP_TRACKER = 'drop_tracker'
+
+
+def _pack_detection(detection):
+    """Detection kaydını küçük bir tuple'a çevir"""
+    x1, y1, x2, y2 = detection.bbox
+    return (x1, y1, x2, y2, detection.class_id, detection.class_name,
+            float(detection.confidence), detection.is_truck,
+            detection.stability_count, detection.track_id)
+
+
+def _unpack_detection(record):
+    """Tuple kaydı Detection'a geri çevir"""
+    x1, y1, x2, y2, class_id, class_name, confidence, is_truck, stability_count, track_id = record
+    return Detection(class_id, class_name, confidence, (x1, y1, x2, y2), is_truck,
+                     track_id, stability_count)
+
+
+def _collect_batch(task_queue, first, max_items, max_wait):
+    """İlk görevin ardından en fazla max_wait saniye içinde gelenleri topla"""
+    batch = [first]
+    deadline = time.monotonic() + max_wait
+
+    while len(batch) < max_items:
+        remaining = deadline - time.monotonic()
+        try:
+            task = task_queue.get(timeout=remaining) if remaining > 0 else task_queue.get_nowait()
+        except queue.Empty:
+            break
+
+        batch.append(task)
+        if task is None:
+            break
+
+    return batch
+
+
+def _sync_tracing(enabled):
+    """İşçi süreçteki izlemeyi ana süreçteki duruma getir"""
+    if enabled and not tracer.enabled:
+        tracer.start()
+    elif not enabled and tracer.enabled:
+        tracer.stop()
+        tracer.clear()
+
+
+def _detector_worker_main(shm_name, slots, slot_bytes, task_queue, result_queue, model_path):
+    """Araç tespit işçi sürecinin ana döngüsü"""
+    from utils.vehicle_detector import VehicleDetector
+
+    config = DetectionConfig()
+    # Batch'teki her frame sonuç dönene kadar bir slot tutar
+    max_items = max(1, min(config.BATCH_MAX_SIZE, slots))
+    max_wait = config.BATCH_MAX_WAIT_MS / 1000.0
+
+    rings = _AttachedRings(slots, slot_bytes, shm_name)
+    try:
+        detector = VehicleDetector(model_path=model_path)
+        result_queue.put(('ready', None, None))
+
+        # Kamera başına takip durumu; frame atlama vekil tarafında yapılır,
+        # işçiye gelen her frame işlenir
+        trackers = {}
+        running = True
+
+        while running:
+            first = task_queue.get()
+            if first is None:
+                break
+
+            batch = _collect_batch(task_queue, first, max_items, max_wait)
+            if batch[-1] is None:
+                running = False
+                batch.pop()
+
+            # Kontrol mesajları: durdurulan kameraların takip durumu silinir
+            for task in batch:
+                if task[0] == _DROP_TRACKER:
+                    trackers.pop(task[1], None)
+            batch = [task for task in batch if task[0] != _DROP_TRACKER]
+            if not batch:
+                continue
+
+            trace = any(task[3] for task in batch)
+            _sync_tracing(trace)
+
+            frames = []
+            batch_trackers = []
+            for seq, slot, shape, _, ring_ref, tracker_key in batch:
+                tracker = trackers.get(tracker_key)
+                if tracker is None:
+                    tracker = trackers[tracker_key] = detector.create_tracker(process_every_n_frames=1)
+                frames.append(rings.view(ring_ref, slot, shape))
+                batch_trackers.append(tracker)
+
+            try:
+                with span('worker_detect_batch', 'inference', frames=len(frames)):
+                    results = detector.detect_batch(frames, batch_trackers)
+
+                # Aşama süreleri ve span'ler batch başına bir kez (ilk sonuçla) gönderilir
+                timings = detector.last_stage_times
+                events = tracer.collect() if trace else None
+                for (seq, *_), detections in zip(batch, results):
+                    result_queue.put(('result', seq, ([_pack_detection(d) for d in detections], timings, events)))
+                    timings = {}
+                    events = None
+            except Exception as e:
+                for seq, *_ in batch:
+                    result_queue.put(('error', seq, str(e)))
+
+            # Görünümler bırakılınca büyütme öncesi tampon kapatılabilir
+            frames = batch_trackers = None
+            rings.release_stale()
+    finally:
+        rings.close()
+
+
+def _ocr_worker_main(shm_name, slots, slot_bytes, task_queue, result_queue):
+    """Plaka okuma işçi sürecinin ana döngüsü"""
+    from utils.plate_reader import PlateReader
+
+    rings = _AttachedRings(slots, slot_bytes, shm_name)
+    try:
+        plate_reader = PlateReader()
+        plate_reader.warmup()
+        result_queue.put(('ready', None, None))
+
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+
+            seq, slot, shape, trace, ring_ref = task[:5]
+            _sync_tracing(trace)
+            try:
+                plate_reader.last_stage_times = {}
+                plate_reader.last_ocr_calls = 0
+                with span('worker_read_plate', 'plate'):
+                    result = plate_reader.read_plate(rings.view(ring_ref, slot, shape))
+                result_queue.put(('result', seq, (
+                    result.get('detected', False),
+                    result.get('text', ''),
+                    float(result.get('confidence', 0.0)),
+                    list(result.get('bbox', [])),
+                    plate_reader.last_stage_times,
+                    plate_reader.last_ocr_calls,
+                    tracer.collect() if trace else None
+                )))
+            except Exception as e:
+                result_queue.put(('error', seq, str(e)))
+            rings.release_stale()
+    finally:
+        rings.close()
+
+
+class _ProcessWorker:
+    """
+    Tek bir işçi süreci, ona ait paylaşımlı halka tampon ve sonuç
+    dağıtıcı thread'i yöneten ortak taban sınıf
+    """
+
+    worker_name = 'worker'
+
+    def __init__(self, target, extra_args=(), slots=None, slot_bytes=None, timeout=None):
+        config = DetectionConfig()
+        self.slots = slots or config.WORKER_RING_SLOTS
+        self.slot_bytes = slot_bytes or config.CAMERA_WIDTH * config.CAMERA_HEIGHT * 3
+        self.timeout = timeout or config.WORKER_TIMEOUT
+        self.max_restarts = config.WORKER_MAX_RESTARTS
+
+        self.ring = SharedFrameRing(self.slots, self.slot_bytes)
+        # Büyütme sonrası üzerinde hâlâ iş bekleyen eski tamponlar
+        self._retired_rings = []
+        self._ring_lock = threading.Lock()
+        self._free_slots = queue.Queue()
+        for slot in range(self.slots):
+            self._free_slots.put(slot)
+
+        self._target = target
+        self._extra_args = tuple(extra_args)
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._seq = 0
+        self._ready = threading.Event()
+        self._started = False
+        self._closed = False
+        self._failed_restarts = 0
+        self.restarts = 0
+
+        self._start_process()
+
+        self._dispatcher = threading.Thread(target=self._dispatch_results,
+                                            name=f"{self.worker_name}-results", daemon=True)
+        self._dispatcher.start()
+        atexit.register(self.close)
+
+    def _start_process(self):
+        """Yeni kuyruklarla işçi süreci başlat (halka tampon aynı kalır)"""
+        self._task_queue = _mp_context.Queue()
+        self._result_queue = _mp_context.Queue()
+        self.process = _mp_context.Process(
+            target=self._target,
+            args=(self.ring.name, self.slots, self.slot_bytes,
+                  self._task_queue, self._result_queue) + self._extra_args,
+            name=self.worker_name,
+            daemon=True
+        )
+        self.process.start()
+        logger.info(f"🧵 {self.worker_name} süreci başlatıldı (pid={self.process.pid}, "
+                    f"{self.slots} slot x {self.slot_bytes // 1024} KB)")
+
+    def wait_ready(self, timeout=None):
+        """İşçi süreç modeli yükleyip hazır olana kadar bekle"""
+        ready = self._ready.wait(timeout)
+        if not self.process.is_alive():
+            self.close()
+            raise RuntimeError(f"{self.worker_name} süreci başlatılamadı")
+        if not ready:
+            # Model yüklenirken takılan süreç ve paylaşımlı bellek geride kalmasın
+            self.process.terminate()
+            self.close()
+            raise TimeoutError(f"{self.worker_name} süreci zamanında hazır olmadı")
+
+    def _fail_pending(self, reason):
+        """Bekleyen işleri hata ile bitir ve slot'larını geri al (kilit tutulurken çağrılır)"""
+        pending, self._pending = self._pending, {}
+        for slot, future, _ in pending.values():
+            self._free_slots.put(slot)
+            future.set_exception(WorkerUnavailableError(reason))
+        self._close_idle_rings()
+        return len(pending)
+
+    def _close_idle_rings(self):
+        """Bekleyen işi kalmayan eski tamponları kapat (kilit tutulurken çağrılır)"""
+        busy = [ring for _, _, ring in self._pending.values()]
+        for ring in list(self._retired_rings):
+            if not any(ring is other for other in busy):
+                ring.close()
+                self._retired_rings.remove(ring)
+
+    def _grow_ring(self, image):
+        """Slot'a sığmayan frame geldi: daha büyük slot'lu yeni tampon aç (ring kilidi tutulurken)"""
+        old_bytes = self.slot_bytes
+        self.slot_bytes = image.nbytes
+        ring = SharedFrameRing(self.slots, self.slot_bytes)
+        with self._pending_lock:
+            self._retired_rings.append(self.ring)
+            self.ring = ring
+            self._close_idle_rings()
+        logger.warning(f"⚠️ {self.worker_name}: {image.shape} frame slot'a sığmıyor, halka tampon "
+                       f"{old_bytes // 1024} KB -> {self.slot_bytes // 1024} KB slot ile yeniden açıldı")
+
+    def _handle_exit(self):
+        """İşçi süreç öldü: ilk başlatmadaysa bildir, değilse yeniden başlat"""
+        if not self._started:
+            # Süreç hazır olmadan öldü; wait_ready hemen dönsün
+            self._ready.set()
+            return
+
+        if self.process.is_alive():
+            # Kuyruk bozuldu ama süreç duruyor; yenisiyle çakışmasın
+            self.process.terminate()
+            self.process.join(timeout=5)
+
+        exitcode = self.process.exitcode
+        with self._pending_lock:
+            if self._closed:
+                return
+            self._ready.clear()
+            lost = self._fail_pending(f"{self.worker_name} süreci öldü (çıkış kodu: {exitcode})")
+
+            if self._failed_restarts >= self.max_restarts:
+                logger.error(f"❌ {self.worker_name} {self._failed_restarts} kez hazır olamadan öldü, "
+                             f"yeniden başlatılmıyor")
+                self._closed = True
+                self.ring.close()
+                return
+
+            logger.error(f"❌ {self.worker_name} süreci öldü (çıkış kodu: {exitcode}), "
+                         f"{lost} iş başarısız sayıldı; yeniden başlatılıyor")
+            self._failed_restarts += 1
+            self.restarts += 1
+            self._start_process()
+
+    def _dispatch_results(self):
+        """Sonuç kuyruğunu oku ve bekleyen Future'ları tamamla"""
+        while not self._closed:
+            try:
+                kind, seq, payload = self._result_queue.get(timeout=1.0)
+            except queue.Empty:
+                if not self.process.is_alive() and not self._closed:
+                    self._handle_exit()
+                continue
+            except (EOFError, OSError):
+                if self._closed:
+                    break
+                self._handle_exit()
+                continue
+
+            if kind == 'ready':
+                self._started = True
+                self._failed_restarts = 0
+                self._ready.set()
+                continue
+
+            with self._pending_lock:
+                entry = self._pending.pop(seq, None)
+                if entry is not None and self._retired_rings:
+                    self._close_idle_rings()
+            if entry is None:
+                continue
+
+            slot, future, _ = entry
+            self._free_slots.put(slot)
+            if kind == 'result':
+                future.set_result(payload)
+            else:
+                future.set_exception(RuntimeError(payload))
+
+    def submit(self, image, *extra):
+        """
+        Görüntüyü boş bir slot'a yaz ve işçiye gönder; Future döndürür.
+        Slot'a sığmayan görüntü gelirse halka tampon büyütülür.
+
+        Raises:
+            WorkerUnavailableError: İşçi çalışmıyor veya yeniden başlatılıyor
+            WorkerBusyError: timeout içinde boş slot açılmadı
+        """
+        if self._closed or not self._ready.is_set() or not self.process.is_alive():
+            raise WorkerUnavailableError(f"{self.worker_name} süreci çalışmıyor")
+
+        # Boş slot yoksa bekle (geri basınç)
+        try:
+            slot = self._free_slots.get(timeout=self.timeout)
+        except queue.Empty:
+            raise WorkerBusyError(f"{self.worker_name}: {self.timeout:.1f} sn içinde boş slot açılmadı")
+
+        # Yazma ve gönderim tampon kilidi altında: işçi bir tampona geçtikten sonra eskisine görev gelmez
+        with self._ring_lock:
+            try:
+                if image.nbytes > self.ring.slot_bytes:
+                    self._grow_ring(image)
+                ring = self.ring
+                shape = ring.write(slot, image)
+            except Exception:
+                self._free_slots.put(slot)
+                raise
+
+            future = Future()
+            with self._pending_lock:
+                # Kayıt ve gönderim birlikte: yeniden başlatma işi ya görür ya da yeni kuyruğa yazılır
+                self._seq += 1
+                seq = self._seq
+                self._pending[seq] = (slot, future, ring)
+                # İzleme açıksa işçi bu görevin span'lerini sonuçla geri gönderir
+                self._task_queue.put((seq, slot, shape, tracer.enabled,
+                                      (ring.name, ring.slot_bytes)) + extra)
+        return future
+
+    def _record_trace(self, events):
+        """İşçinin gönderdiği span'leri ana süreç izine ekle (işçi ayrı satırda görünür)"""
+        if events:
+            tracer.record_remote(events, self.process.pid, f"{self.worker_name} (pid {self.process.pid})")
+
+    def pending(self):
+        """İşçide sonucu beklenen iş sayısı"""
+        with self._pending_lock:
+            return len(self._pending)
+
+    def close(self):
+        with self._pending_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._fail_pending(f"{self.worker_name} kapatıldı")
+
+        try:
+            self._task_queue.put(None)
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.terminate()
+        except Exception as e:
+            logger.warning(f"⚠️ {self.worker_name} kapatma uyarısı: {str(e)}")
+
+        self.ring.close()
+
+
+class RemoteTracker:
+    """
+    Takip durumu işçi süreçte tutulan bir kamera için vekil tarafı sayaçlar.
+    Atlanan frame'ler süreç sınırını hiç geçmez.
+    """
+
+    _keys = itertools.count(1)
+
+    def __init__(self, process_every_n_frames):
+        self.key = next(self._keys)
+        self.frame_skip = 0
+        self.process_every_n_frames = process_every_n_frames
+        self.last_detections = []
+
+    def needs_frame(self):
+        return (self.frame_skip + 1) % self.process_every_n_frames == 0
+
+    def skip_frame(self):
+        self.frame_skip += 1
+        return self.frame_skip % self.process_every_n_frames != 0
+
+    def stable(self):
+        return [det for det in self.last_detections
+                if det.stability_count >= 3]
+
+
+class ProcessVehicleDetector(_ProcessWorker):
+    """
+    VehicleDetector ile aynı arayüzü sunan, tespiti ayrı bir süreçte yapan vekil.
+    Takip durumu (stable_detections) işçi süreçte, kamera başına ayrı tutulur.
+    """
+
+    worker_name = 'detector-worker'
+
+    def __init__(self, model_path=None, **kwargs):
+        super().__init__(_detector_worker_main, extra_args=(model_path,), **kwargs)
+        self.config = DetectionConfig()
+        self.tracker = self.create_tracker()
+
+    def create_tracker(self, process_every_n_frames=None):
+        return RemoteTracker(process_every_n_frames or self.config.PROCESS_EVERY_N_FRAMES)
+
+    def needs_frame(self, tracker=None):
+        return (tracker or self.tracker).needs_frame()
+
+    def release_tracker(self, tracker):
+        """Kamera durdu: işçi süreçteki takip durumunu sil"""
+        with self._pending_lock:
+            if self._closed:
+                return
+            self._task_queue.put((_DROP_TRACKER, tracker.key))
+
+    def detect_frame(self, frame, tracker=None):
+        return self.detect_batch([frame], [tracker])[0]
+
+    def detect_batch(self, frames, trackers=None):
+        """
+        Frame'leri işçiye birlikte gönder; işçi süreç bunları tek ileri
+        geçişte işler ve sonuçları kaynak başına geri dağıtır
+        """
+        if trackers is None:
+            trackers = [None] * len(frames)
+        trackers = [tracker or self.tracker for tracker in trackers]
+
+        outputs = [None] * len(frames)
+        futures = []
+
+        # Her frame ayrı ele alınır; birinin hatası diğer kameraların sonucunu düşürmez
+        for index, (frame, tracker) in enumerate(zip(frames, trackers)):
+            if tracker.skip_frame():
+                # Önceki kararlı tespitleri döndür
+                outputs[index] = tracker.stable()
+                FRAMES_SKIPPED.inc('frame_skip')
+                continue
+            try:
+                futures.append((index, self.submit(frame, tracker.key)))
+            except Exception as e:
+                logger.error(f"❌ İşçi süreç tespit gönderme hatası: {str(e)}")
+
+        for index, future in futures:
+            tracker = trackers[index]
+            try:
+                records, timings, events = future.result(timeout=self.timeout)
+            except Exception as e:
+                logger.error(f"❌ İşçi süreç tespit hatası: {str(e) or type(e).__name__}")
+                continue
+            observe_stages(timings)
+            self._record_trace(events)
+            tracker.last_detections = [_unpack_detection(record) for record in records]
+            outputs[index] = tracker.last_detections
+
+        return [output if output is not None else [] for output in outputs]
+
+    def draw_detections(self, frame, detections):
+        from utils.vehicle_detector import draw_detections
+
+        # Çizim sadece config kullanır; model gerektirmez
+        return draw_detections(frame, detections, self.config)
+
+
+class ProcessPlateReader(_ProcessWorker):
+    """PlateReader ile aynı arayüzü sunan, OCR'ı ayrı bir süreçte yapan vekil"""
+
+    worker_name = 'ocr-worker'
+
+    def __init__(self, **kwargs):
+        super().__init__(_ocr_worker_main, **kwargs)
+
+    def read_plate(self, image):
+        try:
+            # ROI frame'in bitişik olmayan bir dilimi olabilir; ring.write tek kopya ile slot'a yazar
+            future = self.submit(image)
+            detected, text, confidence, bbox, timings, ocr_calls, events = future.result(timeout=self.timeout)
+            observe_stages(timings)
+            self._record_trace(events)
+            if ocr_calls:
+                OCR_CALLS.inc(amount=ocr_calls)
+            return {
+                'detected': detected,
+                'text': text,
+                'confidence': confidence,
+                'bbox': bbox
+            }
+        except Exception as e:
+            logger.error(f"❌ İşçi süreç plaka okuma hatası: {str(e)}")
+            return {
+                'detected': False,
+                'text': '',
+                'confidence': 0.0,
+                'bbox': []
+            }
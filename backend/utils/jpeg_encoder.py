@@ -0,0 +1,224 @@
+"""
+Önizleme stream'i için JPEG encode aşaması
+
+Encode işi stream generator'larında değil, küçük bir thread havuzunda
+yapılır. Aynı kamerayı aynı ayarlarla izleyen istemciler tek bir
+PreviewStream'i paylaşır; izleyici yoksa hiç encode yapılmaz ve son
+encode edilen frame saklanır, böylece yeni bağlanan istemci beklemeden
+bir görüntü alır.
+"""
+
+import logging
+import os
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2 # type: ignore
+
+# Config dosyasını import et
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config.detection_config import DetectionConfig
+from utils.metrics import CACHE_HITS, FRAMES_SKIPPED, time_stage
+from utils.tracing import span, tracer
+
+logger = logging.getLogger(__name__)
+
+_backend = None
+_backend_lock = threading.Lock()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _opencv_encode(image, quality):
+    ret, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buffer.tobytes() if ret else None
+
+
+def _load_backend(preference):
+    """Kurulu en hızlı JPEG kütüphanesini seç (SIMD'li libjpeg-turbo sarmalayıcıları önce)"""
+    if preference in ('auto', 'simplejpeg'):
+        try:
+            import simplejpeg # type: ignore
+            return 'simplejpeg', lambda image, quality: simplejpeg.encode_jpeg(
+                image, quality=quality, colorspace='BGR')
+        except ImportError:
+            pass
+
+    if preference in ('auto', 'turbojpeg'):
+        try:
+            from turbojpeg import TurboJPEG # type: ignore
+            encoder = TurboJPEG()
+            return 'turbojpeg', lambda image, quality: encoder.encode(image, quality=quality)
+        except (ImportError, OSError, RuntimeError):
+            # Python paketi var ama libturbojpeg bulunamadı
+            pass
+
+    return 'opencv', _opencv_encode
+
+
+def get_backend():
+    """(isim, encode fonksiyonu) çiftini döndür; ilk çağrıda seçilir"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = _load_backend(DetectionConfig.JPEG_BACKEND)
+            logger.info(f"🖼️ JPEG encoder: {_backend[0]}")
+        return _backend
+
+
+def encode_jpeg(image, quality):
+    """Görüntüyü JPEG baytlarına çevir (başarısızsa None)"""
+    _, encode = get_backend()
+    try:
+        with time_stage('encode'):
+            return encode(image, quality)
+    except Exception as e:
+        logger.error(f"❌ JPEG encode hatası: {str(e)}")
+        return None
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DetectionConfig.JPEG_ENCODER_THREADS,
+                                           thread_name_prefix='jpeg')
+        return _executor
+
+
+class PreviewStream:
+    """
+    Bir kamera ve önizleme ayarı (genişlik, kalite, çizim) için paylaşılan
+    encode aşaması
+
+    İlk izleyici bağlandığında bir sürücü thread kameranın frame'lerini
+    thread havuzuna gönderir; havuzda boş yer yoksa frame atlanır (gecikme
+    birikmez). Son izleyici ayrıldığında sürücü durur.
+    """
+
+    def __init__(self, pipeline, render, renderer_factory, server_overlay):
+        """
+        Args:
+            pipeline: Frame kaynağı (wait_frame ve active sağlamalı; wait_frame'in
+                döndürdüğü frame encode bitince release() edilir)
+            render: (pipeline, captured, renderer) -> önizleme görüntüsü
+            renderer_factory: Yeni PreviewRenderer üreten fonksiyon
+            server_overlay: False ise MJPEG kameranın JPEG'i doğrudan iletilir
+        """
+        self.pipeline = pipeline
+        self.render = render
+        self.server_overlay = server_overlay
+
+        # Her eşzamanlı encode işi kendi renderer'ını (ve tamponunu) kullanır
+        self._renderers = queue.Queue()
+        for _ in range(DetectionConfig.JPEG_ENCODER_THREADS):
+            self._renderers.put(renderer_factory())
+
+        self._condition = threading.Condition()
+        self._latest = None  # (seq, jpeg baytları)
+        self._subscribers = 0
+        self._driver = None
+
+        self.frames_encoded = 0
+        self.frames_skipped = 0
+
+    @property
+    def subscribers(self):
+        return self._subscribers
+
+    def _publish(self, seq, data):
+        with self._condition:
+            # Havuzdan sırasız dönen eski frame'ler yayınlanmaz
+            if self._latest is None or seq > self._latest[0]:
+                self._latest = (seq, data)
+                self._condition.notify_all()
+
+    def _encode(self, seq, captured, renderer):
+        try:
+            with span('preview_encode', 'preview', camera=self.pipeline.camera_key, seq=seq):
+                preview = self.render(self.pipeline, captured, renderer)
+                data = renderer.encode(preview) if preview is not None else None
+            if data is not None:
+                self.frames_encoded += 1
+                self._publish(seq, data)
+        except Exception as e:
+            logger.error(f"❌ Önizleme encode hatası: {str(e)}")
+        finally:
+            captured.release()
+            self._renderers.put(renderer)
+
+    def _drive(self):
+        executor = _get_executor()
+        last_seq = None
+
+        while True:
+            with self._condition:
+                # İzleyici kalmadıysa dur (kontrol kilit altında: yeni izleyici
+                # sürücünün çıktığını görüp yenisini başlatır)
+                if self._subscribers == 0 or not self.pipeline.active:
+                    self._driver = None
+                    self._condition.notify_all()
+                    return
+
+            entry = self.pipeline.wait_frame(last_seq)
+            if entry is None:
+                continue
+
+            seq, captured, _ = entry
+            last_seq = seq
+
+            if not self.server_overlay and captured.jpeg is not None:
+                # Kameranın JPEG'i olduğu gibi iletilir (yeniden encode yok)
+                self._publish(seq, captured.jpeg)
+                captured.release()
+                continue
+
+            try:
+                renderer = self._renderers.get_nowait()
+            except queue.Empty:
+                # Tüm encoder'lar meşgul; bu frame'i atla
+                self.frames_skipped += 1
+                FRAMES_SKIPPED.inc('encoder_busy')
+                tracer.instant('encoder_busy', 'preview', camera=self.pipeline.camera_key, seq=seq)
+                captured.release()
+                continue
+
+            executor.submit(self._encode, seq, captured, renderer)
+
+    def frames(self):
+        """(seq, jpeg) üreten generator; son encode edilen frame hemen verilir"""
+        with self._condition:
+            self._subscribers += 1
+            if self._driver is None:
+                self._driver = threading.Thread(target=self._drive, name='preview-encoder', daemon=True)
+                self._driver.start()
+
+        last_seq = None
+        if self._latest is not None:
+            # Yeni izleyiciye son encode edilen frame beklemeden verilir
+            CACHE_HITS.inc('preview')
+        try:
+            while self.pipeline.active:
+                with self._condition:
+                    self._condition.wait_for(
+                        lambda: self._latest is not None and self._latest[0] != last_seq,
+                        timeout=1.0
+                    )
+                    if self._latest is None or self._latest[0] == last_seq:
+                        continue
+                    seq, data = self._latest
+
+                last_seq = seq
+                yield seq, data
+        finally:
+            with self._condition:
+                self._subscribers -= 1
+
+    def status(self):
+        return {
+            'subscribers': self._subscribers,
+            'frames_encoded': self.frames_encoded,
+            'frames_skipped': self.frames_skipped
+        }
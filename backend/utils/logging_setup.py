@@ -0,0 +1,150 @@
+"""
+Engellemeyen, hız sınırlı loglama
+
+Frame ve istek thread'leri kaydı sadece bir kuyruğa bırakır; biçimlendirme
+ve dosya yazımı QueueListener thread'inde yapılır. Dosyaya JSON satırları
+(python-json-logger) yazılır ve dosya boyutla döndürülür. Aynı yerden sık
+gelen mesajlar çağrı noktası başına hız sınırlanır; ERROR ve üstü ile
+denetim kayıtları (extra={'audit': True}, ör. erişim izni/reddi) hiç
+düşürülmez.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import random
+import threading
+import time
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+JSON_FIELDS = '%(asctime)s %(name)s %(levelname)s %(message)s %(threadName)s %(module)s %(lineno)d'
+
+_listener = None
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Çağrı noktası (logger, dosya, satır) başına token bucket
+
+    Her çağrı noktası saniyede `rate` kayıt (en fazla `burst` birikerek)
+    geçirir; fazlası düşürülür ve sayılır. Düşürülenlerin sayısı bir sonraki
+    geçen kayda `suppressed` alanı olarak eklenir. DEBUG kayıtları ayrıca
+    `debug_sample_rate` oranında örneklenir. `exempt_level` ve üstü ile
+    `audit` alanı taşıyan kayıtlar her zaman geçer.
+    """
+
+    def __init__(self, rate=5.0, burst=20, debug_sample_rate=1.0, exempt_level=logging.ERROR):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.debug_sample_rate = debug_sample_rate
+        self.exempt_level = exempt_level
+        self._buckets = {}  # çağrı noktası -> [token, son zaman, düşürülen]
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def filter(self, record):
+        if record.levelno >= self.exempt_level or getattr(record, 'audit', False):
+            return True
+
+        if record.levelno <= logging.DEBUG and self.debug_sample_rate < 1.0:
+            if random.random() >= self.debug_sample_rate:
+                self.dropped += 1
+                return False
+
+        if self.rate <= 0:
+            return True
+
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            else:
+                bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                self.dropped += 1
+                return False
+
+            bucket[0] -= 1.0
+            suppressed = bucket[2]
+            bucket[2] = 0
+
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Kaydı biçimlendirmeden kuyruğa bırakan QueueHandler
+
+    Varsayılan prepare() mesajı ve traceback'i çağıran thread'de
+    biçimlendirir. Kuyruk aynı süreçte olduğundan kayıt olduğu gibi
+    bırakılır; mesaj, traceback ve JSON biçimlendirmesi dinleyici thread'inde
+    yapılır. Log argümanları bu yüzden loglandıktan sonra değiştirilmemelidir.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def _json_formatter():
+    """python-json-logger varsa JSON, yoksa düz metin biçimlendirici"""
+    try:
+        from pythonjsonlogger import jsonlogger # type: ignore
+        return jsonlogger.JsonFormatter(JSON_FIELDS, rename_fields={'levelname': 'level', 'asctime': 'time'})
+    except ImportError:
+        logging.getLogger(__name__).warning("⚠️ python-json-logger bulunamadı, dosya logu düz metin yazılacak")
+        return logging.Formatter(TEXT_FORMAT)
+
+
+def setup_logging(config, log_file='app.log'):
+    """
+    Kök logger'ı kuyruk üzerinden çalışacak şekilde ayarla
+
+    Args:
+        config: LOG_* ayarlarını içeren konfigürasyon (DetectionConfig)
+        log_file: Döndürülen JSON log dosyası (None ise sadece konsol; işçi
+            süreçler aynı dosyayı döndürmeye çalışmasın diye)
+
+    Returns:
+        QueueListener: Çıkışta durdurulan dinleyici
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    handlers = [console_handler]
+
+    if log_file:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=config.LOG_MAX_BYTES, backupCount=config.LOG_BACKUP_COUNT, encoding='utf-8')
+        file_handler.setFormatter(_json_formatter() if config.LOG_JSON else logging.Formatter(TEXT_FORMAT))
+        handlers.append(file_handler)
+
+    # Kayıtlar sınırsız kuyruğa bırakılır; yazma dinleyici thread'inde yapılır
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(config.LOG_RATE_LIMIT, config.LOG_RATE_BURST,
+                                            config.LOG_DEBUG_SAMPLE_RATE))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(getattr(logging, str(config.LOG_LEVEL).upper(), logging.INFO))
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    # Kuyrukta kalan kayıtlar çıkışta dosyaya yazılsın
+    atexit.register(_listener.stop)
+    return _listener
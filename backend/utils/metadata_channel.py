@@ -0,0 +1,88 @@
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def detection_to_metadata(detection):
+    """Detection kaydını JSON'a uygun küçük bir kayda çevir"""
+    x1, y1, x2, y2 = detection.bbox
+    return {
+        'track_id': detection.track_id,
+        'bbox': [int(x1), int(y1), int(x2), int(y2)],
+        'class_name': detection.class_name,
+        'confidence': round(float(detection.confidence), 3),
+        'is_truck': bool(detection.is_truck),
+        'stability_count': int(detection.stability_count)
+    }
+
+
+class MetadataChannel:
+    """
+    Frame başına tespit metaverisini (kutular, takip ID'leri, plaka) abonelere
+    Server-Sent Events olarak yayınlar.
+
+    Sadece en son kayıt tutulur: yavaş bir istemci ara frame'leri atlar ama
+    her zaman en güncel kutuları alır.
+
+    Kamera durdurulunca close() ile kapatılır; açık SSE bağlantıları biter
+    ve tarayıcı yeniden bağlanarak kameranın yeni kanalına geçer.
+    """
+
+    def __init__(self, keepalive=15.0):
+        self.keepalive = keepalive
+        self._condition = threading.Condition()
+        self._latest = None
+        self._version = 0
+        self._closed = False
+
+    def publish(self, record):
+        """Yeni frame kaydını yayınla"""
+        with self._condition:
+            self._latest = record
+            self._version += 1
+            self._condition.notify_all()
+
+    def close(self):
+        """Kanalı kapat; abonelerin generator'ları sonlanır"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def latest(self):
+        with self._condition:
+            return self._latest
+
+    def subscribe(self):
+        """SSE formatında kayıt üreten generator (Flask Response için)"""
+        # Bağlanan istemci varsa son kaydı hemen alır
+        last_version = 0
+
+        # Bağlantı koparsa tarayıcı 2 saniye sonra yeniden bağlansın
+        yield 'retry: 2000\n\n'
+
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._closed or self._version != last_version, self.keepalive)
+
+                if self._closed:
+                    return
+                if self._version == last_version:
+                    record = None
+                else:
+                    record = self._latest
+                    last_version = self._version
+
+            if record is None:
+                # Proxy'lerin bağlantıyı kapatmaması için yorum satırı
+                yield ': keepalive\n\n'
+                continue
+
+            yield (f"id: {record['seq']}\n"
+                   f"event: detections\n"
+                   f"data: {json.dumps(record, separators=(',', ':'))}\n\n")
@@ -0,0 +1,202 @@
+"""
+Hafif metrik kayıt defteri ve Prometheus metin formatı çıktısı
+
+Sıcak yolda sadece bir kilit ve birkaç tamsayı artışı yapılır; metin
+çıktısı sadece /metrics istendiğinde üretilir. Ek bağımlılık gerektirmez.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Saniye cinsinden histogram sınırları (1 ms - 5 s)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _escape_label_value(value):
+    """Etiket değerini metin formatına göre kaçır (\\, \" ve satır sonu)"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(label, value, extra=None):
+    parts = []
+    if label is not None:
+        parts.append(f'{label}="{_escape_label_value(value)}"')
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Artan sayaç (isteğe bağlı tek etiketli)"""
+
+    def __init__(self, name, help_text, label=None):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_value=None, amount=1):
+        with self._lock:
+            self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def value(self, label_value=None):
+        with self._lock:
+            return self._values.get(label_value, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items(), key=lambda item: str(item[0]))
+        for label_value, value in values:
+            lines.append(f"{self.name}{_format_labels(self.label, label_value)} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    """Değeri okuma anında bir fonksiyondan alınan gösterge"""
+
+    def __init__(self, name, help_text, callback, label=None):
+        """
+        Args:
+            callback: Etiketsizse sayı, etiketliyse {etiket değeri: sayı} döndürür
+        """
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self.callback = callback
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        try:
+            value = self.callback()
+        except Exception:
+            return lines
+
+        if self.label is None:
+            lines.append(f"{self.name} {_format_value(value)}")
+        else:
+            for label_value, item in sorted(value.items(), key=lambda item: str(item[0])):
+                lines.append(f"{self.name}{_format_labels(self.label, label_value)} {_format_value(item)}")
+        return lines
+
+
+class Histogram:
+    """Sabit sınırlı histogram (isteğe bağlı tek etiketli)"""
+
+    def __init__(self, name, help_text, label=None, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self.buckets = tuple(buckets)
+        self._series = {}  # etiket değeri -> [bucket sayıları..., toplam, adet]
+        self._lock = threading.Lock()
+
+    def observe(self, label_value, seconds):
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [0] * (len(self.buckets) + 3)
+            series[index] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, label_value):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(label_value, time.perf_counter() - start)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+
+        for label_value, series in sorted(snapshot.items(), key=lambda item: str(item[0])):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-2]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label, label_value, le)} {cumulative}")
+            labels = _format_labels(self.label, label_value)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrikleri tutar ve Prometheus metin formatında çıktı üretir"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            # Aynı isimle tekrar kayıt (ör. modül yeniden yüklenince) var olanı döndürür
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text, label=None):
+        return self._register(Counter(name, help_text, label))
+
+    def histogram(self, name, help_text, label=None, buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, label, buckets))
+
+    def gauge(self, name, help_text, callback, label=None):
+        """Gösterge kaydet (aynı isimle tekrar çağrılırsa fonksiyon güncellenir)"""
+        with self._lock:
+            gauge = Gauge(name, help_text, callback, label)
+            self._metrics[name] = gauge
+            return gauge
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# Uygulama genelinde tek kayıt defteri
+registry = MetricsRegistry()
+
+STAGE_LATENCY = registry.histogram(
+    'gate_stage_duration_seconds',
+    'Hat aşaması başına süre (capture, preprocess, inference, tracking, plate_detection, ocr, db_lookup, log_write, encode)',
+    label='stage')
+
+FRAMES_SKIPPED = registry.counter(
+    'gate_frames_skipped_total', 'Çıkarım veya encode yapılmadan atlanan frame sayısı', label='reason')
+
+OCR_CALLS = registry.counter('gate_ocr_calls_total', 'OCR (readtext) çağrı sayısı')
+
+CACHE_HITS = registry.counter('gate_cache_hits_total', 'Önbellekten karşılanan istek sayısı', label='cache')
+
+
+def observe_stage(stage, seconds):
+    """Aşama süresini kaydet"""
+    STAGE_LATENCY.observe(stage, seconds)
+
+
+def observe_stages(timings):
+    """{aşama: saniye} sözlüğündeki süreleri kaydet (ör. işçi süreçten gelen)"""
+    for stage, seconds in timings.items():
+        STAGE_LATENCY.observe(stage, seconds)
+
+
+def time_stage(stage):
+    """Bloğun süresini aşama histogramına kaydeden context manager"""
+    return STAGE_LATENCY.time(stage)
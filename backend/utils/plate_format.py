@@ -0,0 +1,30 @@
+"""
+Plaka metninin ortak biçimi
+
+Elle eklenen, içe aktarılan, API ile sorgulanan ve OCR ile okunan plakalar
+aynı biçime getirilir; veritabanı ve yerel kopyada arama anahtarı budur.
+"""
+
+import re
+
+# Plaka uzunluk sınırları (veritabanında VARCHAR(20))
+PLATE_MIN_LENGTH = 5
+PLATE_MAX_LENGTH = 20
+
+
+def normalize_plate(value):
+    """
+    Plakayı ortak biçime getir (büyük harf, sadece harf ve rakam)
+    
+    Returns:
+        tuple: (plaka, None) veya geçersizse (None, hata mesajı)
+    """
+    if not isinstance(value, str):
+        return None, 'Plaka metin olmalı'
+    
+    plate_number = re.sub(r'[^A-Z0-9]', '', value.upper())
+    if len(plate_number) < PLATE_MIN_LENGTH:
+        return None, 'Geçersiz plaka formatı (çok kısa)'
+    if len(plate_number) > PLATE_MAX_LENGTH:
+        return None, 'Geçersiz plaka formatı (çok uzun)'
+    return plate_number, None
@@ -1,9 +1,12 @@
 import cv2
 import numpy as np
-import easyocr
 import re
 import logging
 import random
+import time
+
+from utils.metrics import OCR_CALLS, observe_stages
+from utils.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -13,16 +16,32 @@ class PlateReader:
         Plaka okuma sınıfını başlat
         """
         try:
+            # EasyOCR ağır bir import (torch), sadece okuyucu oluşturulurken yüklensin
+            import easyocr
+            
             # EasyOCR okuyucusunu başlat (Türkçe ve İngilizce)
             self.reader = easyocr.Reader(['tr', 'en'], gpu=False)
             logger.info("EasyOCR başlatıldı")
             
-            # Türk plaka formatı regex'i
-            self.turkish_plate_pattern = re.compile(r'^[0-9]{2}\s?[A-Z]{1,3}\s?[0-9]{1,4}$')
-            
         except Exception as e:
             logger.error(f"OCR başlatma hatası: {str(e)}")
             self.reader = None
+        
+        self.last_stage_times = {}
+        self.last_ocr_calls = 0
+        
+        # Türk plaka formatı regex'i
+        self.turkish_plate_pattern = re.compile(r'^[0-9]{2}\s?[A-Z]{1,3}\s?[0-9]{1,4}$')
+    
+    def warmup(self):
+        """OCR modelini küçük bir görüntü ile ısıt (ilk okumanın gecikmesini önler)"""
+        if self.reader is None:
+            return
+        
+        test_image = np.full((64, 256), 255, dtype=np.uint8)
+        cv2.putText(test_image, "34ABC1234", (8, 44), cv2.FONT_HERSHEY_SIMPLEX, 1, 0, 2)
+        self.reader.readtext(test_image)
+        logger.info("OCR ısınma okuması tamamlandı")
     
     def read_plate(self, image):
         """
@@ -44,7 +63,12 @@ class PlateReader:
                 return self._fallback_plate_reading(image)
             
             # Plaka bölgesini tespit et ve oku
-            plate_regions = self._detect_plate_regions(image)
+            stage_start = time.perf_counter()
+            with span('plate_detection', 'plate'):
+                plate_regions = self._detect_plate_regions(image)
+            detection_time = time.perf_counter() - stage_start
+            ocr_time = 0.0
+            ocr_calls = 0
             
             best_result = {
                 'detected': False,
@@ -63,7 +87,12 @@ class PlateReader:
                 
                 # OCR ile oku
                 try:
-                    ocr_results = self.reader.readtext(processed_plate)
+                    ocr_start = time.perf_counter()
+                    with span('ocr', 'plate', width=int(processed_plate.shape[1])):
+                        ocr_results = self.reader.readtext(processed_plate)
+                    ocr_time += time.perf_counter() - ocr_start
+                    OCR_CALLS.inc()
+                    ocr_calls += 1
                     
                     for (bbox, text, confidence) in ocr_results:
                         # Metni temizle
@@ -81,13 +110,18 @@ class PlateReader:
                     logger.warning(f"OCR okuma hatası: {str(ocr_error)}")
                     continue
             
+            # Aşama süreleri (işçi süreçte sonuçla birlikte ana sürece gönderilir)
+            self.last_stage_times = {'plate_detection': detection_time, 'ocr': ocr_time}
+            self.last_ocr_calls = ocr_calls
+            observe_stages(self.last_stage_times)
+            
             # OCR başarısız olduysa fallback kullan
             if not best_result['detected']:
                 logger.warning("OCR ile plaka okunamadı, fallback kullanılıyor")
                 return self._fallback_plate_reading(image)
             
             if best_result['detected']:
-                logger.info(f"Plaka okundu: {best_result['text']} (güven: {best_result['confidence']:.2f})")
+                logger.debug("Plaka okundu: %s (güven: %.2f)", best_result['text'], best_result['confidence'])
             else:
                 logger.debug("Plaka okunamadı")
             
@@ -0,0 +1,89 @@
+import cv2 # type: ignore
+import numpy as np # type: ignore
+import logging
+import os
+import sys
+
+# Config dosyasını import et
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config.detection_config import DetectionConfig
+from utils.jpeg_encoder import encode_jpeg
+
+logger = logging.getLogger(__name__)
+
+
+class PreviewRenderer:
+    """
+    Tarayıcı önizlemesi için düşük çözünürlüklü görüntü üretir.
+
+    Tam çözünürlüklü frame tespit ve OCR için dokunulmadan kalır; önizleme
+    bir kez küçültülür, çizimler küçük görüntü üzerine yapılır ve o encode
+    edilir. Koordinatlar tam çözünürlükte verilir, renderer ölçekler.
+    """
+
+    MIN_WIDTH = 160
+    MIN_QUALITY = 10
+    MAX_QUALITY = 95
+
+    def __init__(self, width=None, quality=None):
+        config = DetectionConfig()
+        self.max_width = max(self.MIN_WIDTH, int(width or config.PREVIEW_WIDTH))
+        self.quality = min(self.MAX_QUALITY,
+                           max(self.MIN_QUALITY, int(quality or config.PREVIEW_JPEG_QUALITY)))
+        self.scale = 1.0
+        self.text_scale = 1.0
+        self._preview = None
+
+    def prepare(self, frame):
+        """
+        Frame'in önizleme kopyasını döndür.
+
+        Kopya renderer'a ait tek bir tampona yazılır (dst=) ve bir sonraki
+        prepare() çağrısında üzerine yazılır; frame yakalama, tespit ve diğer
+        stream'ler arasında paylaşıldığından kendisine çizim yapılmaz.
+        """
+        height, width = frame.shape[:2]
+
+        if width <= self.max_width:
+            self.scale = 1.0
+            preview = self._buffer(frame.shape)
+            np.copyto(preview, frame)
+        else:
+            self.scale = self.max_width / width
+            size = (self.max_width, int(round(height * self.scale)))
+            preview = self._buffer((size[1], size[0]) + frame.shape[2:])
+            cv2.resize(frame, size, dst=preview, interpolation=cv2.INTER_AREA)
+
+        # Yazılar çok küçülüp okunaksız olmasın
+        self.text_scale = max(self.scale, 0.6)
+        return preview
+
+    def _buffer(self, shape):
+        if self._preview is None or self._preview.shape != shape:
+            self._preview = np.empty(shape, dtype=np.uint8)
+        return self._preview
+
+    def scale_point(self, x, y):
+        return int(x * self.scale), int(y * self.scale)
+
+    def scale_detections(self, detections):
+        """Tespitlerin bbox'larını önizleme ölçeğine çevrilmiş kopyalarını döndür"""
+        if self.scale == 1.0:
+            return detections
+
+        scaled = []
+        for detection in detections:
+            x1, y1, x2, y2 = detection.bbox
+            scaled.append(detection.with_bbox((int(x1 * self.scale), int(y1 * self.scale),
+                                               int(x2 * self.scale), int(y2 * self.scale))))
+        return scaled
+
+    def put_text(self, preview, text, org, font_scale, color, thickness):
+        """Tam çözünürlük koordinatlarıyla verilen yazıyı önizlemeye çiz"""
+        cv2.putText(preview, text, self.scale_point(*org), cv2.FONT_HERSHEY_SIMPLEX,
+                    font_scale * self.text_scale, color,
+                    max(1, int(round(thickness * self.text_scale))))
+
+    def encode(self, preview):
+        """Önizlemeyi JPEG olarak encode et (başarısızsa None)"""
+        return encode_jpeg(preview, self.quality)
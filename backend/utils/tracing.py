@@ -0,0 +1,205 @@
+"""
+İsteğe bağlı frame/takip izleme (Chrome trace / Perfetto JSON formatı)
+
+Kapalıyken span() paylaşılan boş bir context döndürür; maliyet tek bir
+bayrak kontrolüdür. Açıkken her span başlangıç/bitiş zamanıyla sınırlı bir
+halka tampona yazılır ve export() ile chrome://tracing veya
+ui.perfetto.dev'de açılabilen JSON üretilir.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+DEFAULT_CAPACITY = 50000
+
+
+class _NullSpan:
+    """İzleme kapalıyken kullanılan boş span"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start')
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer._record(self.name, self.category, self.start, end - self.start, self.args)
+        return False
+
+    def set(self, **args):
+        """Span bitmeden önce öğrenilen bilgileri ekle (ör. plaka metni)"""
+        self.args.update(args)
+
+
+class Tracer:
+    """Span'leri sınırlı bir halka tamponda tutan izleyici"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.enabled = False
+        self.started_at = None
+        self._events = deque(maxlen=capacity)  # (isim, kategori, başlangıç ns, süre ns, tid, args)
+        self._thread_names = {}
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self):
+        return self._events.maxlen
+
+    def start(self, capacity=None):
+        """İzlemeyi başlat (tampon temizlenir)"""
+        with self._lock:
+            self._events = deque(maxlen=capacity or self.capacity)
+            self._thread_names = {}
+            self.started_at = time.time()
+            self.enabled = True
+
+    def stop(self):
+        """İzlemeyi durdur (kayıtlar export için saklanır)"""
+        self.enabled = False
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+            self._thread_names = {}
+
+    def span(self, name, category='pipeline', **args):
+        """with ile kullanılan span; kapalıyken boş span döner"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def instant(self, name, category='pipeline', **args):
+        """Süresiz olay kaydet (ör. frame düşürme)"""
+        if self.enabled:
+            self._record(name, category, time.perf_counter_ns(), None, args)
+
+    def collect(self):
+        """Kayıtları tampondan alıp temizle: [(isim, kategori, başlangıç ns, süre ns, args)]"""
+        with self._lock:
+            events = [(name, category, start, duration, args)
+                      for name, category, start, duration, _, args in self._events]
+            self._events.clear()
+        return events
+
+    def record_remote(self, events, tid, thread_name):
+        """
+        Başka bir süreçte collect() ile alınan kayıtları ekle
+
+        perf_counter_ns aynı makinedeki süreçlerde aynı monotonik saati
+        kullandığından zaman damgaları olduğu gibi korunur; kayıtlar
+        thread_name adlı ayrı bir satırda görünür.
+        """
+        if not self.enabled or not events:
+            return
+        with self._lock:
+            self._thread_names.setdefault(tid, thread_name)
+        for name, category, start, duration, args in events:
+            self._events.append((name, category, start, duration, tid, args))
+
+    def _record(self, name, category, start, duration, args):
+        thread = threading.current_thread()
+        tid = thread.ident
+        if tid not in self._thread_names:
+            # export() sözlüğü kilit altında kopyalar; ekleme de kilit altında olmalı
+            with self._lock:
+                self._thread_names.setdefault(tid, thread.name)
+        # deque.append thread güvenlidir; dolunca en eski kayıt düşer
+        self._events.append((name, category, start, duration, tid, args))
+
+    def export(self):
+        """Kayıtları Chrome trace (JSON Object Format) sözlüğüne çevir"""
+        with self._lock:
+            events = list(self._events)
+            thread_names = dict(self._thread_names)
+
+        pid = os.getpid()
+        trace_events = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+            for tid, name in thread_names.items()
+        ]
+
+        for name, category, start, duration, tid, args in events:
+            event = {
+                'name': name,
+                'cat': category,
+                'ts': start / 1000.0,  # mikrosaniye
+                'pid': pid,
+                'tid': tid,
+                'args': args
+            }
+            if duration is None:
+                event['ph'] = 'i'
+                event['s'] = 't'
+            else:
+                event['ph'] = 'X'
+                event['dur'] = duration / 1000.0
+            trace_events.append(event)
+
+        return {
+            'traceEvents': trace_events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'started_at': self.started_at, 'events': len(events)}
+        }
+
+    def status(self):
+        return {
+            'enabled': self.enabled,
+            'events': len(self._events),
+            'capacity': self.capacity,
+            'started_at': self.started_at
+        }
+
+
+# Uygulama genelinde tek izleyici
+tracer = Tracer()
+
+
+def span(name, category='pipeline', **args):
+    """tracer.span kısayolu"""
+    if not tracer.enabled:
+        return _NULL_SPAN
+    return _Span(tracer, name, category, args)
+
+
+def traced(name=None, category='pipeline'):
+    """Fonksiyon çağrısını span olarak kaydeden dekoratör"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with _Span(tracer, span_name, category, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,24 +1,124 @@
 import cv2 # type: ignore
 import numpy as np # type: ignore
 import logging
-from ultralytics import YOLO # type: ignore
 import os
 import time
-from collections import deque
 import math
 import sys
 
 # Config dosyasını import et
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from config.detection_config import DetectionConfig
+from utils.frame_preprocessor import FramePreprocessor
+from utils.detections import Detection, DetectionArray
+from utils.metrics import FRAMES_SKIPPED, observe_stages
+from utils.tracing import span
+from utils.vehicle_tracker import VehicleTracker
 
 logger = logging.getLogger(__name__)
 
+def list_available_cameras(max_cameras=10):
+    """Mevcut kameraları listele (model gerektirmez)"""
+    available_cameras = []
+    
+    print("🔍 Mevcut kameralar taranıyor...")
+    
+    for camera_id in range(max_cameras):
+        cap = cv2.VideoCapture(camera_id)
+        if cap.isOpened():
+            # Kamera bilgilerini al
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            fps = int(cap.get(cv2.CAP_PROP_FPS))
+            
+            camera_info = {
+                'id': camera_id,
+                'name': f"Kamera {camera_id}",
+                'resolution': f"{width}x{height}",
+                'fps': fps
+            }
+            
+            available_cameras.append(camera_info)
+            print(f"✅ Kamera {camera_id}: {width}x{height} @ {fps}fps")
+            cap.release()
+        else:
+            cap.release()
+    
+    if not available_cameras:
+        print("❌ Hiç kamera bulunamadı!")
+    
+    return available_cameras
+
+def draw_detections(frame, detections, config):
+    """
+    Tespitleri kararlılığa göre renk ve kalınlıkla çiz
+
+    Model gerektirmez; VehicleDetector ve süreç vekili aynı çizimi kullanır.
+    """
+    for detection in detections:
+        x1, y1, x2, y2 = detection['bbox']
+        class_name = detection['class_name']
+        confidence = detection['confidence']
+        is_truck = detection.get('is_truck', False)
+        stability_count = detection.get('stability_count', 0)
+        
+        # Renk seç (kararlılığa göre)
+        if stability_count >= 5:
+            color = config.COLORS['truck_very_stable'] if is_truck else config.COLORS['very_stable']
+        elif stability_count >= config.STABILITY_THRESHOLD:
+            color = config.COLORS['truck_stable'] if is_truck else config.COLORS['stable']
+        else:
+            color = config.COLORS['unstable']
+        
+        # Kalınlık (kararlılığa göre)
+        thickness = min(3 + stability_count // 2, 6)
+        
+        # Bounding box çiz
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, thickness)
+        
+        # Etiket hazırla
+        label = f"{class_name}: {confidence:.2f}"
+        if is_truck:
+            label += " (KAMYON/TIR)"
+        
+        # Kararlılık göstergesi
+        if stability_count >= config.STABILITY_THRESHOLD:
+            label += f" ✓{stability_count}"
+        
+        # Etiket boyutunu hesapla
+        label_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0]
+        
+        # Etiket arka planı
+        cv2.rectangle(frame, (x1, y1 - label_size[1] - 10), 
+                     (x1 + label_size[0], y1), color, -1)
+        
+        # Etiket yazısı
+        cv2.putText(frame, label, (x1, y1 - 5), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    
+    # Stabilizasyon bilgisi
+    stable_count = len([d for d in detections if d.get('stability_count', 0) >= config.STABILITY_THRESHOLD])
+    info_text = f"Kararlı Tespit: {stable_count}/{len(detections)}"
+    cv2.putText(frame, info_text, (10, frame.shape[0] - 20), 
+               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    
+    return frame
+
+
 class VehicleDetector:
-    def __init__(self, model_path=None):
+    def __init__(self, model_path=None, warmup=True):
         """
         Araç tespit sınıfını başlat
+        
+        Args:
+            model_path: Model dosya yolu (None ise otomatik seçilir)
+            warmup: True ise ısınma çıkarımı hemen yapılır; False ise
+                    çağıran taraf warmup() metodunu daha sonra çağırır
         """
+        # Ultralytics ağır bir import, sadece model yüklenirken yüklensin; import
+        # hatası yükleyiciye ulaşır ve bileşen ERROR olarak raporlanır
+        from ultralytics import YOLO # type: ignore
+        
         try:
             # Konfigürasyonu yükle
             self.config = DetectionConfig()
@@ -84,26 +184,31 @@ class VehicleDetector:
             # Kamyon/tır olarak kabul edilecek sınıflar
             self.truck_classes = ['truck', 'lorry', 'kamyon', 'tır', 'bus']
             
+            # Vektörel filtreleme ve model içi sınıf filtresi için ID dizileri
+            self.vehicle_class_ids = np.array(sorted(self.vehicle_classes), dtype=np.int32)
+            self.truck_class_ids = np.array([class_id for class_id, name in self.vehicle_classes.items()
+                                             if name in self.truck_classes], dtype=np.int32)
+            
             # Konfigürasyondan parametreleri al
             self.confidence_threshold = self.config.CONFIDENCE_THRESHOLD
             self.nms_threshold = self.config.NMS_THRESHOLD
-            self.min_detection_area = self.config.MIN_DETECTION_AREA
             
-            # Stabilizasyon için tracking
-            self.detection_history = deque(maxlen=self.config.HISTORY_SIZE)
-            self.stable_detections = {}  # Kararlı tespitler
-            self.detection_id_counter = 0
+            # Stabilizasyon için varsayılan takipçi (çok kameralı kullanımda
+            # her kamera create_tracker() ile kendi takipçisini alır)
+            self.tracker = VehicleTracker(self.config)
             
             # FPS hesaplama için
             self.fps_counter = 0
             self.fps_start_time = time.time()
             
-            # Frame stabilizasyon
-            self.frame_skip = 0  # Frame atlama sayacı
-            self.process_every_n_frames = self.config.PROCESS_EVERY_N_FRAMES
+            # Ön işleme hattı (LUT + çıkarım çözünürlüğünde gürültü azaltma)
+            self.preprocessor = FramePreprocessor(self.config.get_preprocessing_params())
+            self._batch_preprocessors = [self.preprocessor]
+            self.last_stage_times = {}
             
             # Model test et
-            self._test_model()
+            if warmup:
+                self._test_model()
             
         except Exception as e:
             logger.error(f"❌ Model yükleme hatası: {str(e)}")
@@ -112,6 +217,11 @@ class VehicleDetector:
             self.use_fallback = True
             self.is_custom_model = False
     
+    def warmup(self):
+        """Isınma çıkarımı yap (arka plan yükleyici tarafından çağrılır)"""
+        if self.model is not None:
+            self._test_model()
+    
     def _test_model(self):
         """Model test et"""
         try:
@@ -136,276 +246,166 @@ class VehicleDetector:
             logger.error(f"❌ Model test hatası: {str(e)}")
             raise e
     
-    def _calculate_iou(self, box1, box2):
-        """İki bounding box arasındaki IoU (Intersection over Union) hesapla"""
-        x1_1, y1_1, x2_1, y2_1 = box1
-        x1_2, y1_2, x2_2, y2_2 = box2
-        
-        # Kesişim alanı
-        x1_i = max(x1_1, x1_2)
-        y1_i = max(y1_1, y1_2)
-        x2_i = min(x2_1, x2_2)
-        y2_i = min(y2_1, y2_2)
-        
-        if x2_i <= x1_i or y2_i <= y1_i:
-            return 0.0
-        
-        intersection = (x2_i - x1_i) * (y2_i - y1_i)
-        
-        # Birleşim alanı
-        area1 = (x2_1 - x1_1) * (y2_1 - y1_1)
-        area2 = (x2_2 - x1_2) * (y2_2 - y1_2)
-        union = area1 + area2 - intersection
-        
-        return intersection / union if union > 0 else 0.0
+    def create_tracker(self, process_every_n_frames=None):
+        """Bir kamera için bağımsız takip durumu oluştur"""
+        return VehicleTracker(self.config, process_every_n_frames)
     
-    def _smooth_detection(self, current_detections):
-        """Tespit sonuçlarını yumuşat ve stabilize et"""
-        smoothed_detections = []
-        
-        for detection in current_detections:
-            bbox = detection['bbox']
-            class_id = detection['class_id']
-            confidence = detection['confidence']
-            
-            # Minimum alan kontrolü
-            area = (bbox[2] - bbox[0]) * (bbox[3] - bbox[1])
-            if area < self.min_detection_area:
-                continue
-            
-            # Geçmiş tespitlerle karşılaştır
-            best_match = None
-            best_iou = 0.0
-            
-            for stable_id, stable_detection in self.stable_detections.items():
-                iou = self._calculate_iou(bbox, stable_detection['bbox'])
-                if iou > best_iou and iou > self.config.IOU_THRESHOLD:
-                    best_iou = iou
-                    best_match = stable_id
-            
-            if best_match:
-                # Mevcut tespitin güncelle (yumuşatma)
-                old_detection = self.stable_detections[best_match]
-                alpha = self.config.SMOOTHING_FACTOR  # Konfigürasyondan al
-                
-                # Bounding box yumuşatma
-                new_bbox = [
-                    int(alpha * bbox[0] + (1 - alpha) * old_detection['bbox'][0]),
-                    int(alpha * bbox[1] + (1 - alpha) * old_detection['bbox'][1]),
-                    int(alpha * bbox[2] + (1 - alpha) * old_detection['bbox'][2]),
-                    int(alpha * bbox[3] + (1 - alpha) * old_detection['bbox'][3])
-                ]
-                
-                # Güven skoru yumuşatma
-                new_confidence = alpha * confidence + (1 - alpha) * old_detection['confidence']
-                
-                self.stable_detections[best_match] = {
-                    'bbox': new_bbox,
-                    'class_id': class_id,
-                    'class_name': detection['class_name'],
-                    'confidence': new_confidence,
-                    'is_truck': detection['is_truck'],
-                    'last_seen': time.time(),
-                    'stability_count': old_detection.get('stability_count', 0) + 1
-                }
-                
-                # Kararlı tespitleri ekle
-                if old_detection.get('stability_count', 0) >= self.config.STABILITY_THRESHOLD:
-                    smoothed_detections.append(self.stable_detections[best_match])
-            else:
-                # Yeni tespit
-                self.detection_id_counter += 1
-                self.stable_detections[self.detection_id_counter] = {
-                    'bbox': bbox,
-                    'class_id': class_id,
-                    'class_name': detection['class_name'],
-                    'confidence': confidence,
-                    'is_truck': detection['is_truck'],
-                    'last_seen': time.time(),
-                    'stability_count': 1
-                }
-        
-        # Eski tespitleri temizle
-        current_time = time.time()
-        to_remove = []
-        for stable_id, stable_detection in self.stable_detections.items():
-            if current_time - stable_detection['last_seen'] > self.config.DETECTION_TIMEOUT:
-                to_remove.append(stable_id)
-        
-        for stable_id in to_remove:
-            del self.stable_detections[stable_id]
-        
-        return smoothed_detections
+    def needs_frame(self, tracker=None):
+        """
+        Sonraki detect_frame çağrısı çıkarım yapacak mı?
+        False ise frame atlanır ve detect_frame'e None verilebilir
+        (sıkıştırılmış frame'i boşuna çözmemek için).
+        """
+        if self.model is None:
+            return True
+        return (tracker or self.tracker).needs_frame()
     
-    def detect_frame(self, frame, conf_threshold=None):
+    def detect_frame(self, frame, conf_threshold=None, tracker=None):
         """Gelişmiş frame tespiti - stabilizasyon ile"""
+        return self.detect_batch([frame], [tracker], conf_threshold)[0]
+    
+    def detect_batch(self, frames, trackers=None, conf_threshold=None):
+        """
+        Birden fazla frame'i tek ileri geçişte tespit et
+        
+        Frame'ler farklı kameralardan (her biri kendi takipçisiyle) veya aynı
+        kaynağın ardışık frame'leri olabilir; takipçiler sırayla güncellenir.
         
-        # Frame atlama kontrolü
-        self.frame_skip += 1
-        if self.frame_skip % self.process_every_n_frames != 0:
-            # Önceki kararlı tespitleri döndür
-            return [det for det in self.stable_detections.values() 
-                   if det.get('stability_count', 0) >= 3]
+        Args:
+            frames: BGR frame listesi
+            trackers: Frame başına takipçi listesi (None ise varsayılan takipçi)
+            conf_threshold: Güven eşiği (None ise konfigürasyondan)
+            
+        Returns:
+            list: Her frame için tespit listesi (frames ile aynı sırada)
+        """
+        if trackers is None:
+            trackers = [None] * len(frames)
+        trackers = [tracker or self.tracker for tracker in trackers]
         
         if conf_threshold is None:
             conf_threshold = self.confidence_threshold
         
-        detections = []
+        outputs = [None] * len(frames)
+        pending = []
+        
+        self.last_stage_times = {}
+        
+        # Frame atlama kontrolü - atlanan frame'ler önceki kararlı tespitleri alır
+        for index, tracker in enumerate(trackers):
+            if tracker.skip_frame():
+                outputs[index] = tracker.stable()
+                FRAMES_SKIPPED.inc('frame_skip')
+            else:
+                pending.append(index)
+        
+        if not pending:
+            return outputs
         
         try:
             if self.model is None:
-                return self._fallback_detection_frame(frame)
-            
-            # Görüntü ön işleme
-            processed_frame = self._preprocess_frame(frame)
+                for index in pending:
+                    outputs[index] = self._fallback_detection_frame(frames[index])
+                return outputs
+            
+            # Görüntü ön işleme (her batch sırası kendi tamponlarını kullanır;
+            # küçültülmüş olabilir, kutular ölçekle geri çevrilir)
+            stage_start = time.perf_counter()
+            images = []
+            scales = []
+            with span('preprocess', 'inference', frames=len(pending)):
+                for position, index in enumerate(pending):
+                    processed_frame, scale = self._batch_preprocessor(position).process(frames[index])
+                    images.append(processed_frame)
+                    scales.append(scale)
+            preprocess_end = time.perf_counter()
             
             # YOLO ile tespit yap - gelişmiş parametreler
             model_params = self.config.get_model_params()
             model_params['conf'] = conf_threshold  # Override confidence
+            model_params['classes'] = self.vehicle_class_ids.tolist()  # Sadece araç sınıfları
+            
+            with span('inference', 'inference', frames=len(images)):
+                results = self.model(images, **model_params)
+            inference_end = time.perf_counter()
+            
+            # Sonuçları kaynaklarına dağıt, yumuşat ve stabilize et
+            with span('tracking', 'inference'):
+                for index, result, scale in zip(pending, results, scales):
+                    detections = self._decode_result(result, 1.0 / scale, conf_threshold,
+                                                     self.config.MIN_DETECTION_AREA)
+                    outputs[index] = trackers[index].update(detections.to_detections())
+            
+            # Aşama süreleri (işçi süreçte sonuçla birlikte ana sürece gönderilir)
+            self.last_stage_times = {
+                'preprocess': preprocess_end - stage_start,
+                'inference': inference_end - preprocess_end,
+                'tracking': time.perf_counter() - inference_end
+            }
+            observe_stages(self.last_stage_times)
             
-            results = self.model(
-                processed_frame, 
-                **model_params
-            )
-            
-            # Sonuçları işle
-            for result in results:
-                boxes = result.boxes
-                if boxes is not None:
-                    for box in boxes:
-                        # Sınıf ID'sini al
-                        class_id = int(box.cls[0])
-                        confidence = float(box.conf[0])
-                        
-                        # Araç sınıfı mı kontrol et
-                        if class_id in self.vehicle_classes:
-                            vehicle_type = self.vehicle_classes[class_id]
-                            
-                            # Bounding box koordinatları
-                            x1, y1, x2, y2 = box.xyxy[0].tolist()
-                            
-                            # Koordinat doğrulama
-                            x1, y1, x2, y2 = max(0, int(x1)), max(0, int(y1)), int(x2), int(y2)
-                            
-                            detection = {
-                                'class_id': class_id,
-                                'class_name': vehicle_type,
-                                'confidence': confidence,
-                                'bbox': [x1, y1, x2, y2],
-                                'is_truck': vehicle_type in self.truck_classes
-                            }
-                            
-                            detections.append(detection)
-            
-            # Tespitleri yumuşat ve stabilize et
-            smoothed_detections = self._smooth_detection(detections)
-            
-            # Geçmişe ekle
-            self.detection_history.append(smoothed_detections)
-            
-            return smoothed_detections
+            return outputs
             
         except Exception as e:
             logger.error(f"❌ Frame tespit hatası: {str(e)}")
-            return []
+            return [output if output is not None else [] for output in outputs]
     
-    def _preprocess_frame(self, frame):
-        """Frame ön işleme"""
-        preprocessing_params = self.config.get_preprocessing_params()
-        
-        # Görüntü kalitesini artır
-        processed = cv2.convertScaleAbs(frame, 
-                                       alpha=preprocessing_params['alpha'], 
-                                       beta=preprocessing_params['beta'])
-        
-        # Gürültü azaltma (eğer aktifse)
-        if preprocessing_params['noise_reduction']:
-            processed = cv2.bilateralFilter(processed, 9, 75, 75)
+    def detect_frames(self, frames, tracker=None, batch_size=None):
+        """
+        Ardışık frame'leri (ör. video dosyası) mikro-batch'ler halinde tespit et
         
-        return processed
+        Yields:
+            tuple: (frame, tespitler)
+        """
+        batch_size = batch_size or self.config.BATCH_MAX_SIZE
+        tracker = tracker or self.create_tracker(process_every_n_frames=1)
+        batch = []
+        
+        for frame in frames:
+            batch.append(frame)
+            if len(batch) >= batch_size:
+                yield from zip(batch, self.detect_batch(batch, [tracker] * len(batch)))
+                batch = []
+        
+        if batch:
+            yield from zip(batch, self.detect_batch(batch, [tracker] * len(batch)))
+    
+    def _batch_preprocessor(self, position):
+        """Batch sırası için ön işleyici (tamponları bir sonraki process() çağrısına kadar geçerli)"""
+        while len(self._batch_preprocessors) <= position:
+            self._batch_preprocessors.append(FramePreprocessor(self.config.get_preprocessing_params()))
+        return self._batch_preprocessors[position]
+    
+    def _decode_result(self, result, inv_scale=1.0, conf_threshold=None, min_area=0):
+        """Tek bir YOLO sonucunu tek transferle DetectionArray'e çevir"""
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return DetectionArray.empty(self.vehicle_classes)
+        
+        # [x1, y1, x2, y2, conf, cls] - kutu başına tensör erişimi yerine tek kopya
+        data = boxes.data.cpu().numpy()
+        
+        return DetectionArray.from_xyxy(data, self.vehicle_classes,
+                                        self.vehicle_class_ids, self.truck_class_ids,
+                                        inv_scale=inv_scale,
+                                        conf_threshold=conf_threshold,
+                                        min_area=min_area)
+    
+    def _preprocess_frame(self, frame):
+        """Frame ön işleme (işlenmiş görüntü, ölçek)"""
+        return self.preprocessor.process(frame)
+    
+    def get_preprocessing_stats(self):
+        """Ön işleme aşamalarının ortalama sürelerini döndür"""
+        return self.preprocessor.get_stats()
     
     def draw_detections(self, frame, detections):
         """Gelişmiş tespit çizimi"""
-        for detection in detections:
-            x1, y1, x2, y2 = detection['bbox']
-            class_name = detection['class_name']
-            confidence = detection['confidence']
-            is_truck = detection.get('is_truck', False)
-            stability_count = detection.get('stability_count', 0)
-            
-            # Renk seç (kararlılığa göre)
-            if stability_count >= 5:
-                color = self.config.COLORS['truck_very_stable'] if is_truck else self.config.COLORS['very_stable']
-            elif stability_count >= self.config.STABILITY_THRESHOLD:
-                color = self.config.COLORS['truck_stable'] if is_truck else self.config.COLORS['stable']
-            else:
-                color = self.config.COLORS['unstable']
-            
-            # Kalınlık (kararlılığa göre)
-            thickness = min(3 + stability_count // 2, 6)
-            
-            # Bounding box çiz
-            cv2.rectangle(frame, (x1, y1), (x2, y2), color, thickness)
-            
-            # Etiket hazırla
-            label = f"{class_name}: {confidence:.2f}"
-            if is_truck:
-                label += " (KAMYON/TIR)"
-            
-            # Kararlılık göstergesi
-            if stability_count >= self.config.STABILITY_THRESHOLD:
-                label += f" ✓{stability_count}"
-            
-            # Etiket boyutunu hesapla
-            label_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0]
-            
-            # Etiket arka planı
-            cv2.rectangle(frame, (x1, y1 - label_size[1] - 10), 
-                         (x1 + label_size[0], y1), color, -1)
-            
-            # Etiket yazısı
-            cv2.putText(frame, label, (x1, y1 - 5), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-        
-        # Stabilizasyon bilgisi
-        stable_count = len([d for d in detections if d.get('stability_count', 0) >= self.config.STABILITY_THRESHOLD])
-        info_text = f"Kararlı Tespit: {stable_count}/{len(detections)}"
-        cv2.putText(frame, info_text, (10, frame.shape[0] - 20), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-        
-        return frame
+        return draw_detections(frame, detections, self.config)
     
     def list_available_cameras(self, max_cameras=10):
         """Mevcut kameraları listele"""
-        available_cameras = []
-        
-        print("🔍 Mevcut kameralar taranıyor...")
-        
-        for camera_id in range(max_cameras):
-            cap = cv2.VideoCapture(camera_id)
-            if cap.isOpened():
-                # Kamera bilgilerini al
-                width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                fps = int(cap.get(cv2.CAP_PROP_FPS))
-                
-                camera_info = {
-                    'id': camera_id,
-                    'name': f"Kamera {camera_id}",
-                    'resolution': f"{width}x{height}",
-                    'fps': fps
-                }
-                
-                available_cameras.append(camera_info)
-                print(f"✅ Kamera {camera_id}: {width}x{height} @ {fps}fps")
-                cap.release()
-            else:
-                cap.release()
-        
-        if not available_cameras:
-            print("❌ Hiç kamera bulunamadı!")
-        
-        return available_cameras
+        return list_available_cameras(max_cameras)
     
     def select_camera(self):
         """Kullanıcının kamera seçmesini sağla"""
@@ -585,8 +585,8 @@ class VehicleDetector:
             if self.model is None:
                 return self._fallback_detection(image)
             
-            # YOLO ile tespit yap
-            results = self.model(image, verbose=False)
+            # YOLO ile tespit yap (sadece araç sınıfları)
+            results = self.model(image, verbose=False, classes=self.vehicle_class_ids.tolist())
             
             best_detection = {
                 'detected': False,
@@ -595,30 +595,19 @@ class VehicleDetector:
                 'bbox': []
             }
             
-            # Sonuçları işle
+            # Sonuçları işle - en yüksek güvenilirlik skoruna sahip tespiti seç
             for result in results:
-                boxes = result.boxes
-                if boxes is not None:
-                    for box in boxes:
-                        # Sınıf ID'sini al
-                        class_id = int(box.cls[0])
-                        confidence = float(box.conf[0])
-                        
-                        # Araç sınıfı mı kontrol et
-                        if class_id in self.vehicle_classes and confidence > self.confidence_threshold:
-                            vehicle_type = self.vehicle_classes[class_id]
-                            
-                            # En yüksek güvenilirlik skoruna sahip tespiti seç
-                            if confidence > best_detection['confidence']:
-                                # Bounding box koordinatları
-                                x1, y1, x2, y2 = box.xyxy[0].tolist()
-                                
-                                best_detection = {
-                                    'detected': True,
-                                    'type': vehicle_type,
-                                    'confidence': confidence,
-                                    'bbox': [int(x1), int(y1), int(x2), int(y2)]
-                                }
+                detections = self._decode_result(result, conf_threshold=self.confidence_threshold)
+                best = detections.best()
+                
+                if best is not None and detections.confidences[best] > best_detection['confidence']:
+                    detection = detections.to_detection(best)
+                    best_detection = {
+                        'detected': True,
+                        'type': detection.class_name,
+                        'confidence': detection.confidence,
+                        'bbox': list(detection.bbox)
+                    }
             
             # Kamyon/tır tespiti için tip kontrolü
             if best_detection['detected']:
@@ -669,13 +658,8 @@ class VehicleDetector:
                         vehicle_type = 'car'
                         is_truck = False
                     
-                    detection = {
-                        'class_id': 7 if is_truck else 2,
-                        'class_name': vehicle_type,
-                        'confidence': 0.6,
-                        'bbox': [x, y, x+w, y+h],
-                        'is_truck': is_truck
-                    }
+                    detection = Detection(7 if is_truck else 2, vehicle_type, 0.6,
+                                          (x, y, x + w, y + h), is_truck)
                     
                     detections.append(detection)
             
@@ -0,0 +1,119 @@
+import time
+from collections import deque
+
+from utils.detections import Track, detections_to_history
+
+
+class VehicleTracker:
+    """
+    Tek bir kamera için tespit stabilizasyonu ve takip durumu.
+    
+    Model (VehicleDetector) kameralar arasında paylaşılabilir; kararlı
+    tespitler, geçmiş ve frame atlama sayacı her kamerada ayrı tutulur.
+    """
+    
+    def __init__(self, config, process_every_n_frames=None):
+        self.config = config
+        self.min_detection_area = config.MIN_DETECTION_AREA
+        
+        # Stabilizasyon için tracking
+        self.detection_history = deque(maxlen=config.HISTORY_SIZE)  # Frame başına HISTORY_DTYPE dizisi
+        self.stable_detections = {}  # track_id -> Track
+        self.detection_id_counter = 0
+        
+        # Frame stabilizasyon
+        self.frame_skip = 0  # Frame atlama sayacı
+        self.process_every_n_frames = process_every_n_frames or config.PROCESS_EVERY_N_FRAMES
+    
+    def needs_frame(self):
+        """Sonraki frame çıkarım için kullanılacak mı?"""
+        return (self.frame_skip + 1) % self.process_every_n_frames == 0
+    
+    def skip_frame(self):
+        """Frame sayacını ilerlet; bu frame atlanacaksa True döndür"""
+        self.frame_skip += 1
+        return self.frame_skip % self.process_every_n_frames != 0
+    
+    def stable(self):
+        """Önceki kararlı tespitleri döndür"""
+        return [track.snapshot() for track in self.stable_detections.values() 
+               if track.stability_count >= 3]
+    
+    def update(self, detections):
+        """Ham tespitleri yumuşat, geçmişe ekle ve kararlı olanları döndür"""
+        smoothed_detections = self._smooth_detection(detections)
+        
+        # Geçmişe kompakt yapılandırılmış dizi olarak ekle
+        self.detection_history.append(detections_to_history(smoothed_detections))
+        
+        return smoothed_detections
+    
+    def _calculate_iou(self, box1, box2):
+        """İki bounding box arasındaki IoU (Intersection over Union) hesapla"""
+        x1_1, y1_1, x2_1, y2_1 = box1
+        x1_2, y1_2, x2_2, y2_2 = box2
+        
+        # Kesişim alanı
+        x1_i = max(x1_1, x1_2)
+        y1_i = max(y1_1, y1_2)
+        x2_i = min(x2_1, x2_2)
+        y2_i = min(y2_1, y2_2)
+        
+        if x2_i <= x1_i or y2_i <= y1_i:
+            return 0.0
+        
+        intersection = (x2_i - x1_i) * (y2_i - y1_i)
+        
+        # Birleşim alanı
+        area1 = (x2_1 - x1_1) * (y2_1 - y1_1)
+        area2 = (x2_2 - x1_2) * (y2_2 - y1_2)
+        union = area1 + area2 - intersection
+        
+        return intersection / union if union > 0 else 0.0
+    
+    def _smooth_detection(self, current_detections):
+        """Tespit sonuçlarını yumuşat ve stabilize et"""
+        smoothed_detections = []
+        current_time = time.time()
+        alpha = self.config.SMOOTHING_FACTOR  # Konfigürasyondan al
+        
+        for detection in current_detections:
+            bbox = detection.bbox
+            
+            # Minimum alan kontrolü
+            area = (bbox[2] - bbox[0]) * (bbox[3] - bbox[1])
+            if area < self.min_detection_area:
+                continue
+            
+            # Geçmiş tespitlerle karşılaştır
+            best_match = None
+            best_iou = 0.0
+            
+            for track in self.stable_detections.values():
+                iou = self._calculate_iou(bbox, track.bbox)
+                if iou > best_iou and iou > self.config.IOU_THRESHOLD:
+                    best_iou = iou
+                    best_match = track
+            
+            if best_match is not None:
+                # Mevcut takibi yerinde güncelle (bbox ve güven yumuşatma)
+                was_stable = best_match.stability_count >= self.config.STABILITY_THRESHOLD
+                best_match.update(detection, alpha, current_time)
+                
+                # Kararlı tespitleri ekle
+                if was_stable:
+                    smoothed_detections.append(best_match.snapshot())
+            else:
+                # Yeni tespit
+                self.detection_id_counter += 1
+                self.stable_detections[self.detection_id_counter] = Track(
+                    self.detection_id_counter, detection, current_time)
+        
+        # Eski tespitleri temizle
+        to_remove = [track_id for track_id, track in self.stable_detections.items()
+                     if current_time - track.last_seen > self.config.DETECTION_TIMEOUT]
+        
+        for track_id in to_remove:
+            del self.stable_detections[track_id]
+        
+        return smoothed_detections
@@ -0,0 +1,134 @@
+-- Migrasyon 001: access_logs tablosunu aylık bölümlenmiş tabloya taşı
+--
+-- supabase-setup.sql'in bölümlenmemiş access_logs ile kurulduğu mevcut
+-- veritabanları içindir (yeni kurulumlar tabloyu zaten bölümlenmiş oluşturur).
+-- Supabase SQL Editor'da tek seferde çalıştırın; tamamı tek işlemdir.
+-- Bu sırada kapı cihazları olayları yerel günlüğe yazmaya devam eder ve
+-- migrasyon bitince gönderir.
+
+BEGIN;
+
+-- 1. Eski tabloyu kenara al (erişim logu günlüğünden önceki kurulumlarda client_id yoktur)
+ALTER TABLE access_logs ADD COLUMN IF NOT EXISTS client_id UUID;
+ALTER TABLE access_logs RENAME TO access_logs_legacy;
+DROP TRIGGER IF EXISTS rollup_access_logs ON access_logs_legacy;
+
+-- 2. Bölümlenmiş tablo; benzersiz anahtarlar bölüm sütununu (timestamp) içermelidir
+--    (uygulama tekrar gönderimde on_conflict=client_id,timestamp kullanır)
+CREATE TABLE access_logs (
+    id UUID DEFAULT gen_random_uuid(),
+    plate_number VARCHAR(20) NOT NULL,
+    vehicle_type VARCHAR(50),
+    action VARCHAR(20) NOT NULL, -- 'open', 'denied'
+    success BOOLEAN DEFAULT TRUE,
+    confidence FLOAT,
+    timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    client_id UUID,
+    PRIMARY KEY (id, timestamp),
+    UNIQUE (client_id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+CREATE TABLE access_logs_default PARTITION OF access_logs DEFAULT;
+
+-- Aylık bölüm: access_logs_y2024m05 = [2024-05-01, 2024-06-01)
+CREATE OR REPLACE FUNCTION create_access_log_partition(p_month DATE)
+RETURNS TEXT AS $$
+DECLARE
+    v_start DATE := date_trunc('month', p_month)::DATE;
+    v_name TEXT := format('access_logs_y%sm%s', to_char(v_start, 'YYYY'), to_char(v_start, 'MM'));
+BEGIN
+    EXECUTE format('CREATE TABLE IF NOT EXISTS %I PARTITION OF access_logs FOR VALUES FROM (%L) TO (%L)',
+                   v_name, v_start, (v_start + INTERVAL '1 month')::DATE);
+    RETURN v_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Bu ay ve sonraki p_months_ahead ay (arşivleme scripti her çalıştığında çağırır)
+CREATE OR REPLACE FUNCTION ensure_access_log_partitions(p_months_ahead INTEGER DEFAULT 3)
+RETURNS SETOF TEXT AS $$
+    SELECT create_access_log_partition((date_trunc('month', NOW()) + make_interval(months => i))::DATE)
+    FROM generate_series(0, p_months_ahead) AS i;
+$$ LANGUAGE sql;
+
+-- Aylık bölümler (varsayılan bölüm hariç), eskiden yeniye
+CREATE OR REPLACE FUNCTION list_access_log_partitions()
+RETURNS TABLE(name TEXT, range_start DATE, range_end DATE) AS $$
+    SELECT c.relname::TEXT,
+           to_date(substring(c.relname FROM '(\d{4}m\d{2})$'), 'YYYY"m"MM'),
+           (to_date(substring(c.relname FROM '(\d{4}m\d{2})$'), 'YYYY"m"MM') + INTERVAL '1 month')::DATE
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'access_logs'::regclass
+      AND c.relname ~ '^access_logs_y\d{4}m\d{2}$'
+    ORDER BY 2;
+$$ LANGUAGE sql STABLE;
+
+-- Arşivlenmiş bölümü ayır ve sil; sadece geçmiş aylar silinebilir
+-- Gerçek projede bu fonksiyonu anon rolünden geri alın (REVOKE) ve scripti service key ile çalıştırın
+CREATE OR REPLACE FUNCTION drop_access_log_partition(p_name TEXT)
+RETURNS VOID AS $$
+BEGIN
+    IF p_name !~ '^access_logs_y\d{4}m\d{2}$' THEN
+        RAISE EXCEPTION 'Geçersiz bölüm adı: %', p_name;
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM list_access_log_partitions() p
+                   WHERE p.name = p_name AND p.range_end <= date_trunc('month', NOW())::DATE) THEN
+        RAISE EXCEPTION 'Silinebilecek geçmiş bölüm değil: %', p_name;
+    END IF;
+    EXECUTE format('ALTER TABLE access_logs DETACH PARTITION %I', p_name);
+    EXECUTE format('DROP TABLE %I', p_name);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- 3. Eski kayıtların ayları ve sonraki 3 ay için bölümler
+SELECT create_access_log_partition(month::DATE)
+FROM generate_series(
+    date_trunc('month', (SELECT COALESCE(MIN(timestamp), NOW()) FROM access_logs_legacy)),
+    date_trunc('month', NOW()),
+    INTERVAL '1 month'
+) AS month;
+
+SELECT ensure_access_log_partitions(3);
+
+-- 4. Kayıtları taşı (zaman damgası boş eski satırlar taşıma anına yazılır)
+INSERT INTO access_logs (id, plate_number, vehicle_type, action, success, confidence, timestamp, client_id)
+SELECT id, plate_number, vehicle_type, action, success, confidence, COALESCE(timestamp, NOW()), client_id
+FROM access_logs_legacy;
+
+-- 5. İndeksler (her bölümde ayrı oluşur)
+CREATE INDEX IF NOT EXISTS idx_access_logs_p_timestamp ON access_logs(timestamp);
+CREATE INDEX IF NOT EXISTS idx_access_logs_p_plate ON access_logs(plate_number);
+CREATE INDEX IF NOT EXISTS idx_access_logs_p_action ON access_logs(action);
+CREATE INDEX IF NOT EXISTS idx_access_logs_p_timestamp_id ON access_logs(timestamp DESC, id DESC);
+
+-- 6. Saatlik özet tetikleyicisi (özet eski tablodan zaten dolduruldu; taşıma iki kez sayılmasın diye sonra eklenir)
+DO $$
+BEGIN
+    IF to_regclass('access_log_hourly') IS NOT NULL THEN
+        CREATE TRIGGER rollup_access_logs
+            AFTER INSERT ON access_logs
+            FOR EACH ROW
+            EXECUTE FUNCTION rollup_access_log();
+    END IF;
+END $$;
+
+-- 7. RLS ve politikalar
+ALTER TABLE access_logs ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Enable all operations for access_logs" ON access_logs
+    FOR ALL USING (true);
+
+-- 8. Görünüm yeniden adlandırılan eski tabloya bağlı kaldığı için yeniden oluşturulur
+CREATE OR REPLACE VIEW recent_access_logs AS
+SELECT 
+    al.*,
+    p.created_at as plate_registered_at
+FROM access_logs al
+LEFT JOIN plates p ON al.plate_number = p.plate_number
+ORDER BY al.timestamp DESC
+LIMIT 100;
+
+COMMIT;
+
+-- 9. Doğrulama; sayılar eşitse eski tablo silinebilir
+-- SELECT (SELECT COUNT(*) FROM access_logs) AS yeni, (SELECT COUNT(*) FROM access_logs_legacy) AS eski;
+-- DROP TABLE access_logs_legacy;
@@ -0,0 +1,38 @@
+-- Migrasyon 002: kayıtlı plakaları ortak plaka biçimine getir
+--
+-- Uygulama artık eklenen, içe aktarılan, /api/check-plate ile sorgulanan ve
+-- OCR ile okunan plakaları aynı biçime getirir (büyük harf, sadece harf ve
+-- rakam; utils/plate_format.py). Eskiden plakalar sadece büyük harfe
+-- çevrilip kırpılarak kaydedildiği için '34 ABC 123' veya '34-ABC-123' gibi
+-- kayıtlar artık eşleşmez. Bu migrasyon onları '34ABC123' biçimine getirir.
+-- Supabase SQL Editor'da tek seferde çalıştırın; tamamı tek işlemdir ve
+-- tekrar çalıştırılması zararsızdır.
+
+BEGIN;
+
+-- 1. Aynı plakaya karşılık gelen yazımlardan biri kalır (zaten normalize
+--    olan, yoksa en eski kayıt); UNIQUE(plate_number) güncellemede bozulmasın
+DELETE FROM plates
+WHERE id IN (
+    SELECT id FROM (
+        SELECT id, ROW_NUMBER() OVER (
+            PARTITION BY regexp_replace(upper(plate_number), '[^A-Z0-9]', '', 'g')
+            ORDER BY (plate_number = regexp_replace(upper(plate_number), '[^A-Z0-9]', '', 'g')) DESC,
+                     created_at, id
+        ) AS rank
+        FROM plates
+    ) ranked
+    WHERE rank > 1
+);
+
+-- 2. Kalan kayıtları normalize et (updated_at tetikleyicisi kapı cihazlarındaki
+--    yerel kopyaların değişikliği artımlı eşitlemede almasını sağlar; silinen
+--    yazımlar bir sonraki tam eşitlemede kopyadan da düşer)
+UPDATE plates
+SET plate_number = regexp_replace(upper(plate_number), '[^A-Z0-9]', '', 'g')
+WHERE plate_number <> regexp_replace(upper(plate_number), '[^A-Z0-9]', '', 'g');
+
+COMMIT;
+
+-- 3. Doğrulama; sonuç 0 olmalı
+-- SELECT COUNT(*) FROM plates WHERE plate_number !~ '^[A-Z0-9]+$';
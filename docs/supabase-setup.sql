@@ -1,7 +1,8 @@
 -- Araç Kapısı & Plaka Tespit Sistemi
 -- Supabase Veritabanı Kurulum SQL'i
 
--- 1. Plakalar tablosu
+-- 1. Plakalar tablosu (plate_number ortak biçimde: büyük harf, sadece harf ve rakam)
+-- Eski yazımlarla kurulmuş veritabanları için: migrations/002_normalize_plate_numbers.sql
 CREATE TABLE IF NOT EXISTS plates (
     id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
     plate_number VARCHAR(20) UNIQUE NOT NULL,
@@ -9,16 +10,76 @@ CREATE TABLE IF NOT EXISTS plates (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
--- 2. Erişim logları tablosu
+-- 2. Erişim logları tablosu (aylık bölümlenmiş)
+-- Eski (bölümlenmemiş) kurulumlar için: migrations/001_partition_access_logs.sql
+-- Bölümlenmiş tabloda benzersiz anahtarlar bölüm sütununu (timestamp) içermelidir.
 CREATE TABLE IF NOT EXISTS access_logs (
-    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    id UUID DEFAULT gen_random_uuid(),
     plate_number VARCHAR(20) NOT NULL,
-    vehicle_type VARCHAR(50),x
+    vehicle_type VARCHAR(50),
     action VARCHAR(20) NOT NULL, -- 'open', 'denied'
     success BOOLEAN DEFAULT TRUE,
     confidence FLOAT,
-    timestamp TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
+    timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    client_id UUID, -- Kapı cihazının yerel günlüğündeki olay kimliği (tekrar gönderimde çift kaydı önler)
+    PRIMARY KEY (id, timestamp),
+    UNIQUE (client_id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+-- Aralık dışı kayıtlar kaybolmasın (bölümü henüz oluşturulmamış aylar)
+CREATE TABLE IF NOT EXISTS access_logs_default PARTITION OF access_logs DEFAULT;
+
+-- Aylık bölüm: access_logs_y2024m05 = [2024-05-01, 2024-06-01)
+CREATE OR REPLACE FUNCTION create_access_log_partition(p_month DATE)
+RETURNS TEXT AS $$
+DECLARE
+    v_start DATE := date_trunc('month', p_month)::DATE;
+    v_name TEXT := format('access_logs_y%sm%s', to_char(v_start, 'YYYY'), to_char(v_start, 'MM'));
+BEGIN
+    EXECUTE format('CREATE TABLE IF NOT EXISTS %I PARTITION OF access_logs FOR VALUES FROM (%L) TO (%L)',
+                   v_name, v_start, (v_start + INTERVAL '1 month')::DATE);
+    RETURN v_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Bu ay ve sonraki p_months_ahead ay (arşivleme scripti her çalıştığında çağırır)
+CREATE OR REPLACE FUNCTION ensure_access_log_partitions(p_months_ahead INTEGER DEFAULT 3)
+RETURNS SETOF TEXT AS $$
+    SELECT create_access_log_partition((date_trunc('month', NOW()) + make_interval(months => i))::DATE)
+    FROM generate_series(0, p_months_ahead) AS i;
+$$ LANGUAGE sql;
+
+-- Aylık bölümler (varsayılan bölüm hariç), eskiden yeniye
+CREATE OR REPLACE FUNCTION list_access_log_partitions()
+RETURNS TABLE(name TEXT, range_start DATE, range_end DATE) AS $$
+    SELECT c.relname::TEXT,
+           to_date(substring(c.relname FROM '(\d{4}m\d{2})$'), 'YYYY"m"MM'),
+           (to_date(substring(c.relname FROM '(\d{4}m\d{2})$'), 'YYYY"m"MM') + INTERVAL '1 month')::DATE
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'access_logs'::regclass
+      AND c.relname ~ '^access_logs_y\d{4}m\d{2}$'
+    ORDER BY 2;
+$$ LANGUAGE sql STABLE;
+
+-- Arşivlenmiş bölümü ayır ve sil; sadece geçmiş aylar silinebilir
+-- Gerçek projede bu fonksiyonu anon rolünden geri alın (REVOKE) ve scripti service key ile çalıştırın
+CREATE OR REPLACE FUNCTION drop_access_log_partition(p_name TEXT)
+RETURNS VOID AS $$
+BEGIN
+    IF p_name !~ '^access_logs_y\d{4}m\d{2}$' THEN
+        RAISE EXCEPTION 'Geçersiz bölüm adı: %', p_name;
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM list_access_log_partitions() p
+                   WHERE p.name = p_name AND p.range_end <= date_trunc('month', NOW())::DATE) THEN
+        RAISE EXCEPTION 'Silinebilecek geçmiş bölüm değil: %', p_name;
+    END IF;
+    EXECUTE format('ALTER TABLE access_logs DETACH PARTITION %I', p_name);
+    EXECUTE format('DROP TABLE %I', p_name);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+SELECT ensure_access_log_partitions(3);
 
 -- 3. Sistem logları tablosu (opsiyonel)
 CREATE TABLE IF NOT EXISTS system_logs (
@@ -32,10 +93,16 @@ CREATE TABLE IF NOT EXISTS system_logs (
 -- İndeksler
 CREATE INDEX IF NOT EXISTS idx_plates_number ON plates(plate_number);
 CREATE INDEX IF NOT EXISTS idx_plates_created_at ON plates(created_at);
+CREATE INDEX IF NOT EXISTS idx_plates_updated_at ON plates(updated_at); -- Kapı cihazındaki yerel kopyanın artımlı eşitlemesi
+CREATE INDEX IF NOT EXISTS idx_plates_number_prefix ON plates(plate_number varchar_pattern_ops); -- Önek araması (LIKE '34AB%')
+CREATE INDEX IF NOT EXISTS idx_plates_created_at_id ON plates(created_at DESC, id DESC); -- Keyset sayfalama
 
+-- Bölümlenmiş tabloda indeksler her bölüme ayrı oluşturulur; son ayların
+-- sorguları sadece ilgili bölümlerin küçük indekslerine dokunur
 CREATE INDEX IF NOT EXISTS idx_access_logs_timestamp ON access_logs(timestamp);
 CREATE INDEX IF NOT EXISTS idx_access_logs_plate ON access_logs(plate_number);
 CREATE INDEX IF NOT EXISTS idx_access_logs_action ON access_logs(action);
+CREATE INDEX IF NOT EXISTS idx_access_logs_timestamp_id ON access_logs(timestamp DESC, id DESC); -- Keyset sayfalama
 
 CREATE INDEX IF NOT EXISTS idx_system_logs_timestamp ON system_logs(timestamp);
 CREATE INDEX IF NOT EXISTS idx_system_logs_level ON system_logs(level);
@@ -89,20 +156,111 @@ LEFT JOIN plates p ON al.plate_number = p.plate_number
 ORDER BY al.timestamp DESC
 LIMIT 100;
 
--- Günlük istatistikler
+-- Saatlik erişim özeti (/api/stats)
+-- Her log eklenirken tetikleyiciyle artımlı güncellenir; istatistikler ham
+-- satırlar yerine bu tablodan okunur ve ham loglar silinse de korunur.
+CREATE TABLE IF NOT EXISTS access_log_hourly (
+    bucket TIMESTAMP WITH TIME ZONE NOT NULL,
+    plate_number VARCHAR(20) NOT NULL,
+    vehicle_type VARCHAR(50) NOT NULL DEFAULT '',
+    action VARCHAR(20) NOT NULL,
+    attempts BIGINT NOT NULL DEFAULT 0,
+    last_seen TIMESTAMP WITH TIME ZONE,
+    PRIMARY KEY (bucket, plate_number, vehicle_type, action)
+);
+
+ALTER TABLE access_log_hourly ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Enable all operations for access_log_hourly" ON access_log_hourly
+    FOR ALL USING (true);
+
+CREATE OR REPLACE FUNCTION rollup_access_log()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO access_log_hourly (bucket, plate_number, vehicle_type, action, attempts, last_seen)
+    VALUES (date_trunc('hour', NEW.timestamp), NEW.plate_number, COALESCE(NEW.vehicle_type, ''),
+            NEW.action, 1, NEW.timestamp)
+    ON CONFLICT (bucket, plate_number, vehicle_type, action) DO UPDATE SET
+        attempts = access_log_hourly.attempts + 1,
+        last_seen = GREATEST(access_log_hourly.last_seen, EXCLUDED.last_seen);
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+-- Mevcut loglardan bir kez doldur (tetikleyiciden önce; tekrar çalıştırmak sayıları değiştirmez)
+INSERT INTO access_log_hourly (bucket, plate_number, vehicle_type, action, attempts, last_seen)
+SELECT date_trunc('hour', timestamp), plate_number, COALESCE(vehicle_type, ''), action, COUNT(*), MAX(timestamp)
+FROM access_logs
+GROUP BY 1, 2, 3, 4
+ON CONFLICT DO NOTHING;
+
+-- client_id çakışmasında (ON CONFLICT DO NOTHING) satır eklenmediği için tekrar gönderim iki kez sayılmaz
+DROP TRIGGER IF EXISTS rollup_access_logs ON access_logs;
+CREATE TRIGGER rollup_access_logs
+    AFTER INSERT ON access_logs
+    FOR EACH ROW
+    EXECUTE FUNCTION rollup_access_log();
+
+-- Günlük istatistikler (saatlik özetten)
 CREATE OR REPLACE VIEW daily_stats AS
 SELECT 
-    DATE(timestamp) as date,
-    COUNT(*) as total_attempts,
-    COUNT(CASE WHEN action = 'open' THEN 1 END) as successful_entries,
-    COUNT(CASE WHEN action = 'denied' THEN 1 END) as denied_entries,
+    DATE(bucket) as date,
+    SUM(attempts)::BIGINT as total_attempts,
+    COALESCE(SUM(attempts) FILTER (WHERE action = 'open'), 0)::BIGINT as successful_entries,
+    COALESCE(SUM(attempts) FILTER (WHERE action = 'denied'), 0)::BIGINT as denied_entries,
     COUNT(DISTINCT plate_number) as unique_plates
-FROM access_logs
-WHERE timestamp >= CURRENT_DATE - INTERVAL '30 days'
-GROUP BY DATE(timestamp)
+FROM access_log_hourly
+WHERE bucket >= CURRENT_DATE - INTERVAL '30 days'
+GROUP BY DATE(bucket)
 ORDER BY date DESC;
 
 -- Fonksiyonlar
+-- Erişim istatistikleri (saat/gün kovaları, plaka, araç tipi, açma/red)
+CREATE OR REPLACE FUNCTION get_access_stats(
+    p_since TIMESTAMP WITH TIME ZONE,
+    p_until TIMESTAMP WITH TIME ZONE,
+    p_bucket TEXT DEFAULT 'hour',
+    p_top INTEGER DEFAULT 10
+)
+RETURNS JSON AS $$
+    WITH r AS (
+        SELECT * FROM access_log_hourly
+        WHERE bucket >= date_trunc('hour', p_since) AND bucket < p_until
+    )
+    SELECT json_build_object(
+        'totals', (
+            SELECT json_build_object(
+                'attempts', COALESCE(SUM(attempts), 0),
+                'open', COALESCE(SUM(attempts) FILTER (WHERE action = 'open'), 0),
+                'denied', COALESCE(SUM(attempts) FILTER (WHERE action = 'denied'), 0),
+                'unique_plates', COUNT(DISTINCT plate_number))
+            FROM r),
+        'by_time', (
+            SELECT COALESCE(json_agg(t ORDER BY t.bucket), '[]'::json) FROM (
+                SELECT date_trunc(p_bucket, bucket) AS bucket,
+                       SUM(attempts) AS attempts,
+                       COALESCE(SUM(attempts) FILTER (WHERE action = 'open'), 0) AS open,
+                       COALESCE(SUM(attempts) FILTER (WHERE action = 'denied'), 0) AS denied
+                FROM r GROUP BY 1) t),
+        'by_plate', (
+            SELECT COALESCE(json_agg(t ORDER BY t.attempts DESC, t.plate_number), '[]'::json) FROM (
+                SELECT plate_number,
+                       SUM(attempts) AS attempts,
+                       COALESCE(SUM(attempts) FILTER (WHERE action = 'open'), 0) AS open,
+                       COALESCE(SUM(attempts) FILTER (WHERE action = 'denied'), 0) AS denied,
+                       MAX(last_seen) AS last_seen
+                FROM r GROUP BY plate_number
+                ORDER BY attempts DESC, plate_number
+                LIMIT p_top) t),
+        'by_vehicle_type', (
+            SELECT COALESCE(json_agg(t ORDER BY t.attempts DESC), '[]'::json) FROM (
+                SELECT NULLIF(vehicle_type, '') AS vehicle_type,
+                       SUM(attempts) AS attempts,
+                       COALESCE(SUM(attempts) FILTER (WHERE action = 'open'), 0) AS open,
+                       COALESCE(SUM(attempts) FILTER (WHERE action = 'denied'), 0) AS denied
+                FROM r GROUP BY vehicle_type) t)
+    );
+$$ LANGUAGE sql STABLE;
+
 -- Plaka istatistikleri
 CREATE OR REPLACE FUNCTION get_plate_stats(plate_num VARCHAR)
 RETURNS TABLE(
@@ -127,7 +285,7 @@ $$ LANGUAGE plpgsql;
 DO $$
 BEGIN
     RAISE NOTICE 'Araç Kapısı & Plaka Tespit Sistemi veritabanı kurulumu tamamlandı!';
-    RAISE NOTICE 'Oluşturulan tablolar: plates, access_logs, system_logs';
+    RAISE NOTICE 'Oluşturulan tablolar: plates, access_logs, system_logs, access_log_hourly';
     RAISE NOTICE 'Oluşturulan görünümler: recent_access_logs, daily_stats';
-    RAISE NOTICE 'Oluşturulan fonksiyonlar: get_plate_stats()';
+    RAISE NOTICE 'Oluşturulan fonksiyonlar: get_plate_stats(), get_access_stats(), ensure_access_log_partitions(), list_access_log_partitions(), drop_access_log_partition()';
 END $$; 
\ No newline at end of file
@@ -21,6 +21,78 @@ import {
 import { toast } from 'react-toastify';
 import axios from 'axios';
 
+// Önizleme stream ayarları (tespit backend'de tam çözünürlükte yapılır)
+const PREVIEW_WIDTH = 640;
+const PREVIEW_QUALITY = 70;
+
+// Kararlı tespit için minimum frame sayısı (backend STABILITY_THRESHOLD ile aynı)
+const STABILITY_THRESHOLD = 3;
+
+// Plaka sonucunun canvas üzerinde kalma süresi (ms)
+const PLATE_MESSAGE_DURATION = 3000;
+
+// Kutu rengi (backend DetectionConfig.COLORS ile aynı, RGB)
+const getBoxColor = (detection) => {
+  if (detection.stability_count >= 5) {
+    return detection.is_truck ? 'rgb(255, 255, 0)' : 'rgb(0, 255, 0)';
+  }
+  if (detection.stability_count >= STABILITY_THRESHOLD) {
+    return detection.is_truck ? 'rgb(200, 200, 0)' : 'rgb(0, 200, 0)';
+  }
+  return 'rgb(150, 150, 0)';
+};
+
+// Tespit metaverisini görüntünün üzerindeki canvas'a çiz
+const drawOverlay = (canvas, image, metadata, plateMessage) => {
+  if (!canvas || !image) return;
+
+  const width = image.clientWidth;
+  const height = image.clientHeight;
+  if (canvas.width !== width) canvas.width = width;
+  if (canvas.height !== height) canvas.height = height;
+
+  const ctx = canvas.getContext('2d');
+  ctx.clearRect(0, 0, width, height);
+  if (!metadata || !width || !height) return;
+
+  const [frameWidth, frameHeight] = metadata.frame_size;
+  const scaleX = width / frameWidth;
+  const scaleY = height / frameHeight;
+
+  ctx.font = '14px sans-serif';
+  ctx.textBaseline = 'bottom';
+
+  metadata.detections.forEach((detection) => {
+    const [x1, y1, x2, y2] = detection.bbox;
+    const x = x1 * scaleX;
+    const y = y1 * scaleY;
+    const color = getBoxColor(detection);
+
+    ctx.strokeStyle = color;
+    ctx.lineWidth = Math.min(2 + Math.floor(detection.stability_count / 2), 5);
+    ctx.strokeRect(x, y, (x2 - x1) * scaleX, (y2 - y1) * scaleY);
+
+    let label = `#${detection.track_id} ${detection.class_name}: ${detection.confidence.toFixed(2)}`;
+    if (detection.is_truck) label += ' (KAMYON/TIR)';
+    if (detection.stability_count >= STABILITY_THRESHOLD) label += ` ✓${detection.stability_count}`;
+
+    const labelWidth = ctx.measureText(label).width + 8;
+    ctx.fillStyle = color;
+    ctx.fillRect(x, y - 20, labelWidth, 20);
+    ctx.fillStyle = 'white';
+    ctx.fillText(label, x + 4, y - 3);
+  });
+
+  if (plateMessage) {
+    const text = plateMessage.is_authorized
+      ? `ERİŞİM İZNİ VERİLDİ: ${plateMessage.plate_text}`
+      : `ERİŞİM REDDEDİLDİ: ${plateMessage.plate_text}`;
+    ctx.font = 'bold 20px sans-serif';
+    ctx.fillStyle = plateMessage.is_authorized ? 'rgb(0, 255, 0)' : 'rgb(255, 0, 0)';
+    ctx.fillText(text, 10, height - 30);
+  }
+};
+
 const CameraStream = ({ onDetectionResult, onProcessingChange }) => {
   const [isActive, setIsActive] = useState(false);
   const [isProcessing, setIsProcessing] = useState(false);
@@ -31,6 +103,11 @@ const CameraStream = ({ onDetectionResult, onProcessingChange }) => {
   const [streamUrl, setStreamUrl] = useState('');
   const [cameraInfo, setCameraInfo] = useState(null);
 
+  // İstemci tarafı çizim için referanslar
+  const imageRef = useRef(null);
+  const canvasRef = useRef(null);
+  const plateMessageRef = useRef(null);
+
   // Backend API base URL
   const API_BASE = process.env.REACT_APP_API_URL || 'http://localhost:5001';
 
@@ -41,12 +118,18 @@ const CameraStream = ({ onDetectionResult, onProcessingChange }) => {
       setCameras(response.data.cameras || []);
       setCameraInfo(response.data);
       
-      if (response.data.current_camera) {
+      // Çalışan bir kamera varsa onu seç (her kameranın kendi hattı vardır)
+      const activeCameras = response.data.active_cameras || [];
+      if (activeCameras.length > 0) {
+        setSelectedCamera((current) => (
+          activeCameras.includes(String(current)) ? current : Number(activeCameras[0])
+        ));
+      } else if (response.data.current_camera) {
         setSelectedCamera(response.data.current_camera);
       }
       
-      setIsActive(response.data.camera_active || false);
-      setDetectionActive(response.data.camera_active || false); // Kamera aktifse tespit de aktif
+      setIsActive(activeCameras.length > 0);
+      setDetectionActive(activeCameras.length > 0); // Kamera aktifse tespit de aktif
     } catch (error) {
       console.error('Kamera listesi yüklenemedi:', error);
       toast.error('Kamera listesi yüklenemedi');
@@ -61,16 +144,17 @@ const CameraStream = ({ onDetectionResult, onProcessingChange }) => {
   // Stream URL'ini güncelle
   useEffect(() => {
     if (isActive) {
-      setStreamUrl(`${API_BASE}/api/camera/stream?t=${Date.now()}`);
+      // overlay=0: sunucu çizim yapmaz, kutular canvas'a çizilir
+      setStreamUrl(`${API_BASE}/api/cameras/${selectedCamera}/stream?width=${PREVIEW_WIDTH}&quality=${PREVIEW_QUALITY}&overlay=0&t=${Date.now()}`);
     } else {
       setStreamUrl('');
     }
-  }, [isActive, API_BASE]);
+  }, [isActive, selectedCamera, API_BASE]);
 
   // Gerçek zamanlı tespiti otomatik başlat
   const startDetection = async () => {
     try {
-      const response = await axios.post(`${API_BASE}/api/detection/start`);
+      const response = await axios.post(`${API_BASE}/api/cameras/${selectedCamera}/detection/start`);
       if (response.data.success) {
         setDetectionActive(true);
         toast.success('🎯 Gerçek zamanlı tespit başlatıldı');
@@ -87,9 +171,7 @@ const CameraStream = ({ onDetectionResult, onProcessingChange }) => {
       setIsProcessing(true);
       setError(null);
 
-      const response = await axios.post(`${API_BASE}/api/camera/start`, {
-        camera_id: selectedCamera
-      });
+      const response = await axios.post(`${API_BASE}/api/cameras/${selectedCamera}/start`);
 
       if (response.data.success) {
         setIsActive(true);
@@ -120,12 +202,12 @@ const CameraStream = ({ onDetectionResult, onProcessingChange }) => {
 
       // Önce tespiti durdur
       try {
-        await axios.post(`${API_BASE}/api/detection/stop`);
+        await axios.post(`${API_BASE}/api/cameras/${selectedCamera}/detection/stop`);
       } catch (error) {
         console.warn('Tespit durdurma uyarısı:', error);
       }
 
-      const response = await axios.post(`${API_BASE}/api/camera/stop`);
+      const response = await axios.post(`${API_BASE}/api/cameras/${selectedCamera}/stop`);
 
       if (response.data.success) {
         setIsActive(false);
@@ -143,6 +225,64 @@ const CameraStream = ({ onDetectionResult, onProcessingChange }) => {
     }
   };
 
+  // Tespit metaverisini SSE ile al ve canvas'a çiz
+  useEffect(() => {
+    if (!isActive) {
+      drawOverlay(canvasRef.current, imageRef.current, null, null);
+      return undefined;
+    }
+
+    let eventSource = null;
+    let reconnectTimer = null;
+    let animationFrame = null;
+    let latestMetadata = null;
+
+    const handleDetections = (event) => {
+      latestMetadata = JSON.parse(event.data);
+
+      if (latestMetadata.plate) {
+        plateMessageRef.current = { ...latestMetadata.plate, expiresAt: Date.now() + PLATE_MESSAGE_DURATION };
+      }
+
+      // Aynı animasyon karesinde gelen kayıtlardan sadece sonuncusu çizilir
+      if (animationFrame === null) {
+        animationFrame = requestAnimationFrame(() => {
+          animationFrame = null;
+          const plateMessage = plateMessageRef.current && plateMessageRef.current.expiresAt > Date.now()
+            ? plateMessageRef.current
+            : null;
+          drawOverlay(canvasRef.current, imageRef.current, latestMetadata, plateMessage);
+        });
+      }
+    };
+
+    const connect = () => {
+      reconnectTimer = null;
+      eventSource = new EventSource(`${API_BASE}/api/cameras/${selectedCamera}/metadata`);
+      eventSource.addEventListener('detections', handleDetections);
+      eventSource.onerror = () => {
+        // Kamera yeniden başlatılırken akış kapanır; EventSource kendisi yeniden
+        // bağlanır, ama kamera o an hazır değilse (404) bağlantı kalıcı kapanır
+        if (eventSource.readyState === EventSource.CLOSED && reconnectTimer === null) {
+          console.debug('Metaveri bağlantısı kapandı, yeniden bağlanılacak');
+          reconnectTimer = setTimeout(connect, 2000);
+        }
+      };
+    };
+
+    connect();
+
+    return () => {
+      eventSource.close();
+      if (reconnectTimer !== null) {
+        clearTimeout(reconnectTimer);
+      }
+      if (animationFrame !== null) {
+        cancelAnimationFrame(animationFrame);
+      }
+    };
+  }, [isActive, selectedCamera, API_BASE]);
+
   // Tespit sonuçlarını kontrol etmek için polling
   useEffect(() => {
     let pollingInterval;
@@ -150,7 +290,7 @@ const CameraStream = ({ onDetectionResult, onProcessingChange }) => {
     if (detectionActive) {
       pollingInterval = setInterval(async () => {
         try {
-          const response = await axios.get(`${API_BASE}/api/detection/latest`);
+          const response = await axios.get(`${API_BASE}/api/cameras/${selectedCamera}/detection/latest`);
           if (response.data.has_result) {
             // Tespit sonucunu parent bileşene gönder
             onDetectionResult(response.data.result);
@@ -167,7 +307,7 @@ const CameraStream = ({ onDetectionResult, onProcessingChange }) => {
         clearInterval(pollingInterval);
       }
     };
-  }, [detectionActive, API_BASE, onDetectionResult]);
+  }, [detectionActive, selectedCamera, API_BASE, onDetectionResult]);
 
   return (
     <Box>
@@ -196,6 +336,7 @@ const CameraStream = ({ onDetectionResult, onProcessingChange }) => {
         {isActive && streamUrl ? (
           <>
             <img
+              ref={imageRef}
               src={streamUrl}
               alt="Kamera Stream"
               style={{
@@ -211,6 +352,18 @@ const CameraStream = ({ onDetectionResult, onProcessingChange }) => {
               }}
             />
 
+            {/* Tespit kutuları (istemci tarafı çizim) */}
+            <canvas
+              ref={canvasRef}
+              style={{
+                position: 'absolute',
+                top: '50%',
+                left: '50%',
+                transform: 'translate(-50%, -50%)',
+                pointerEvents: 'none'
+              }}
+            />
+
             {/* Durum Göstergeleri */}
             <Box
               sx={{
@@ -17,7 +17,8 @@ import {
   Security,
   CameraAlt,
   CheckCircle,
-  Cancel
+  Cancel,
+  BarChart
 } from '@mui/icons-material';
 import { useNavigate } from 'react-router-dom';
 
@@ -32,12 +33,26 @@ function Home() {
   const [isProcessing, setIsProcessing] = useState(false);
   const [systemStatus, setSystemStatus] = useState('ready'); // ready, processing, success, denied
   const [lastDetection, setLastDetection] = useState(null);
+  const [accessStats, setAccessStats] = useState(null);
 
   // Sistem durumu kontrolü
   useEffect(() => {
     checkSystemHealth();
+    fetchAccessStats();
   }, []);
 
+  // Son 24 saatin özeti (sunucuda saatlik özet tablosundan tek sorgu)
+  const fetchAccessStats = async () => {
+    try {
+      const response = await fetch('/api/stats?bucket=hour&top=3');
+      if (response.ok) {
+        setAccessStats(await response.json());
+      }
+    } catch (error) {
+      console.error('İstatistik getirme hatası:', error);
+    }
+  };
+
   const checkSystemHealth = async () => {
     try {
       const response = await fetch('/api/health');
@@ -66,6 +81,10 @@ function Home() {
       setSystemStatus('ready');
     }
 
+    if (result.gate_action === 'open' || result.gate_action === 'denied') {
+      fetchAccessStats();
+    }
+
     // 5 saniye sonra durumu sıfırla
     setTimeout(() => {
       console.log('🔄 Sistem durumu sıfırlanıyor');
@@ -182,6 +201,36 @@ function Home() {
             </Paper>
           )}
 
+          {/* Erişim İstatistikleri */}
+          {accessStats && (
+            <Paper elevation={3} sx={{ p: 3, mb: 3 }}>
+              <Typography variant="h6" gutterBottom>
+                <BarChart sx={{ mr: 1, verticalAlign: 'middle' }} />
+                Son 24 Saat
+              </Typography>
+              <Box display="flex" gap={1} flexWrap="wrap" mb={2}>
+                <Chip label={`Toplam: ${accessStats.totals.attempts}`} color="primary" variant="outlined" size="small" />
+                <Chip label={`Açılan: ${accessStats.totals.open}`} color="success" variant="outlined" size="small" />
+                <Chip label={`Reddedilen: ${accessStats.totals.denied}`} color="error" variant="outlined" size="small" />
+                <Chip
+                  label={`Red oranı: %${(accessStats.totals.denial_rate * 100).toFixed(1)}`}
+                  variant="outlined"
+                  size="small"
+                />
+              </Box>
+              {accessStats.by_plate.map((plate) => (
+                <Box key={plate.plate_number} display="flex" justifyContent="space-between">
+                  <Typography variant="body2" sx={{ fontFamily: 'monospace' }}>
+                    {plate.plate_number}
+                  </Typography>
+                  <Typography variant="body2" color="text.secondary">
+                    {plate.attempts} geçiş
+                  </Typography>
+                </Box>
+              ))}
+            </Paper>
+          )}
+
           {/* Sistem Bilgileri */}
           <Paper elevation={3} sx={{ p: 3 }}>
             <Typography variant="h6" gutterBottom>
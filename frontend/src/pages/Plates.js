@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useCallback } from 'react';
 import {
   Box,
   Paper,
@@ -32,33 +32,54 @@ import { useNavigate } from 'react-router-dom';
 import { toast } from 'react-toastify';
 import axios from 'axios';
 
+const PAGE_SIZE = 50;
+const PLATE_FIELDS = 'id,plate_number,created_at';
+
 function Plates() {
   const navigate = useNavigate();
   const [plates, setPlates] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
   const [searchTerm, setSearchTerm] = useState('');
+  const [query, setQuery] = useState('');
   const [openDialog, setOpenDialog] = useState(false);
   const [newPlate, setNewPlate] = useState('');
   const [addingPlate, setAddingPlate] = useState(false);
 
-  // Sayfa yüklendiğinde plakaları getir
+  // Arama sunucuda (plaka öneki) yapılır; her tuşta istek atılmasın
   useEffect(() => {
-    fetchPlates();
-  }, []);
+    const timer = setTimeout(() => setQuery(searchTerm.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
 
-  // Plakaları getir
-  const fetchPlates = async () => {
+  // Plakaların bir sayfasını getir (cursor yoksa ilk sayfa, liste sıfırlanır)
+  const fetchPlates = useCallback(async (cursor = null) => {
     try {
-      setLoading(true);
-      const response = await axios.get('/api/plates');
-      setPlates(response.data.plates || []);
+      cursor ? setLoadingMore(true) : setLoading(true);
+      const response = await axios.get('/api/plates', {
+        params: {
+          limit: PAGE_SIZE,
+          fields: PLATE_FIELDS,
+          q: query || undefined,
+          cursor: cursor || undefined
+        }
+      });
+      const page = response.data.plates || [];
+      setPlates(previous => (cursor ? [...previous, ...page] : page));
+      setNextCursor(response.data.next_cursor || null);
     } catch (error) {
       console.error('Plaka getirme hatası:', error);
       toast.error('Plakalar yüklenemedi');
     } finally {
-      setLoading(false);
+      cursor ? setLoadingMore(false) : setLoading(false);
     }
-  };
+  }, [query]);
+
+  // Sayfa yüklendiğinde ve arama değiştiğinde ilk sayfayı getir
+  useEffect(() => {
+    fetchPlates();
+  }, [fetchPlates]);
 
   // Yeni plaka ekle
   const handleAddPlate = async () => {
@@ -123,11 +144,6 @@ function Plates() {
     }
   };
 
-  // Plaka arama
-  const filteredPlates = plates.filter(plate =>
-    plate.plate_number.toLowerCase().includes(searchTerm.toLowerCase())
-  );
-
   // Tarih formatla
   const formatDate = (dateString) => {
     return new Date(dateString).toLocaleString('tr-TR');
@@ -156,7 +172,7 @@ function Plates() {
         <Box display="flex" gap={2} alignItems="center" flexWrap="wrap">
           {/* Arama */}
           <TextField
-            placeholder="Plaka ara..."
+            placeholder="Plaka ara (başlangıcı)..."
             value={searchTerm}
             onChange={(e) => setSearchTerm(e.target.value)}
             InputProps={{
@@ -181,17 +197,10 @@ function Plates() {
           {/* İstatistikler */}
           <Box ml="auto" display="flex" gap={2}>
             <Chip
-              label={`Toplam: ${plates.length}`}
-              color="primary"
+              label={`${query ? 'Bulunan' : 'Yüklenen'}: ${plates.length}${nextCursor ? '+' : ''}`}
+              color={query ? 'secondary' : 'primary'}
               variant="outlined"
             />
-            {searchTerm && (
-              <Chip
-                label={`Bulunan: ${filteredPlates.length}`}
-                color="secondary"
-                variant="outlined"
-              />
-            )}
           </Box>
         </Box>
       </Paper>
@@ -217,16 +226,16 @@ function Plates() {
                     </Typography>
                   </TableCell>
                 </TableRow>
-              ) : filteredPlates.length === 0 ? (
+              ) : plates.length === 0 ? (
                 <TableRow>
                   <TableCell colSpan={3} align="center" sx={{ py: 4 }}>
                     <Typography variant="body1" color="text.secondary">
-                      {searchTerm ? 'Arama kriterine uygun plaka bulunamadı' : 'Henüz plaka eklenmemiş'}
+                      {query ? 'Arama kriterine uygun plaka bulunamadı' : 'Henüz plaka eklenmemiş'}
                     </Typography>
                   </TableCell>
                 </TableRow>
               ) : (
-                filteredPlates.map((plate) => (
+                plates.map((plate) => (
                   <TableRow key={plate.id} hover>
                     <TableCell>
                       <Typography
@@ -260,6 +269,20 @@ function Plates() {
             </TableBody>
           </Table>
         </TableContainer>
+
+        {/* Sonraki sayfa */}
+        {!loading && nextCursor && (
+          <Box display="flex" justifyContent="center" p={2}>
+            <Button
+              variant="outlined"
+              onClick={() => fetchPlates(nextCursor)}
+              disabled={loadingMore}
+              startIcon={loadingMore ? <CircularProgress size={20} /> : null}
+            >
+              {loadingMore ? 'Yükleniyor...' : 'Daha fazla yükle'}
+            </Button>
+          </Box>
+        )}
       </Paper>
 
       {/* Yeni Plaka Ekleme Dialogu */}